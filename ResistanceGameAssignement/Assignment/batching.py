@@ -0,0 +1,162 @@
+"""Micro-batching of the calls that bots make to a shared model, like the
+neural network of NeuralBot, across all the games being played concurrently
+in a process.  Calling a small network costs much more per call than per row,
+so it's best to run the rows of many games as one large batch.
+
+A Batcher wraps the function computing the results for a list of rows:
+
+    model = Classifier.load()
+    infer = batching.Batcher(model.probabilities)
+    ...
+    probabilities = infer(vectors)
+
+When the games are played one after the other, the calls go straight to the
+function.  When they're interleaved, e.g. with `--interleave=16` in the
+competitions, each game runs in its own thread registered as a client, and the
+calls wait until every game is waiting for a result, the batch is full, or the
+latency budget is spent, so the rows of all the games are computed together.
+"""
+
+import time
+import threading
+import contextlib
+
+
+# Shared by all the batchers, as the games waiting on one of them can't call
+# any of the others.
+_condition = threading.Condition()
+_clients = 0
+_waiting = 0
+
+
+def register(count = 1):
+    """Add or remove clients, i.e. threads playing games concurrently, whose
+    calls to the batchers are merged."""
+    global _clients
+    with _condition:
+        _clients += count
+        # With fewer games to wait for, the pending rows may be ready to go.
+        _condition.notify_all()
+
+
+@contextlib.contextmanager
+def client():
+    """Register the current thread as a client while in this context."""
+    register(1)
+    try:
+        yield
+    finally:
+        register(-1)
+
+
+class Request(object):
+
+    __slots__ = ['rows', 'results', 'error', 'done']
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.results = None
+        self.error = None
+        self.done = False
+
+
+class Batcher(object):
+    """Callable computing `function(rows)` for lists of rows, in batches of up
+    to `size` rows from the concurrent games.  No call waits more than
+    `latency` seconds for the others to fill the batch."""
+
+    def __init__(self, function, size = 1024, latency = 0.002):
+        self.function = function
+        self.size = size
+        self.latency = latency
+        self.pending = []
+        self.rows = 0
+        # Number of batches and rows computed, for monitoring.
+        self.batches = 0
+        self.computed = 0
+
+    def __call__(self, rows):
+        global _waiting
+        if _clients <= 1:
+            self.batches += 1
+            self.computed += len(rows)
+            return self.function(rows)
+
+        request = Request(list(rows))
+        with _condition:
+            self.pending.append(request)
+            self.rows += len(request.rows)
+            _waiting += 1
+            deadline = time.time() + self.latency
+            while not request.done:
+                remaining = deadline - time.time()
+                if self.rows >= self.size or _waiting >= _clients or remaining <= 0.0:
+                    self.flush()
+                else:
+                    _condition.wait(remaining)
+
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+    def flush(self):
+        """Compute the results of all the pending rows, and hand them out to
+        the games waiting for them.  Must be called with the lock held."""
+        global _waiting
+        batch, self.pending, self.rows = self.pending, [], 0
+        # Games are no longer waiting once their results are computed, even
+        # if their threads haven't woken up yet.
+        _waiting -= len(batch)
+        rows = [r for request in batch for r in request.rows]
+        try:
+            results = self.function(rows)
+        except Exception as e:
+            for request in batch:
+                request.error = e
+        else:
+            start = 0
+            for request in batch:
+                request.results = results[start:start + len(request.rows)]
+                start += len(request.rows)
+        for request in batch:
+            request.done = True
+        self.batches += 1
+        self.computed += len(rows)
+        _condition.notify_all()
+
+
+def interleave(function, items, width):
+    """Return the list of `function(item)` for all the items, calling it from
+    `width` threads registered as clients of the batchers, so up to `width`
+    calls are in progress at any time."""
+    items = list(items)
+    results = [None] * len(items)
+    errors = []
+    lock = threading.Lock()
+    queue = iter(range(len(items)))
+
+    def work():
+        try:
+            while not errors:
+                with lock:
+                    i = next(queue, None)
+                if i is None:
+                    return
+                try:
+                    results[i] = function(items[i])
+                except BaseException as e:
+                    errors.append(e)
+        finally:
+            register(-1)
+
+    threads = [threading.Thread(target = work) for _ in range(min(width, len(items)))]
+    # All the threads are clients from the start, so the first calls wait for
+    # the games of the threads that aren't running yet.
+    register(len(threads))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+    return results
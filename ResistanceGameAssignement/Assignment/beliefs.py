@@ -0,0 +1,168 @@
+"""Exact Bayesian beliefs over the configurations of spies, for bots that want
+probabilities rather than the running averages of hand-written heuristics.
+
+A Belief stores one weight per configuration of the shared hypothesis space
+(see the hypotheses module), and updates them in place from every event of
+the game using a pluggable likelihood model:
+
+    def onGameRevealed(self, players, spies):
+        space = hypotheses.space(len(players))
+        self.belief = beliefs.Belief(space, space.excluding(1 << self.index))
+
+    def onTeamSelected(self, leader, team):
+        self.belief.selected(self.game)
+
+    def onVoteComplete(self, votes):
+        self.belief.voted(self.game, votes)
+
+    def onMissionComplete(self, sabotaged):
+        self.belief.sabotaged(self.game, sabotaged)
+
+The engine is plain Python so the competitions keep running without any
+dependencies, and each update or marginal costs O(configurations), which is
+210 configurations for tables of 10 players.
+"""
+
+
+class Likelihood(object):
+    """Model of the likelihood of each event depending on the number of spies
+    on the team.  The methods return either None when the event carries no
+    information, a single factor applied to every configuration, or a pair of
+    lists (if_spy, if_resistance) with a factor for each seat depending on
+    that player's role.
+
+    This base model only rules out the configurations that can't explain the
+    sabotages, like the logical bots do."""
+
+    def selection(self, game, spies):
+        return None
+
+    def voting(self, game, votes, spies):
+        return None
+
+    def sabotage(self, game, sabotaged, spies):
+        return 1.0 if sabotaged <= spies else 0.0
+
+
+class Behaviour(Likelihood):
+    """Model of typical play, where spies sabotage, pick and support teams
+    with spies more often than resistance players do."""
+
+    def __init__(self, sabotage = 0.8, select = 0.9, support = 0.9, oppose = 0.7, approve = 0.6):
+        self.p_sabotage = sabotage   # Each spy on the team sabotages.
+        self.p_select = select       # Spy leader picks a team with spies.
+        self.p_support = support     # Spy votes for a team with spies.
+        self.p_oppose = oppose       # Spy votes against a team without spies.
+        self.p_approve = approve     # Resistance votes for any team.
+
+    def selection(self, game, spies):
+        # Relative to a resistance leader, who doesn't know the spies.
+        spy = [1.0] * len(game.players)
+        spy[game.leader.index] = 2.0 * (self.p_select if spies else 1.0 - self.p_select)
+        return spy, [1.0] * len(game.players)
+
+    def voting(self, game, votes, spies):
+        if spies:
+            yes = self.p_support
+        else:
+            yes = 1.0 - self.p_oppose
+        approve = 0.99 if game.tries == 5 else self.p_approve
+        return ([yes if v else 1.0 - yes for v in votes],
+                [approve if v else 1.0 - approve for v in votes])
+
+    def sabotage(self, game, sabotaged, spies):
+        if sabotaged > spies:
+            return 0.0
+        p = self.p_sabotage
+        return _choose(spies, sabotaged) * p ** sabotaged * (1.0 - p) ** (spies - sabotaged)
+
+
+def _choose(n, k):
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+class Belief(object):
+    """Probability of each configuration of the hypothesis space, starting
+    from a uniform prior over the `possible` configurations."""
+
+    def __init__(self, space, possible = None, model = None):
+        self.space = space
+        self.model = model or Likelihood()
+        if possible is None:
+            possible = space.configurations
+        total = float(len(possible))
+        self.weights = [1.0 / total if c in possible else 0.0 for c in space.ordered]
+
+    def selected(self, game):
+        self.update(game.team_mask, lambda spies: self.model.selection(game, spies))
+
+    def voted(self, game, votes):
+        self.update(game.team_mask, lambda spies: self.model.voting(game, votes, spies))
+
+    def sabotaged(self, game, sabotaged):
+        self.update(game.team_mask, lambda spies: self.model.sabotage(game, sabotaged, spies))
+
+    def update(self, team, likelihood):
+        """Multiply the weight of each configuration by the likelihood of the
+        event given the number of spies it puts on the team, then normalize.
+        Events that are impossible under the model leave the belief as is."""
+        previous = list(self.weights)
+        weights, members = self.weights, self.space.members
+        for spies, positions in enumerate(self.space.positions(team)):
+            if not positions:
+                continue
+            factor = likelihood(spies)
+            if factor is None:
+                continue
+            if not isinstance(factor, tuple):
+                for i in positions:
+                    weights[i] *= factor
+                continue
+
+            if_spy, if_resistance = factor
+            base = 1.0
+            for r in if_resistance:
+                base *= r
+            if base > 0.0:
+                # Only the factors of the spies differ from the baseline.
+                ratio = [s / r for s, r in zip(if_spy, if_resistance)]
+                for i in positions:
+                    w = weights[i] * base
+                    for seat in members[i]:
+                        w *= ratio[seat]
+                    weights[i] = w
+            else:
+                for i in positions:
+                    w = weights[i]
+                    for seat, (s, r) in enumerate(zip(if_spy, if_resistance)):
+                        w *= s if seat in members[i] else r
+                    weights[i] = w
+
+        total = sum(weights)
+        if total > 0.0:
+            for i in range(len(weights)):
+                weights[i] /= total
+        else:
+            self.weights = previous
+
+    def marginals(self):
+        """Probability that each player is a spy, as a list indexed by seat."""
+        result = [0.0] * self.space.players
+        for w, seats in zip(self.weights, self.space.members):
+            if w:
+                for seat in seats:
+                    result[seat] += w
+        return result
+
+    def clean(self, team):
+        """Probability that the team given as a bitmask has no spies."""
+        weights = self.weights
+        return sum(weights[i] for i in self.space.positions(team)[0])
+
+    def likeliest(self):
+        """The configuration with the highest probability, as a bitmask."""
+        best = max(range(len(self.weights)), key = self.weights.__getitem__)
+        return self.space.ordered[best]
@@ -0,0 +1,194 @@
+"""Logging for the bots, where each bot class writes to its own file in the
+logs/ folder.  Records are buffered and handed in large chunks to a queue,
+for a background thread to write, so bots logging on every decision don't
+block on file access.
+
+For competitions, each worker process writes to its own shards of the files
+(e.g. logs/Invalidator.1234.log), which are merged once the run is over, and
+the level can be set per run, or to "off" to skip logging altogether:
+
+    > python competition.py --log=off 10000 bots/beginners.py
+
+When logging is off bots get a logger whose functions return immediately, so
+pass arguments to the logger rather than formatting the message yourself,
+for the formatting to be skipped too:
+
+    self.log.debug("Voting %s with %i spies.", vote, len(spies))
+"""
+
+import os
+import glob
+import queue
+import atexit
+import logging
+import threading
+
+
+LEVELS = {'debug': logging.DEBUG, 'info': logging.INFO, 'warning': logging.WARNING,
+          'error': logging.ERROR, 'off': None}
+
+
+class NullLog(object):
+    """Stand-in for the logger of a bot when logging is off."""
+
+    def debug(self, *args, **kwargs):
+        pass
+
+    info = warning = warn = error = critical = exception = log = debug
+    addHandler = removeHandler = setLevel = debug
+
+    def isEnabledFor(self, level):
+        return False
+
+
+NULL = NullLog()
+
+
+class Writer(threading.Thread):
+    """Background thread appending the chunks of text it's sent to the files,
+    which are opened on first use."""
+
+    def __init__(self):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.chunks = queue.Queue()
+        self.files = {}
+
+    def run(self):
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                break
+            filename, text = chunk
+            try:
+                f = self.files[filename]
+            except KeyError:
+                f = self.files[filename] = open(filename, 'a')
+            f.write(text)
+        for f in self.files.values():
+            f.close()
+
+
+class Buffered(logging.Handler):
+    """Handler for the loggers of all the bots, which formats the records in
+    the thread of the game and sends them to the writer in large chunks, per
+    file named after the logger."""
+
+    def __init__(self, writer, folder, shard, capacity = 1024):
+        logging.Handler.__init__(self)
+        self.writer = writer
+        self.folder = folder
+        self.shard = shard
+        self.capacity = capacity
+        self.lines = {}
+
+    def filename(self, name):
+        if self.shard is None:
+            return os.path.join(self.folder, name + '.log')
+        return os.path.join(self.folder, '%s.%s.log' % (name, self.shard))
+
+    def emit(self, record):
+        try:
+            lines = self.lines[record.name]
+        except KeyError:
+            lines = self.lines[record.name] = []
+        lines.append(self.format(record))
+        if len(lines) >= self.capacity:
+            self.send(record.name)
+
+    def send(self, name):
+        lines = self.lines.pop(name)
+        self.writer.chunks.put((self.filename(name), '\n'.join(lines) + '\n'))
+
+    def flush(self):
+        for name in list(self.lines):
+            self.send(name)
+
+
+# Settings of this process, changed via configure().  By default, records
+# are written out as they come, to follow the logs of interactive games.
+FOLDER = 'logs'
+LEVEL = logging.DEBUG
+SHARD = None
+CAPACITY = 1
+
+_writer = None
+_handler = None
+_loggers = set()
+
+
+def configure(level = 'debug', folder = 'logs', shard = None, capacity = 1024):
+    """Set the level of the bots' logs for this process, the shard its files
+    are written to if it's one of many workers, and the number of records
+    buffered per file."""
+    global FOLDER, LEVEL, SHARD, CAPACITY
+    stop()
+    FOLDER, LEVEL, SHARD, CAPACITY = folder, LEVELS[level], shard, capacity
+
+
+def start():
+    global _writer, _handler
+    _writer = Writer()
+    _writer.start()
+    _handler = Buffered(_writer, FOLDER, SHARD, CAPACITY)
+
+
+def stop():
+    """Write all the pending records to disk and close the files, detaching
+    the loggers of the bots created so far."""
+    global _writer, _handler
+    _loggers.clear()
+    if _writer is None:
+        return
+    for log in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(log, logging.Logger):
+            log.removeHandler(_handler)
+    _handler.flush()
+    _writer.chunks.put(None)
+    _writer.join()
+    _writer = _handler = None
+
+atexit.register(stop)
+# Workers forked from this process must not inherit the buffers of its files.
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before = stop)
+
+
+def logger(name):
+    """Logger for a bot, writing to its file if the logs folder exists."""
+    if LEVEL is None:
+        return NULL
+
+    log = logging.getLogger(name)
+    if name not in _loggers:
+        _loggers.add(name)
+        if os.path.isdir(FOLDER):
+            if _writer is None:
+                start()
+            log.addHandler(_handler)
+            log.setLevel(LEVEL)
+    return log
+
+
+def merge(folder = 'logs'):
+    """Append the shards written by the workers to the file of each bot, then
+    delete them.  The lines of each worker are kept together and in order,
+    one shard after the other by increasing shard number, i.e. the pid of
+    the worker, so the lines of different workers aren't in the order they
+    were logged."""
+    shards = {}
+    for filename in glob.glob(os.path.join(folder, '*.*.log')):
+        name, shard = os.path.basename(filename).split('.')[:2]
+        shards.setdefault(name, []).append((_number(shard), filename))
+    for name, filenames in shards.items():
+        with open(os.path.join(folder, name + '.log'), 'a') as output:
+            for _, filename in sorted(filenames):
+                with open(filename) as f:
+                    for chunk in iter(lambda: f.read(1 << 16), ''):
+                        output.write(chunk)
+                os.remove(filename)
+
+
+def _number(shard):
+    """Key sorting the numbered shards numerically, before any others."""
+    return (0, int(shard), '') if shard.isdigit() else (1, 0, shard)
@@ -17,6 +17,7 @@ from math import sqrt
 import random
 
 from player import Bot, Player
+from core import override
 
 __all__ = ['Clymily']
 
@@ -512,6 +513,7 @@ class SubsumptionBot(Bot):
 class StatBot(SubsumptionBot):
     """ A stats-collecting bot. """
     
+    @override
     def onGameRevealed(self, players, spies):
         super(StatBot, self).onGameRevealed(players, spies)
         self.stats = Statistics()
@@ -519,11 +521,13 @@ class StatBot(SubsumptionBot):
         self.greens = 0
         self.vround=1
             
+    @override
     def onTeamSelected(self, leader, team):
         super(StatBot, self).onTeamSelected(leader, team)
         self.lastteam = [p.index for p in team]
         self.stats.selections.append((self.lastteam, leader.index, self.greens, self.vround))
                     
+    @override
     def onVoteComplete(self, votes):
         super(StatBot, self).onVoteComplete(votes)
         li = self.game.leader.index
@@ -532,6 +536,7 @@ class StatBot(SubsumptionBot):
             self.stats.votes.append((self.lastteam, li==voter, voter, voted, self.greens, self.vround))
         self.vround += 1
             
+    @override
     def onMissionComplete(self, sabotaged):
         super(StatBot, self).onMissionComplete(sabotaged)
         self.stats.missions.append((self.lastteam, sabotaged, self.greens, self.game.leader.name))
@@ -577,21 +582,25 @@ class InferenceBot(StatBot):
     
     verbose= False
     
+    @override
     def onGameRevealed(self, players, spies):
         super(InferenceBot, self).onGameRevealed(players, spies)
         self._hypotheses = self._allpairs() 
         self.hprobs = defaultdict(float)   
         self.sprobs = defaultdict(float)
         
+    @override
     def onMissionComplete(self, sabotaged):
         super(InferenceBot, self).onMissionComplete(sabotaged)
         if self.game.wins <3 and self.game.losses <3:
             self.inferSpies()
     
+    @override
     def onTeamSelected(self, leader, team):
         super(InferenceBot, self).onTeamSelected(leader, team)
         self.inferSpies()
         
+    @override
     def onGameComplete(self, win, spies):
         super(InferenceBot, self).onGameComplete(win, spies)
         # DEBUG
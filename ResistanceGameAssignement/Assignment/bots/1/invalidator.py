@@ -7,18 +7,15 @@
 """
 
 import random
-import itertools
+import logging
 
+import hypotheses
+from masks import POPCOUNT, mask
 from player import Bot
 from game import State
 from util import Variable
 
 
-def permutations(config):
-    """Returns unique elements from a list of permutations."""
-    return list(set(itertools.permutations(config)))
-
-
 class InvalidatorOracle(object):
 
     def __init__(self, game, bot):
@@ -30,9 +27,8 @@ class InvalidatorOracle(object):
         Zero means the selection is not suspicious, and positive values indicate
         higher suspicion levels."""
 
-        all_spies = self.bot.getSpies(config)
-        team_spies = [s for s in self.game.team if s in all_spies]
-        if self.game.leader in all_spies and len(team_spies) != 1:
+        team_spies = POPCOUNT[config & self.game.team_mask]
+        if config >> self.game.leader.index & 1 and team_spies != 1:
             return 1.0, [(1.0, "%s, assuming a spy, did not pick a mission with spies.")] 
         return 0.0, []
 
@@ -43,29 +39,28 @@ class InvalidatorOracle(object):
         score = 0.0
         factors = []
 
-        all_spies = self.bot.getSpies(config)
-        team_spies = [s for s in self.game.team if s in all_spies]
+        team_spies = POPCOUNT[config & self.game.team_mask]
         for p, v in zip(self.game.players, votes):
+            spy = config >> p.index & 1
             # This is a spy, who voted for a mission, that had no spies.
-            if p in all_spies and v and not team_spies:
+            if spy and v and not team_spies:
                 score += 1.0
                 factors.append((1.0, "%s, assuming a spy, voted for a mission that had no assumed spies." % (p.name)))
             # This is a spy, who did not vote a mission, that had spies.
-            if p in all_spies and not v and team_spies:
+            if spy and not v and team_spies:
                 score += 1.0
                 factors.append((1.0, "%s, assuming a spy, did not vote a mission that had assumed spies." % (p.name)))
             # This is a Resistance guy who did not vote up the fifth try.
-            if self.game.tries == 5 and p not in all_spies and not v:
+            if self.game.tries == 5 and not spy and not v:
                 score += 2.0
             # This is a Resistance guy who voted up a mission without him!
-            if p not in all_spies and len(self.game.team) == 3 and \
-               p not in self.game.team and v:
+            if not spy and len(self.game.team) == 3 and \
+               not self.game.team_mask >> p.index & 1 and v:
                 score += 2.0
         return score, factors
 
     def sabotages(self, config, sabotaged):
-        spies = [s for s in self.game.team if s in self.bot.getSpies(config)]
-        score = max(0, sabotaged - len(spies)) * 100.0
+        score = max(0, sabotaged - POPCOUNT[config & self.game.team_mask]) * 100.0
         if score > 0.0:
             return score, [(score, "%s participated in a mission that had %i sabotages." % (self.game.team, sabotaged))]
         else:
@@ -115,28 +110,31 @@ class Invalidator(Bot):
         self.adviser = InvalidatorAdviser(self.game, self)
         self.players = players
         self.spies = spies
+        self.space = hypotheses.space(len(players))
 
         # Count the number of times each configuration was apparently invalidated.
-        self.invalidations = {k: 0.0 for k in permutations([True, True, False, False])}
+        self.invalidations = {k: 0.0 for k in self.space.excluding(1 << self.index)}
         # This is used to help justify decisions in hybrid human/bot matches.
-        self.factors = {k: [] for k in permutations([True, True, False, False])}
+        self.factors = {k: [] for k in self.invalidations}
 
     def likeliest(self, configurations):
-        ranked = sorted(configurations, key = lambda c: self.invalidations[c])
+        ranked = sorted(sorted(configurations), key = lambda c: self.invalidations[c])
         invalidations = self.invalidations[ranked[0]]
         return [r for r in ranked if self.invalidations[r] == invalidations]
 
     def select(self, players, count):
         likely = self.likeliest(self.invalidations.keys())
-        self.log.debug("Selecting randomly from these Resistance teams:")
-        for c in likely:
-            self.log.debug("  %s = %0.2f (%i)" % (self.getResistance(c), self.invalidations[c], len(self.factors[c])))
+        debug = self.log.isEnabledFor(logging.DEBUG)
+        if debug:
+            self.log.debug("Selecting randomly from these Resistance teams:")
+            for c in likely:
+                self.log.debug("  %s = %0.2f (%i)", self.getResistance(c), self.invalidations[c], len(self.factors[c]))
         config = random.choice(likely)
 
-        if self.factors[config]:
+        if debug and self.factors[config]:
             self.log.debug("Chosen configuration had these factors:")
             for s, f in self.factors[config]:
-                self.log.debug("%0.2f - %s" % (s, f))
+                self.log.debug("%0.2f - %s", s, f)
         return [self] + random.sample(self.getResistance(config), count-1)
 
     def onTeamSelected(self, leader, team):
@@ -151,12 +149,8 @@ class Invalidator(Bot):
             return advice
 
         # Count the scores of configurations where no spies are selected. 
-        scores = []
-        matches = []
-        for config in self.invalidations:
-            if len([s for s in team if s in self.getSpies(config)]) == 0:
-                scores.append(self.invalidations[config])
-                matches.append(config)
+        matches = [config for config in self.space.excluding(mask(team)) if config in self.invalidations]
+        scores = [self.invalidations[config] for config in matches]
         if not scores:
             self.log.debug("No configuration matches this selection!")
             return False
@@ -165,15 +159,16 @@ class Invalidator(Bot):
         score = min(scores)
         threshold = min(self.invalidations.values())
         if score <= threshold:
-            self.log.debug("This selection scores %s under threshold %f." % (scores, threshold))
+            self.log.debug("This selection scores %s under threshold %f.", scores, threshold)
             return True
         else:
-            self.log.debug("This selection scores %s above threshold %0.2f." % (scores, threshold))
-            for config in matches:
-                self.log.debug("Possible configuration for %s:" % (str(self.getResistance(config))))
-                for s, f in self.factors[config]:
-                    self.log.debug("  %0.2f - %s" % (s, f))
-            self.log.debug("Options for Resistance were:\n%s" % ("\n".join(["  %s = %0.2f (%i)" % (str(self.getResistance(c)), t, len(self.factors[c])) for c, t in self.invalidations.items() if t == threshold])))
+            self.log.debug("This selection scores %s above threshold %0.2f.", scores, threshold)
+            if self.log.isEnabledFor(logging.DEBUG):
+                for config in matches:
+                    self.log.debug("Possible configuration for %s:", self.getResistance(config))
+                    for s, f in self.factors[config]:
+                        self.log.debug("  %0.2f - %s", s, f)
+                self.log.debug("Options for Resistance were:\n%s" % ("\n".join(["  %s = %0.2f (%i)" % (str(self.getResistance(c)), t, len(self.factors[c])) for c, t in self.invalidations.items() if t == threshold])))
             return False
 
     def onVoteComplete(self, votes):
@@ -183,10 +178,10 @@ class Invalidator(Bot):
             self.factors[config].extend(factors)
 
     def getSpies(self, config):
-        return set([player for player, spy in zip(self.others(), config) if spy])
+        return [player for player in self.others() if config >> player.index & 1]
 
     def getResistance(self, config):
-        return set([player for player, spy in zip(self.others(), config) if not spy])
+        return [player for player in self.others() if not config >> player.index & 1]
 
     def onMissionComplete(self, sabotaged):
         for config in self.invalidations:
@@ -7,16 +7,10 @@
 
 from player import Bot, Player
 from game import State
+import masks
 import random
 
 
-class MissionedTeam:
-    
-    def __init__(self,team,sabotages):
-        self.team=team
-        self.sabotages=sabotages
-
-
 class Statistic:
     def __init__(self,defaultVal=0.0,minSucesos=1):
         self.ocurrences=0.0
@@ -108,15 +102,8 @@ class GameState:
         self.tries=1
         self.turn=1
         self.players=players
-        self.votes=[]
-        self.selectedTeams=[]
         self.lostTurns=0
         self.team=[]
-        self.missionedTeams=[]
-        self.selectionResults=[]
-    def voteComplete(self,votes):
-        self.selectedTeams.append(self.team)
-        self.votes.append(votes)
 #["Sabotear","VotarAFavorDeUnSpia","VotarEnContraDeUnSpia","SeleccionarSaboteo","SeleccionarOk","NoSabotear"]
 class PlayerAsignment:
     
@@ -398,11 +385,6 @@ class SelectData:
     def __init__(self,player,team):
         self.player=player
         self.team=team
-
-class SelectedTeam:
-    def __init__(self,leader,team):
-        self.leader=leader
-        self.team=team
 class Magi(Bot):
     """This is the base class for your AI in THE RESISTANCE.  To get started:
          1) Derive this class from a new file that will contain your AI.  See
@@ -575,7 +557,6 @@ class Magi(Bot):
         self.gameState.team=team
         self.gameState.leader=leader
         self.updResistanceStats.update(Probabilities.SELECT_HIMSELF,leader,leader in team,self.gameState)
-        self.gameState.selectionResults.append(SelectedTeam(leader,team))
         if leader!=self and leader in self.spies:
             self.otherSelected=True
         pass
@@ -614,8 +595,6 @@ class Magi(Bot):
         """Callback once the whole team has voted.
         @param votes        Boolean votes for each player (ordered).
         """
-        self.gameState.voteComplete(votes)
-        
         for i,p in enumerate(self.players):
             vote=votes[i]
             if p not in self.gameState.team:
@@ -644,7 +623,6 @@ class Magi(Bot):
         for p in self.gameState.team:
             self.updSpyStats.update(Probabilities.SABOTAGE,p,sabotaged>0,self.gameState)
         
-        self.gameState.missionedTeams.append(MissionedTeam(self.gameState.team,sabotaged))
         self.gameState.turn=self.game.turn
         for r in self.rules:
             if sabotaged>0:
@@ -669,8 +647,11 @@ class Magi(Bot):
         @param spies        List of only the spies in the game.
         """
         
-        for i,votes in enumerate(self.gameState.votes):
-            votedTeam=self.gameState.selectedTeams[i]
+        # The teams, votes and sabotages of the game are kept in its history.
+        history=self.game.history
+        for team,voteMask in zip(history.teams,history.votes):
+            votedTeam=masks.players(team,self.game.players)
+            votes=[bool(voteMask>>j&1) for j in range(len(self.gameState.players))]
             spiesInTeam=len([s for s in votedTeam if s in spies])
             
             for j,vote in enumerate(votes):
@@ -692,18 +673,19 @@ class Magi(Bot):
                     if spiesInTeam>1:
                         self.updSpyStats.update(Probabilities.VOTE_ON_TWOSPY_TEAM,player,vote,None)
                         self.updResistanceStats.update(Probabilities.VOTE_ON_TWOSPY_TEAM,player,vote,None)
-        for ms in self.gameState.missionedTeams:
-            #ms=MissionedTeam()
-            spiesOnTeam=len([s for s in ms.team if s in spies])
+        for team,sabotages in zip(history.teams,history.sabotages):
+            if sabotages is None:
+                continue
+            missioned=masks.players(team,self.game.players)
+            spiesOnTeam=len([s for s in missioned if s in spies])
             if spiesOnTeam>1:
-                for p in ms.team:
-                    self.updSpyStats.update(Probabilities.SABOTAGE_ON_TWO_SPIE_TEAM,p,spiesOnTeam<ms.sabotages,None)
+                for p in missioned:
+                    self.updSpyStats.update(Probabilities.SABOTAGE_ON_TWO_SPIE_TEAM,p,spiesOnTeam<sabotages,None)
                 
-        for sel in self.gameState.selectionResults:
-            #sel=SelectedTeam()
-            spiesInTeam=len([s for s in sel.team if s in spies])
-            self.updSpyStats.update(Probabilities.SELECT_SPIES,sel.leader,spiesInTeam>0,self.gameState)
-            self.updResistanceStats.update(Probabilities.SELECT_SPIES,sel.leader,spiesInTeam>0,self.gameState)
+        for leader,team in zip(history.leaders,history.teams):
+            spiesInTeam=len([s for s in masks.players(team,self.game.players) if s in spies])
+            self.updSpyStats.update(Probabilities.SELECT_SPIES,self.game.players[leader],spiesInTeam>0,self.gameState)
+            self.updResistanceStats.update(Probabilities.SELECT_SPIES,self.game.players[leader],spiesInTeam>0,self.gameState)
         for p in self.game.players:
             if p in spies and p.name in self.updSpyStats.playersStats:
                 self.globalSpyPlayerStats.playersStats[p.name]=self.updSpyStats.playersStats[p.name]
@@ -7,52 +7,26 @@
 
 from player import Bot 
 from game import State
+from masks import mask
+import hypotheses
 import random
 import math
-import itertools
 
 
 class GameCombinations:
 	def __init__(self, playerCnt, spyCnt):
-		#self.combinations = []
-		#cnt = math.factorial(playerCnt)/(math.factorial(spyCnt)*math.factorial(playerCnt - spyCnt))
-		#indices = [i for i in range(spyCnt)]
-		#for i in range(cnt):
-		#	self.combinations.append([True if x in indices else False for x in range(playerCnt)])
-		#
-		#	for j in range(spyCnt-1, -1, -1):
-		#		if indices[j] < (playerCnt - spyCnt + j):
-		#			indices[j] += 1
-		#			for k in range(j+1, spyCnt):
-		#				indices[k] = indices[k-1]+1
-		#			break
-		# next line do the same. Should work for any number of players and spies
-		self.combinations = map(lambda x: [True if y in x else False for y in range(playerCnt)], itertools.combinations(range(playerCnt),spyCnt))
+		# every combination of spies is a bitmask over the players, shared with
+		# all the other bots of this process. Should work for any number of players and spies
+		self.space = hypotheses.space(playerCnt, spyCnt)
+		self.combinations = self.space.configurations
 	
 	def addSabotage(self, team, sabotage):
 		# remove those combinations which are not possible for given combination of team and number of sabotages
-		reducedCombinations = []
-		for c in self.combinations:
-			if self._countOfSpies(team, c) >= sabotage:
-				reducedCombinations.append(c)
-		self.combinations = reducedCombinations
-		
-	def _countOfSpies(self, team, row):
-		r = 0
-		for p in team:
-			if row[p.index] == True:
-				r += 1
-		return r
+		self.combinations = self.combinations & self.space.at_least(mask(team), sabotage)
 				
 	def getProbabilities(self):
 		# returns list of probabilities for player calculated from rest team combinations
-		cnt = len(self.combinations)
-		res = [0 for i in range(len(self.combinations[0]))] 
-		for c in self.combinations:
-			for j in range(len(c)):
-				if c[j]:
-					res[j] += 1
-		return map(lambda x: float(x)/cnt, res)
+		return self.space.probabilities(self.combinations)
 		
 class SampledValue:
 	# class which calculates mean value from given samples
@@ -143,9 +117,8 @@ class ScepticBot(Bot):
 		self.playerInfos = [PlayerInfo(p) for p in players if p.index != self.index]
 		self.spies = spies
 		
-		spyCntDict = {5:2, 6:2, 7:3, 8:3, 9:3, 10:4}
 		self.playersCnt = len(players)
-		self.spiesCnt = spyCntDict[self.playersCnt]
+		self.spiesCnt = hypotheses.SPIES[self.playersCnt]
 		
 		self.gameCombinations = GameCombinations(self.playersCnt, self.spiesCnt)
 		if not self.spy:
@@ -1,20 +1,24 @@
-from player import Bot 
+from player import Bot, cached
+from core import override
 from game import State
 import random
 import inspect
 
 # to run this python3 competition.py 1000 bots/beginners.py bots/neuralbot.py
 
-import tensorflow as tf
-from tensorflow import keras
-model = keras.models.load_model('bots/loggerbot_classifier')
-import numpy as np
+# Weights exported from bots/loggerbot_classifier with tools/export_classifier.py, evaluated with NumPy.
+from classifier import Classifier
+import batching
+model = Classifier.load()
+# Rows of the concurrent games are run as one batch when games are interleaved, otherwise this calls the model directly.
+infer = batching.Batcher(model.probabilities)
 import sys
 
 from loggerbot import LoggerBot # this assumes our loggerbot was in a file called loggerbot.py
 
 class Fatality(LoggerBot):
 
+    @cached # The probabilities are computed at most once per version of the State, see player.cached.
     def calc_player_probabilities_of_being_spy(self): 
         probabilities = {}
         vectors = []
@@ -30,9 +34,7 @@ class Fatality(LoggerBot):
             input_vector = input_vector[
                            4:]  # remove the first 4 cosmetic details, as we did when training the neural network
             vectors.append(input_vector)
-        vectors = np.stack(vectors, axis=0)
-        output = model(vectors)  # run the neural network
-        output_probabilities = tf.nn.softmax(output, axis=1) # The neural network didn't have a softmax on the final layer, so I'll add the softmax step here manually.
+        output_probabilities = infer(vectors)  # run the neural network, with the softmax step the final layer doesn't have.
         for i in range(len(self.game.players)):
             probabilities[self.game.players[i]] = output_probabilities[i, 1]  # this [0,1] pulls off the first row (since there is only one row) and the second column (which corresponds to probability of being a spy; the first column is the probability of being not-spy)
 
@@ -158,6 +160,7 @@ class Fatality(LoggerBot):
         @self.downvotes - number of time you have voted down a tem this turn
         @self.teams - used to store teams that passed missions
         @obviousSpies - used store players who has voted down teams when tries==5 """
+    @override
     def onGameRevealed(self, players, spies):
         self.say("Test your Might!")
         self.spies=spies
@@ -169,6 +172,7 @@ class Fatality(LoggerBot):
         return super().onGameRevealed(players, spies)   
 
 
+    @override
     def onMissionComplete(self, num_sabotages):
         if num_sabotages>0:
             self.failedTeam.append(self.game.team) # When mission is sabotaged add team to self.failedTeam
@@ -177,6 +181,7 @@ class Fatality(LoggerBot):
             self.teams.append(self.game.team) # When mission passes add the team to self.teams
         return super().onMissionComplete(num_sabotages)
 
+    @override
     def onVoteComplete(self, votes):
         if votes[self.game.players.index(self)]:
             self.say("Get Over Here!")
@@ -199,6 +204,7 @@ class Fatality(LoggerBot):
     # and make it do nothing...
     
         
+    @override
     def onGameComplete(self, win, spies):
         if win:
             if (self.spy and self.game.wins==0) or (not self.spy and self.game.losses==0): 
@@ -15,17 +15,21 @@ from game import State
 # Many bots will use random decisions to break ties between two equally valid
 # options.  The simple bots below rely on randomness heavily, and expert bots
 # tend to use other statistics and criteria (e.g. who is winning) to avoid ties
-# altogether!
-import random
-
-import pandas as pd 
+# altogether!  The random generator in self.game.random is seeded per game, so
+# games can be reproduced exactly.
+#
+# The simplest bots below also implement optional batch versions of their
+# decisions, e.g. vote_batch(), so tournaments between them can be played many
+# games at a time by the lockstep engine.  The batch versions must draw from
+# batch.random[g] exactly like the bot draws from self.game.random, so both
+# engines play the same games.  See lockstep.py for details.
 
 class Paranoid(Bot):
     """An AI bot that tends to vote everything down!"""
 
     def select(self, players, count):
         self.say("Picking myself and others I don't trust.")
-        return [self] + random.sample(self.others(), count - 1)
+        return [self] + self.game.random.sample(self.others(), count - 1)
 
     def vote(self, team): 
         self.say("I only vote for my own missions.")
@@ -41,13 +45,26 @@ class Paranoid(Bot):
         else:
             return True 
 
+    @classmethod
+    def select_batch(cls, batch, games, seats):
+        return [[s] + batch.random[g].sample(batch.OTHERS[s], batch.count(g) - 1) for g, s in zip(games, seats)]
+
+    @classmethod
+    def vote_batch(cls, batch, games, seats):
+        return [(not batch.spy(g, s) and (bool(batch.team_mask[g] >> s & 1) or batch.tries[g] == 5))
+                or s == batch.leader[g] for g, s in zip(games, seats)]
+
+    @classmethod
+    def sabotage_batch(cls, batch, games, seats):
+        return [not (batch.turn[g] == 1 or len(batch.team[g]) <= 2) for g in games]
+
 
 class Hippie(Bot):
     """An AI bot that's OK with everything!"""
 
     def select(self, players, count):
         self.say("Picking some cool dudes to go with me!")
-        return [self] + random.sample(self.others(), count - 1)
+        return [self] + self.game.random.sample(self.others(), count - 1)
 
     def vote(self, team): 
         self.say("Everything is OK with me, man.")
@@ -57,6 +74,18 @@ class Hippie(Bot):
         self.log.debug("Sabotaging is what spy dudes do, right?")
         return True
 
+    @classmethod
+    def select_batch(cls, batch, games, seats):
+        return [[s] + batch.random[g].sample(batch.OTHERS[s], batch.count(g) - 1) for g, s in zip(games, seats)]
+
+    @classmethod
+    def vote_batch(cls, batch, games, seats):
+        return [True] * len(games)
+
+    @classmethod
+    def sabotage_batch(cls, batch, games, seats):
+        return [True] * len(games)
+
 
 class RandomBot(Bot):
     """An AI bot that's perhaps never played before and doesn't understand the
@@ -64,19 +93,40 @@ class RandomBot(Bot):
 
     def select(self, players, count):
         self.say("A completely random selection.")
-        return random.sample(self.game.players, count)
+        return self.game.random.sample(self.game.players, count)
 
     def vote(self, team): 
         self.say("A completely random vote.")
-        return random.choice([True, False])
+        return self.game.random.choice([True, False])
 
     def sabotage(self):
         self.log.debug("A completely random sabotage.")
-        return random.choice([True, False])
+        return self.game.random.choice([True, False])
 
     def announce(self):
-        subset = random.sample(self.others(), random.randint(0, len(self.others())))
-        return {p: random.random() for p in subset}
+        subset = self.game.random.sample(self.others(), self.game.random.randint(0, len(self.others())))
+        return {p: self.game.random.random() for p in subset}
+
+    @classmethod
+    def select_batch(cls, batch, games, seats):
+        return [batch.random[g].sample(batch.SEATS, batch.count(g)) for g in games]
+
+    @classmethod
+    def vote_batch(cls, batch, games, seats):
+        return [batch.random[g].choice([True, False]) for g in games]
+
+    @classmethod
+    def sabotage_batch(cls, batch, games, seats):
+        return [batch.random[g].choice([True, False]) for g in games]
+
+    @classmethod
+    def announce_batch(cls, batch, games, seats):
+        announcements = []
+        for g, s in zip(games, seats):
+            generator = batch.random[g]
+            subset = generator.sample(batch.OTHERS[s], generator.randint(0, len(batch.OTHERS[s])))
+            announcements.append({p: generator.random() for p in subset})
+        return announcements
 
 
 class Neighbor(Bot):
@@ -102,6 +152,29 @@ class Neighbor(Bot):
     def sabotage(self):
         return len(self.game.team) == 2 or self.game.turn > 3
 
+    @classmethod
+    def select_batch(cls, batch, games, seats):
+        return [[(s + i) % 5 for i in range(batch.count(g))] for g, s in zip(games, seats)]
+
+    @classmethod
+    def vote_batch(cls, batch, games, seats):
+        votes = []
+        for g, s in zip(games, seats):
+            if batch.tries[g] == 5:
+                votes.append(not batch.spy(g, s))
+                continue
+            team = batch.team_mask[g]
+            # Mask of the neighbours, starting with this bot, and itself.
+            n = 0
+            for i in range(len(batch.team[g])):
+                n |= 1 << (s + i) % 5
+            votes.append(team & ~(n | 1 << s) == 0)
+        return votes
+
+    @classmethod
+    def sabotage_batch(cls, batch, games, seats):
+        return [len(batch.team[g]) == 2 or batch.turn[g] > 3 for g in games]
+
 
 class Deceiver(Bot):
     """A tricky bot that's good at pretending being resistance as a spy."""
@@ -110,7 +183,7 @@ class Deceiver(Bot):
         self.spies = spies
 
     def select(self, players, count):
-        return [self] + random.sample(self.others(), count - 1)
+        return [self] + self.game.random.sample(self.others(), count - 1)
 
     def vote(self, team): 
         # Since a resistance would vote up the last mission...
@@ -137,7 +210,7 @@ class RuleFollower(Bot):
         self.spies = spies
 
     def select(self, players, count):
-        return [self] + random.sample(self.others(), count - 1)
+        return [self] + self.game.random.sample(self.others(), count - 1)
 
     def vote(self, team): 
         # Both types of factions have constant behavior on the last try.
@@ -164,12 +237,12 @@ class Jammer(Bot):
 
     def select(self, players, count):
         if not self.spies:
-            return random.sample(self.game.players, count)
+            return self.game.random.sample(self.game.players, count)
         else:
             # Purposefully go out of our way to pick the other spy so that we
             # can trick him with deceptive sabotaging!
             self.log.info("Picking the other spy to trick them!")    
-            return list(self.spies) + random.sample(set(self.game.players) - set(self.spies), count-2)
+            return list(self.spies) + self.game.random.sample([p for p in self.game.players if p not in self.spies], count-2)
 
     def vote(self, team): 
         return True
@@ -241,7 +314,7 @@ class TacticalCheater(Bot):
             else:
                 return [self] + oneHighOneLow[:count-1]
         else:
-            return [self] + random.sample(self.others(), count - 1)
+            return [self] + self.game.random.sample(self.others(), count - 1)
 
 
     def vote(self, team):
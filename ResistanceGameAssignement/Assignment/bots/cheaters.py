@@ -1,8 +1,8 @@
-import random
 import inspect
 import itertools
 
 from player import Bot
+from core import override
 from intermediates import Simpleton
 
 
@@ -24,14 +24,18 @@ def permutations(config):
 
 class RandomCheater(Bot):
     """An AI that can hack the current game implementation and cheat
-    randomly a specified percentage of the time."""
+    randomly a specified percentage of the time.  The rates can be set per
+    instance, e.g. via competition.Configured, or for all the cheaters via
+    cheat_SetRate()."""
+
+    res_ratio = RES_CHEAT_RATIO
+    spy_ratio = SPY_CHEAT_RATIO
 
     @classmethod
     def cheat_SetRate(cls, res, spy):
-        global RES_CHEAT_RATIO 
-        RES_CHEAT_RATIO = res
-        global SPY_CHEAT_RATIO 
-        SPY_CHEAT_RATIO = spy
+        for c in (RandomCheater, LogicalCheater):
+            c.res_ratio = res
+            c.spy_ratio = spy
 
     def cheat_GetSpies(self):
         """Grab the game state from the stack, and lookup the spies using the
@@ -56,17 +60,17 @@ class RandomCheater(Bot):
         return [player for player, spy in zip(self.others(), config) if not spy]
 
     def correct(self):
-        return random.random() <= (SPY_CHEAT_RATIO if self.spy else RES_CHEAT_RATIO)
+        return self.game.random.random() <= (self.spy_ratio if self.spy else self.res_ratio)
 
     def cheat_Select(self, spied, count):
         if not spied:
             # Pick either one or two spies for the mission.
-            team = random.sample(list(self.spies), random.choice([1,2]))
+            team = self.game.random.sample(list(self.spies), self.game.random.choice([1,2]))
         else:
             team = []
         # Then fill the rest with random operatives. 
         operatives = set(self.players) - self.spies
-        team.extend(random.sample(list(operatives), count - len(team)))
+        team.extend(self.game.random.sample(list(operatives), count - len(team)))
         return team
 
     def select(self, players, count):
@@ -77,10 +81,10 @@ class RandomCheater(Bot):
 
     def cheat_Vote(self, spied):
         if self.correct():
-            self.log.info("Voting %s, the correct decision." % (not spied))
+            self.log.info("Voting %s, the correct decision.", not spied)
             return not spied
         else:
-            self.log.info("Voting %s, the incorrect decision." % (spied))
+            self.log.info("Voting %s, the incorrect decision.", spied)
             return spied
 
     def vote(self, team): 
@@ -96,11 +100,17 @@ class RandomCheater(Bot):
 
 class LogicalCheater(Simpleton):
 
+    res_ratio       = RES_CHEAT_RATIO
+    spy_ratio       = SPY_CHEAT_RATIO
+
+    cheat_SetRate   = RandomCheater.__dict__['cheat_SetRate']
     cheat           = RandomCheater.__dict__['correct']
+    correct         = RandomCheater.__dict__['correct']
     cheat_Select    = RandomCheater.__dict__['cheat_Select']
     cheat_Vote      = RandomCheater.__dict__['cheat_Vote']
     cheat_GetSpies  = RandomCheater.__dict__['cheat_GetSpies']
 
+    @override
     def onGameRevealed(self, players, spies):
         super(LogicalCheater, self).onGameRevealed(players, spies)
         self.spies = spies or self.cheat_GetSpies()
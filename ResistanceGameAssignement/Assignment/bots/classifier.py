@@ -0,0 +1,58 @@
+"""Inference engine for the spy classifier trained on LoggerBot's data, with
+the weights exported from keras by tools/export_classifier.py.  The network
+is a few small dense layers, so a forward pass in NumPy over all the players
+at once is much faster than calling the keras model, and doesn't need to load
+TensorFlow:
+
+    from classifier import Classifier
+    model = Classifier.load()
+    probabilities = model.probabilities(vectors)[:, 1]
+"""
+
+import os
+
+import numpy as np
+
+
+FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'loggerbot_classifier.npz')
+
+ACTIVATIONS = {
+    'linear': None,
+    'tanh': np.tanh,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-x)),
+}
+
+
+class Classifier(object):
+    """Sequential network of dense layers given as (kernel, bias, activation)
+    tuples, evaluated in float32 like keras."""
+
+    def __init__(self, layers):
+        self.layers = [(np.asarray(k, dtype=np.float32), np.asarray(b, dtype=np.float32), ACTIVATIONS[a])
+                       for k, b, a in layers]
+        self.inputs = self.layers[0][0].shape[0]
+
+    @classmethod
+    def load(cls, filename = FILENAME):
+        with np.load(filename) as data:
+            activations = [str(a) for a in data['activations']]
+            return cls([(data['kernel%i' % i], data['bias%i' % i], a) for i, a in enumerate(activations)])
+
+    def logits(self, vectors):
+        """Outputs of the last layer for a batch of input vectors, one per row."""
+        x = np.asarray(vectors, dtype=np.float32).reshape(-1, self.inputs)
+        for kernel, bias, activation in self.layers:
+            x = x.dot(kernel)
+            x += bias
+            if activation is not None:
+                x = activation(x)
+        return x
+
+    def probabilities(self, vectors):
+        """Softmax of the logits, i.e. the probability of each class per row."""
+        x = self.logits(vectors)
+        x -= x.max(axis=1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=1, keepdims=True)
+        return x
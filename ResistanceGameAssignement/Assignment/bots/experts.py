@@ -1,14 +1,9 @@
-import random
-import itertools
-
+import beliefs
+import hypotheses
+from masks import POPCOUNT, mask
 from player import Bot
 
 
-def permutations(config):
-    """Returns unique elements from a list of permutations."""
-    return list(set(itertools.permutations(config)))
-
-
 class Suspicious(Bot):
     """Simplification of Invalidator, one of the strongest AIs against bots from
     the 2012 competition.
@@ -19,11 +14,10 @@ class Suspicious(Bot):
         Zero means the selection is not suspicious, and positive values indicate
         higher suspicion levels."""
 
-        all_spies = self.getSpies(config)
-        team_spies = [s for s in self.game.team if s in all_spies]
-        if self.game.leader in all_spies and len(team_spies) == 0:
+        team_spies = POPCOUNT[config & self.game.team_mask]
+        if config >> self.game.leader.index & 1 and team_spies == 0:
             return 1.0, [(1.0, "%s, assuming a spy, did not pick a mission with spies.")] 
-        if len(team_spies) >= 2:
+        if team_spies >= 2:
             return 0.5, [(0.5, "%s, assuming a spy, picked a mission with two spies!")]
         return 0.0, []
 
@@ -32,31 +26,30 @@ class Suspicious(Bot):
         Zero means no suspicious activity and positive values indicate high
         suspicion levels."""
 
-        all_spies = self.getSpies(config)
-        team_spies = [s for s in self.game.team if s in all_spies]
+        team_spies = POPCOUNT[config & self.game.team_mask]
 
         score, factors = 0.0, []        
         for p, v in zip(self.game.players, votes):            
-            if p in all_spies and v and not team_spies:
+            spy = config >> p.index & 1
+            if spy and v and not team_spies:
                 score += 1.0
                 factors.append((1.0, "%s, assuming a spy, voted for a mission that had no assumed spies." % (p.name)))
-            if p in all_spies and not v and len(team_spies) == 1:
+            if spy and not v and team_spies == 1:
                 score += 1.0
                 factors.append((1.0, "%s, assuming a spy, did not vote a mission that had an assumed spy." % (p.name)))
-            if p in all_spies and v and len(team_spies) > 1:
+            if spy and v and team_spies > 1:
                 score += 0.5
                 factors.append((0.5, "%s, assuming a spy, voted a mission with multiple assumed spy." % (p.name)))
-            if self.game.tries == 5 and p not in all_spies and not v:
+            if self.game.tries == 5 and not spy and not v:
                 score += 2.0
                 factors.append((2.0, "%s, assuming resistance, did not approve the final try!" % (p.name)))
-            if p not in all_spies and len(self.game.team) == 3 and p not in self.game.team and v:
+            if not spy and len(self.game.team) == 3 and not self.game.team_mask >> p.index & 1 and v:
                 score += 2.0
                 factors.append((2.0, "%s, assuming a resistance, voted for a mission without self!" % (p.name)))
         return score, factors
 
     def oracle_sabotages(self, config, sabotaged):
-        spies = [s for s in self.game.team if s in self.getSpies(config)]
-        score = max(0, sabotaged - len(spies)) * 100.0
+        score = max(0, sabotaged - POPCOUNT[config & self.game.team_mask]) * 100.0
         if score > 0.0:
             return score, [(score, "%s participated in a mission that had %i sabotages." % (self.game.team, sabotaged))]
         else:
@@ -85,21 +78,22 @@ class Suspicious(Bot):
 
     def onGameRevealed(self, players, spies):
         self.spies = spies
+        self.space = hypotheses.space(len(players))
 
         # Count the number of times each configuration was apparently invalidated.
-        self.invalidations = {k: 0.0 for k in permutations([True, True, False, False])}
+        self.invalidations = {k: 0.0 for k in self.space.excluding(1 << self.index)}
         # This is used to help justify decisions in hybrid human/bot matches.
-        self.factors = {k: [] for k in permutations([True, True, False, False])}
+        self.factors = {k: [] for k in self.invalidations}
 
     def likeliest(self):
-        ranked = sorted(self.invalidations.keys(), key = lambda c: self.invalidations[c])
+        ranked = sorted(sorted(self.invalidations.keys()), key = lambda c: self.invalidations[c])
         invalidations = self.invalidations[ranked[0]]
         return [r for r in ranked if self.invalidations[r] == invalidations]
 
     def select(self, players, count):
         likely = self.likeliest()
-        config = random.choice(likely)
-        return [self] + random.sample(self.getResistance(config), count-1)
+        config = self.game.random.choice(likely)
+        return [self] + self.game.random.sample(self.getResistance(config), count-1)
 
     def onTeamSelected(self, leader, team):
         for config in self.invalidations:
@@ -113,11 +107,8 @@ class Suspicious(Bot):
             return advice
 
         # Count the scores of configurations where no spies are selected. 
-        scores, matches = [], []
-        for config in self.invalidations:
-            if len([s for s in team if s in self.getSpies(config)]) == 0:
-                scores.append(self.invalidations[config])
-                matches.append(config)
+        matches = self.space.excluding(mask(team))
+        scores = [self.invalidations[config] for config in matches if config in self.invalidations]
         if not scores:
             return False
 
@@ -132,14 +123,10 @@ class Suspicious(Bot):
             self.factors[config].extend(factors)
 
     def getSpies(self, config):
-        assert len(config) == 4
-        assert all([type(c) is bool for c in config])
-        return set([player for player, spy in zip(self.others(), config) if spy])
+        return [player for player in self.others() if config >> player.index & 1]
 
     def getResistance(self, config):
-        assert len(config) == 4
-        assert all([type(c) is bool for c in config])
-        return set([player for player, spy in zip(self.others(), config) if not spy])
+        return [player for player in self.others() if not config >> player.index & 1]
 
     def onMissionComplete(self, sabotaged):
         for config in self.invalidations:
@@ -163,3 +150,47 @@ class Suspicious(Bot):
 
         self.log.debug("Other checks failed, why not sabotage since I'm a spy?")
         return True
+
+
+class Bayesian(Bot):
+    """Keeps exact probabilities of every configuration of spies, updated from
+    the selections, votes and sabotages with a model of typical spy play."""
+
+    def onGameRevealed(self, players, spies):
+        self.spies = spies
+        space = hypotheses.space(len(players))
+        self.belief = beliefs.Belief(space, space.excluding(1 << self.index), beliefs.Behaviour())
+
+    def onTeamSelected(self, leader, team):
+        self.belief.selected(self.game)
+
+    def onVoteComplete(self, votes):
+        self.belief.voted(self.game, votes)
+
+    def onMissionComplete(self, sabotaged):
+        self.belief.sabotaged(self.game, sabotaged)
+
+    def _ranked(self):
+        suspicion = self.belief.marginals()
+        others = self.others()
+        self.game.random.shuffle(others)
+        return sorted(others, key = lambda p: suspicion[p.index])
+
+    def select(self, players, count):
+        if self.spy:
+            resistance = [p for p in self.others() if p not in self.spies]
+            return [self] + self.game.random.sample(resistance, count-1)
+        return [self] + self._ranked()[:count-1]
+
+    def vote(self, team):
+        if self.spy:
+            return len([p for p in team if p in self.spies]) > 0
+        if self.game.leader == self or self.game.tries == 5:
+            return True
+        # Only approve teams as likely to be clean as the best we could pick.
+        count = len(team) - 1 if self in team else len(team)
+        best = mask(self._ranked()[:count])
+        return self.belief.clean(mask(team)) >= self.belief.clean(best) - 1e-9
+
+    def sabotage(self):
+        return True
@@ -1,72 +1,57 @@
-import random
-import itertools
-
+import hypotheses
+from masks import POPCOUNT, mask
 from player import Bot
 
 
-def permutations(config):
-    """Returns unique elements from a list of permutations."""
-    return list(set(itertools.permutations(config)))
-
-
 class Simpleton(Bot):
     """A bot that does logical reasoning based on the known spies and the
     results from the mission sabotages."""
 
     def onGameRevealed(self, players, spies):
         self.spies = spies
-        self.configurations = permutations([True, True, False, False]) 
-        """this returns [(False, True, False, True), (True, True, False, False), 
-        (False, True, True, False), (True, False, True, False), 
-        (True, False, False, True), (False, False, True, True)]"""
+        self.space = hypotheses.space(len(players))
+        self.configurations = sorted(self.space.excluding(1 << self.index))
+        """this returns the bitmasks of the spies for each of the possible
+        configurations of the others, e.g. 0b01010 for players #1 and #3."""
 
     def getSpies(self, config):
-        """on entry, config is a tuple of length 4 booleans, e.g. (False, True, False, True)"""
-        assert len(config) == 4
-        assert all([type(c) is bool for c in config])
+        """on entry, config is the bitmask of the spies, e.g. 0b01010"""
         """ returns the subset of others who config says are spies"""
-        return [player for player, spy in zip(self.others(), config) if spy]
+        return [player for player in self.others() if config >> player.index & 1]
 
     def getResistance(self, config):
-        assert len(config) == 4
-        assert all([type(c) is bool for c in config])
         """ returns the subset of others who config says are resistance"""
-        return [player for player, spy in zip(self.others(), config) if not spy]
+        return [player for player in self.others() if not config >> player.index & 1]
 
     def _validateSpies(self, config, team, sabotaged):
-        """find which members of "team" are labelled as spies according 
-        to the config (boolean, boolean, boolean, boolean)"""
-        spies = [s for s in team if s in self.getSpies(config)]
         """If there are more spies in our config than the number of sabotages made 
         then return True, because this config is compatible with the sabotages made.  
         Otherwise it is not compatible, so return False."""
-        return len(spies) >= sabotaged
+        return POPCOUNT[config & mask(team)] >= sabotaged
 
     def _validateNoSpies(self, config, team):
-        spies = [s for s in team if s in self.getSpies(config)]
         """returns True if this config says there are zero spies present on this team."""
-        return len(spies) == 0 
+        return not config & mask(team)
 
     def select(self, players, count):
         if self.configurations:
             # Pick one of the many options first, who knows...    
             config = self._select(self.configurations)
             # Now pick some random players with or without myself.
-            return [self] + random.sample(self.getResistance(config), count - 1)
+            return [self] + self.game.random.sample(self.getResistance(config), count - 1)
         else:
             # assert self.spy
             resistance = [p for p in self.others() if p not in self.spies]
-            return [self] + random.sample(resistance, count - 1)
+            return [self] + self.game.random.sample(resistance, count - 1)
 
     def _select(self, configurations):
         """This is a hook for inserting more advanced reasoning on top of the
         maximal amount of logical reasoning you can perform."""
-        return random.choice(configurations)
+        return self.game.random.choice(configurations)
         
     def _acceptable(self, team):
         """Determine if this team is an acceptable one to vote for..."""
-        current = [c for c in self.configurations if self._validateNoSpies(c, team)]
-        return bool(len(current) > 0)
+        return not self.space.excluding(mask(team)).isdisjoint(self.configurations)
 
     def vote(self, team):
         if self.game.tries == 5:
@@ -88,7 +73,7 @@ class Simpleton(Bot):
     def onMissionComplete(self, sabotaged):
         before = len(self.configurations)
         """Delete any configurations that are not possible:"""
-        self.configurations = [c for c in self.configurations if self._validateSpies(c, self.game.team, sabotaged)]
+        self.configurations = sorted(self.space.at_least(self.game.team_mask, sabotaged).intersection(self.configurations))
         after = len(self.configurations)
         # self.log.debug("%s: Filtered out %i configurations, %i left." % ("SPY" if self.spy else "RST", after - before, after))
         # self.log.debug("%r" % [self.getSpies(c) for c in self.configurations])
@@ -106,7 +91,7 @@ class Trickerton(Simpleton):
 
            
     def _vote(self, team):
-        return self == self.game.leader or random.choice([True, False])
+        return self == self.game.leader or self.game.random.choice([True, False])
 
     def sabotage(self):
         return self.game.turn > 1
@@ -118,33 +103,34 @@ class Bounder(Simpleton):
 
     def onGameRevealed(self, players, spies):
         self.spies = spies
+        self.space = hypotheses.space(len(players))
 
         # The set of possible assignments around the table, for:
         #   - PESSIMISTIC: All teams except those 100% proven to be spies.
-        self.pessimistic = permutations([True, True, False, False])
+        self.pessimistic = sorted(self.space.excluding(1 << self.index))
         #   - OPTIMISTIC: The teams we don't suspect to be spies without guarantees.
-        self.optimistic = permutations([True, True, False, False])
+        self.optimistic = sorted(self.space.excluding(1 << self.index))
 
     def select(self, players, count):
         if self.optimistic:
-            config = random.choice(self.optimistic)
+            config = self.game.random.choice(self.optimistic)
         else:
             assert len(self.pessimistic) > 0
-            config = random.choice(self.pessimistic)
-        return [self] + random.sample(self.getResistance(config), count-1)
+            config = self.game.random.choice(self.pessimistic)
+        return [self] + self.game.random.sample(self.getResistance(config), count-1)
 
-    def _validate(self, config, team, sabotaged, optimistic):
-        spies = [s for s in team if s in self.getSpies(config)]
+    def _validate(self, team, sabotaged, optimistic):
+        """Set of the configurations compatible with the sabotages of the team
+        given as a bitmask."""
         if optimistic:
-            return len(spies) == sabotaged
+            return self.space.exactly(team, sabotaged)
         else:
-            return len(spies) >= sabotaged
+            return self.space.at_least(team, sabotaged)
 
     def vote(self, team): 
         # Determine if this is an acceptable thing to vote for...
         def acceptable(configurations, optimistic):
-            current = [c for c in configurations if self._validate(c, team, 0, optimistic)]
-            return bool(len(current) > 0)
+            return not self._validate(mask(team), 0, optimistic).isdisjoint(configurations)
 
         # Try our best-case options first, otherwise fall back...
         if self.optimistic:
@@ -152,14 +138,14 @@ class Bounder(Simpleton):
         elif self.pessimistic:
             return acceptable(self.pessimistic, False)
         else:
-            return random.choice([True, False])
+            return self.game.random.choice([True, False])
 
     def onMissionComplete(self, sabotaged):
         if self.spy:
             return
 
-        self.optimistic = [c for c in self.optimistic if self._validate(c, self.game.team, sabotaged, True)]
-        self.pessimistic = [c for c in self.pessimistic if self._validate(c, self.game.team, sabotaged, False)]
+        self.optimistic = sorted(self._validate(self.game.team_mask, sabotaged, True).intersection(self.optimistic))
+        self.pessimistic = sorted(self._validate(self.game.team_mask, sabotaged, False).intersection(self.pessimistic))
 
     def sabotage(self):
         return True
@@ -179,7 +165,7 @@ class Logicalton(Bot):
         # As a spy, pick myself and others who are not spies.
         if self.spy:
             others = [p for p in players if p not in self.spies]
-            return [self] + random.sample(others, count-1)
+            return [self] + self.game.random.sample(others, count-1)
 
         team = []
         # If there was a previously selected successful team, pick it! 
@@ -197,7 +183,7 @@ class Logicalton(Bot):
 
     def _sample(self, selected, candidates, count):
         while True:
-            selection = selected + random.sample(candidates, count)
+            selection = selected + self.game.random.sample(candidates, count)
             if self._discard(selection):
                 continue
             return selection
@@ -1,4 +1,3 @@
-import random
 from collections import defaultdict
 
 from player import Bot 
@@ -65,10 +64,6 @@ class Statistician(Bot):
     def onGameRevealed(self, players, spies):
         self.spies = spies
         self.players = players
-
-        self.missions = []
-        self.selections = []
-        self.votes = []
         self.local_statistics = defaultdict(LocalStatistics)
 
     def select(self, players, count):
@@ -84,7 +79,7 @@ class Statistician(Bot):
     def _roulette(self, candidates):
         total = sum([c[1] for c in candidates])
         current = 0.0
-        threshold = random.uniform(0.0, total)
+        threshold = self.game.random.uniform(0.0, total)
         for c in candidates:
             current += c[1]
             if current >= threshold:
@@ -92,9 +87,6 @@ class Statistician(Bot):
         assert False, "Could not perform roulete wheel selection."
 
     def vote(self, team):
-        # Store this for later once we know the spies.
-        self.selections.append((self.game.leader, team))
-
         # Hard coded if spy, could use statistics to check what to do best!
         if self.spy:
             return len([p for p in team if p in self.spies]) > 0
@@ -110,8 +102,6 @@ class Statistician(Bot):
         return self.spy
 
     def onMissionComplete(self, sabotaged):
-        # Store this information for later once we know the spies.
-        self.missions.append((self.game.team[:], sabotaged))
         if self.spy:
             return
 
@@ -126,9 +116,6 @@ class Statistician(Bot):
             self.local_statistics[p.name].update(probability)
     
     def onVoteComplete(self, votes):
-        # Step 2) Store.
-        self.votes.append((votes, self.game.team[:]))
-
         # Based on the voting, we can do many things:
         #   - Infer the probability of spies being on the team.
         #   - Infer the probability of spies being the voters.
@@ -194,8 +181,19 @@ class Statistician(Bot):
 
 
     def onGameComplete(self, win, spies):
-        for team, sabotaged in self.missions:
-            suspects = [p for p in team if p in spies]
+        # The teams, votes and sabotages of the whole game are in its history,
+        # now that we know the spies.
+        history = self.game.history
+        players = self.game.players
+
+        def members(team):
+            return [p for p in players if team >> p.index & 1]
+
+        for team, sabotaged in zip(history.teams, history.sabotages):
+            # Teams that were voted down didn't go on a mission.
+            if sabotaged is None:
+                continue
+            suspects = [p for p in members(team) if p in spies]
             # No spies on this mission to update statistics.
             if len(suspects) == 0:
                 continue
@@ -204,28 +202,30 @@ class Statistician(Bot):
             for p in suspects:
                 self.store(p, 'spy_Sabotage', float(sabotaged) / float(len(suspects)))
 
-        for leader, team in self.selections:
-            suspects = [p for p in team if p in spies]
+        for leader, team in zip(history.leaders, history.teams):
+            suspects = [p for p in members(team) if p in spies]
+            leader = players[leader]
             if leader in spies:
                 self.store(leader, 'spy_PicksSpy', int(len(suspects) > 0))
-                self.store(leader, 'spy_PicksSelf', int(leader in team))
+                self.store(leader, 'spy_PicksSelf', team >> leader.index & 1)
             else:
                 self.store(leader, 'res_PicksSpy', int(len(suspects) > 0))
-                self.store(leader, 'res_PicksSelf', int(leader in team))
+                self.store(leader, 'res_PicksSelf', team >> leader.index & 1)
 
-        for votes, team in self.votes:
-            spied = len([p for p in team if p in spies]) > 0
-            for p, v in zip(self.game.players, votes):
+        for votes, team in zip(history.votes, history.teams):
+            spied = len([p for p in members(team) if p in spies]) > 0
+            for p in players:
+                v = votes >> p.index & 1
                 if spied:
                     if p in self.spies:
-                        self.store(p, 'spy_VotesForSpy', int(v))
+                        self.store(p, 'spy_VotesForSpy', v)
                     else:
-                        self.store(p, 'res_VotesForSpy', int(v))
+                        self.store(p, 'res_VotesForSpy', v)
                 else:
                     if p in self.spies:
-                        self.store(p, 'spy_VotesForRes', int(v))
+                        self.store(p, 'spy_VotesForRes', v)
                     else:
-                        self.store(p, 'res_VotesForRes', int(v))
+                        self.store(p, 'res_VotesForRes', v)
 
     def store(self, player, attribute, value):
         self.global_statistics[player.name].__dict__[attribute].sample(value)
@@ -1,6 +1,13 @@
 from player import Bot 
 from game import State
-import random
+import logging
+import operator
+import datasets
+
+# Columns of the feature vectors, in the order they're logged and recorded.
+COLUMNS = ["Turn","Try","PlayerID","PlayerName","MissionsBeenOn","FailedMissionsBeenOn","WonAsRes","WonAsSpy",
+           "MissionSuccess","MissionPassedAsSpy","VotedUp0","VotedUp1","VotedUp2","VotedUp3","VotedUp4","VotedUp5",
+           "VotedDown0","VotedDown1","VotedDown2","VotedDown3","VotedDown4","VotedDown5","Spy"]
 
 class LoggerBot(Bot):
 
@@ -8,7 +15,7 @@ class LoggerBot(Bot):
     # We're not really trying to win here, but just to observer the other players
     # without disturbing them too much....
     def select(self, players, count):
-        return [self] + random.sample(self.others(), count - 1)
+        return [self] + self.game.random.sample(self.others(), count - 1)
 
     def vote(self, team):
         return True
@@ -16,6 +23,21 @@ class LoggerBot(Bot):
     def sabotage(self):
         return True
         
+    # The missions of each player are counted by the game's history, these
+    # views keep the dictionaries keyed by player that the features use.
+    @property
+    def missions_been_on(self):
+        return dict(zip(self.game.players, self.game.history.missions))
+
+    @property
+    def failed_missions_been_on(self):
+        return dict(zip(self.game.players, self.game.history.failures))
+
+    @property
+    def mission_success(self):
+        history = self.game.history
+        return dict(zip(self.game.players, map(operator.sub, history.missions, history.failures)))
+
     def mission_total_suspect_count(self, team):
         total_suspect_count = 0
         for player in team:
@@ -35,25 +57,19 @@ class LoggerBot(Bot):
         """
          # TODO complete this function
     def onGameRevealed(self, players, spies):
-        self.failed_missions_been_on = {}
-        self.missions_been_on = {}
         self.num_missions_voted_up_with_total_suspect_count = {}
         self.num_missions_voted_down_with_total_suspect_count = {}
         #self.failed_missions_leadered = {}
         self.won_as_res={}
         self.won_as_spy={}
-        self.mission_success={}
         self.missions_passed_as_spy={}
         for player in players:
-            self.failed_missions_been_on[player] = 0
-            self.missions_been_on[player] = 0
             self.num_missions_voted_up_with_total_suspect_count[player] = [0, 0, 0, 0, 0, 0]
             self.num_missions_voted_down_with_total_suspect_count[player] = [0, 0, 0, 0, 0, 0]
             #self.failed_missions_leadered[player] = 0
             self.won_as_res[player]=0
             self.won_as_spy[player]=0
             self.missions_passed_as_spy[player]=0
-            self.mission_success[player]=0
         self.training_feature_vectors={}
         for p in players:
             self.training_feature_vectors[p]=[] # This is going to be a list of length-14 feature vectors for each player.
@@ -64,19 +80,13 @@ class LoggerBot(Bot):
         """
         # TODO complete this function
     def onMissionComplete(self, num_sabotages):
-        for player in self.game.team:
-            self.missions_been_on[player] += 1
-            if num_sabotages > 0:
-                self.failed_missions_been_on[player] += 1
-                """if player == self.game.leader:
-                    self.failed_missions_leadered[player] += 1"""
-            else:
-                self.mission_success[player]+=1
         """Callback once the players have been chosen.
         @param num_sabotages    Integer how many times the mission was sabotaged.
         """
         # TODO complete this function
     def onGameComplete(self, win, spies):
+        # Rows recorded in data/<name>.rows if that folder exists, see datasets.load() to read them back.
+        sink=datasets.sink(self.name, COLUMNS, text=["PlayerName"])
         for player_number in range(len(self.game.players)):
             p=self.game.players[player_number]
             spy=p in spies # This will be a boolean
@@ -95,5 +105,7 @@ class LoggerBot(Bot):
             feature_vectors=self.training_feature_vectors[p]  # These are our input features
             for v in feature_vectors:
                 v.append(1 if spy else 0)  # append a 1 or 0 onto the end of our feature vector (for the label, i.e. spy or not spy)
-                self.log.debug(','.join(map(str, v)) ) # converts all of elements of v into a csv list, and writes the full csv list to the log file
+                sink.append(v)
+                if self.log.isEnabledFor(logging.DEBUG): # skip building the csv line when logging is off
+                    self.log.debug(','.join(map(str, v)) ) # converts all of elements of v into a csv list, and writes the full csv list to the log file
 
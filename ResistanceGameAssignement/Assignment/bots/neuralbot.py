@@ -1,35 +1,40 @@
-from player import Bot 
+from player import Bot, cached
+from core import override
 from game import State
 import random
 
 # to run this python3 competition.py 1000 bots/beginners.py bots/neuralbot.py
 
-import tensorflow as tf
-from tensorflow import keras
-model = keras.models.load_model('bots/loggerbot_classifier')
-import numpy as np
+# The classifier's weights are exported from bots/loggerbot_classifier with tools/export_classifier.py,
+# and evaluated with NumPy, which is much faster than calling the keras model and doesn't need TensorFlow.
+from classifier import Classifier
+import batching
+model = Classifier.load()
+# Rows of the concurrent games are run as one batch when games are interleaved, otherwise this calls the model directly.
+infer = batching.Batcher(model.probabilities)
 import sys
 
 from loggerbot import LoggerBot # this assumes our loggerbot was in a file called loggerbot.py
 
 class NeuralBot(LoggerBot):
 
+    @cached # The probabilities are computed at most once per version of the State, see player.cached.
     def calc_player_probabilities_of_being_spy(self):
-        # This loop could be made much more efficient if we push all player's input patterns
-        # through the neural network at once, instead of pushing them through one-by-one
-        probabilities={}
+        # All the player's input patterns are pushed through the neural network at once,
+        # one per row, instead of pushing them through one-by-one.
+        vectors=[]
         for p in self.game.players:
             # This list comprising the input vector must build in **exactly** the same way as
             # we built data to train our neural network - otherwise the neural network
             # is not bieng used to approximate the same function it's been trained to model.
             # That's why this class inherits from the class LoggerBot- so we can ensure that logic is replicated exactly.
-            input_vector=[self.game.turn, self.game.tries, p.index, p.name, self.missions_been_on[p], self.failed_missions_been_on[p]]+self.num_missions_voted_up_with_total_suspect_count[p]+self.num_missions_voted_down_with_total_suspect_count[p]
-            input_vector=input_vector[4:] # remove the first 4 cosmetic details, as we did when training the neural network
-            input_vector=np.array(input_vector).reshape(1,-1) # change it to a rank-2 numpy array, ready for input to the neural network.
-            output=model(input_vector) # run the neural network
-            output_probabilities=tf.nn.softmax(output,axis=1) # The neural network didn't have a softmax on the final layer, so I'll add the softmax step here manually.
-            probabilities[p]=output_probabilities[0,1] # this [0,1] pulls off the first row (since there is only one row) and the second column (which corresponds to probability of being a spy; the first column is the probability of being not-spy)
-        return probabilities# This returns a dictionary of {player: spyProbability}
+            input_vector=[self.game.turn, self.game.tries, p.index, p.name, self.missions_been_on[p], self.failed_missions_been_on[p],
+                          self.won_as_res[p],self.won_as_spy[p],self.mission_success[p],self.missions_passed_as_spy[p]]+\
+                         self.num_missions_voted_up_with_total_suspect_count[p]+self.num_missions_voted_down_with_total_suspect_count[p]
+            vectors.append(input_vector[4:]) # remove the first 4 cosmetic details, as we did when training the neural network
+        output_probabilities=infer(vectors) # run the neural network, including the softmax the last layer doesn't have.
+        # The second column is the probability of being a spy; the first column is the probability of being not-spy.
+        return dict(zip(self.game.players, output_probabilities[:,1])) # This returns a dictionary of {player: spyProbability}
 
     def select(self, players, count):
         # here I'm recplicating logic we used in the CountingBot exercise of lab1-challenge3.
@@ -67,6 +72,7 @@ class NeuralBot(LoggerBot):
     # This function used to output log data to the log file. 
     # We don't need to log any data any more so let's override that function
     # and make it do nothing...
+    @override
     def onGameComplete(self, win, spies):
         pass
 
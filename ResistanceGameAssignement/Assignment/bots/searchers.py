@@ -0,0 +1,219 @@
+import math
+import time
+import random
+
+import beliefs
+import hypotheses
+import simulator
+from masks import POPCOUNT, mask
+from player import Bot
+from game import BaseGame
+
+
+# Teams of each size that include the leader at each seat, as bitmasks.
+SELECTIONS = [dict((k, [t for t in simulator.TEAMS[k] if t >> leader & 1]) for k in simulator.TEAMS)
+              for leader in range(simulator.PLAYERS)]
+
+EVERYONE = (1 << simulator.PLAYERS) - 1
+
+
+def votes(position):
+    """Votes of all the players according to the rollout model, as a bitmask:
+    on the last try the resistance approves and the spies reject; otherwise
+    the spies support teams with spies, and the resistance supports teams
+    they are on or picked themselves."""
+    resistance = EVERYONE & ~position.spies
+    if position.tries == BaseGame.MAX_TRIES:
+        return resistance
+    team, spies = position.team, position.spies
+    return resistance & (team | 1 << position.leader) | (spies if team & spies else 0)
+
+
+def playout(position, random, sabotage = 0.9):
+    """Final position after playing the rest of the game with a simple model
+    of typical bots: leaders pick themselves and others at random, the votes
+    follow votes() and each mission with spies fails with the probability
+    `sabotage`.  Like simulator.rollout(), it plays on local integers."""
+    phase, turn, tries, wins, losses, leader, team, vote_mask, sabotages, spies, actor = position
+    if phase == simulator.OVER:
+        return position
+    resistance = EVERYONE & ~spies
+    choice, uniform = random.choice, random.random
+
+    # Finish the current round with the decisions left in it.
+    if phase == simulator.MISSION:
+        approved = True
+        failed = sabotages > 0 or (team & spies & ~((1 << actor) - 1) and uniform() < sabotage)
+    else:
+        if phase == simulator.SELECTION:
+            team = choice(SELECTIONS[leader][simulator.PARTICIPANTS[turn - 1]])
+            vote_mask, actor = 0, 0
+        if tries == BaseGame.MAX_TRIES:
+            votes = resistance
+        else:
+            votes = resistance & (team | 1 << leader) | (spies if team & spies else 0)
+        votes = vote_mask & ((1 << actor) - 1) | votes & ~((1 << actor) - 1)
+        approved = POPCOUNT[votes] > 2
+        failed = team & spies and uniform() < sabotage
+
+    while True:
+        if approved:
+            if failed:
+                losses += 1
+            else:
+                wins += 1
+            turn, tries = turn + 1, 1
+        else:
+            tries += 1
+        leader = (leader + 1) % simulator.PLAYERS
+        if tries > BaseGame.MAX_TRIES or turn > BaseGame.MAX_TURNS \
+                or wins >= BaseGame.NUM_WINS or losses >= BaseGame.NUM_LOSSES:
+            return simulator.Position(simulator.OVER, turn, tries, wins, losses, leader, 0, 0, 0, spies, None)
+
+        team = choice(SELECTIONS[leader][simulator.PARTICIPANTS[turn - 1]])
+        if tries == BaseGame.MAX_TRIES:
+            approved = True
+        else:
+            approved = POPCOUNT[resistance & (team | 1 << leader) | (spies if team & spies else 0)] > 2
+        failed = team & spies and uniform() < sabotage
+
+
+class Node(object):
+    """Statistics of a decision in the search tree, shared by all the
+    determinizations where it's legal."""
+
+    __slots__ = ['children', 'visits', 'wins', 'available']
+
+    def __init__(self):
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0         # Games won by the resistance after this decision.
+        self.available = 0      # Visits of the parent where it was legal.
+
+
+class ISMCTS(Bot):
+    """Information-Set Monte Carlo Tree Search over the rules of the game in
+    the simulator module.  Before each decision, the spies are sampled from a
+    Bayesian belief updated from the evidence so far, and the rest of the game
+    is searched in a single tree shared by all these determinizations, with
+    the playout() model of the other bots.
+
+    The search is anytime: it stops after `budget` seconds or `iterations`
+    rollouts, whichever comes first, and returns the most visited decision.
+    Without a time budget the bot plays the same for the same game seed.
+
+    As a strong baseline, it needs about 1000 rollouts per decision, e.g.
+    Configured(ISMCTS, budget=None, iterations=1000).  Over 600 games with
+    RuleFollower, Deceiver, Bayesian and Suspicious, it wins about 10% more
+    games than RuleFollower at any budget from 100 rollouts, but only catches
+    up with Suspicious, the best of them, from 1000 rollouts (54.7% against
+    54.3%, with errors of 4%).  More rollouts don't help against these bots.
+    The default time budget only gives about 500 rollouts on a slow core."""
+
+    budget = 0.02           # Seconds per decision, or None.
+    iterations = None       # Rollouts per decision, or None.
+    exploration = 0.7       # Constant of the UCB formula.
+
+    def onGameRevealed(self, players, spies):
+        self.spies = spies
+        self.spy_mask = mask(spies)
+        space = hypotheses.space(len(players))
+        possible = frozenset([self.spy_mask]) if self.spy else space.excluding(1 << self.index)
+        self.belief = beliefs.Belief(space, possible, beliefs.Behaviour())
+
+    def onTeamSelected(self, leader, team):
+        self.belief.selected(self.game)
+
+    def onVoteComplete(self, votes):
+        self.belief.voted(self.game, votes)
+
+    def onMissionComplete(self, sabotaged):
+        self.belief.sabotaged(self.game, sabotaged)
+
+    def select(self, players, count):
+        team = self.search(lambda spies, generator: simulator.observe(self.game, spies))
+        return [p for p in players if team >> p.index & 1]
+
+    def vote(self, team):
+        def root(spies, generator):
+            # The votes are simultaneous, so those of the players before
+            # this bot are sampled from the model too.
+            position = simulator.observe(self.game, spies)
+            earlier = votes(position) & ((1 << self.index) - 1)
+            return position._replace(votes = earlier, actor = self.index)
+        return self.search(root)
+
+    def sabotage(self):
+        if not self.spy:
+            return False
+
+        def root(spies, generator):
+            position = simulator.observe(self.game, spies)
+            earlier = POPCOUNT[position.team & spies & ((1 << self.index) - 1)]
+            sabotages = sum(generator.random() < 0.9 for _ in range(earlier))
+            return position._replace(sabotages = sabotages, actor = self.index)
+        return self.search(root)
+
+    def search(self, root):
+        """Run the search from the positions built by `root(spies, generator)`
+        for each determinization of the spies, and return the best action of
+        this bot."""
+        # A private generator keeps the game's own sequence of numbers the
+        # same regardless of the number of rollouts.
+        generator = random.Random(self.game.random.getrandbits(32))
+        configurations = self.belief.space.ordered
+        cumulative, total = [], 0.0
+        for w in self.belief.weights:
+            total += w
+            cumulative.append(total)
+
+        tree = Node()
+        deadline = time.time() + self.budget if self.budget is not None else None
+        count = 0
+        while self.iterations is None or count < self.iterations:
+            if deadline is not None and count % 16 == 0 and time.time() >= deadline and count:
+                break
+            spies = generator.choices(configurations, cum_weights = cumulative)[0]
+            self.iterate(tree, root(spies, generator), generator)
+            count += 1
+
+        best = max(sorted(tree.children), key = lambda a: tree.children[a].visits)
+        self.log.debug("Searched %i rollouts, picking %r with %i visits.", count, best, tree.children[best].visits)
+        return best
+
+    def iterate(self, node, position, generator):
+        """Single iteration of the search: descend the tree with the UCB
+        formula for the actor of each decision, expand one new decision, play
+        out the rest of the game, and update the decisions along the path."""
+        path = []
+        while not simulator.over(position):
+            legal = simulator.actions(position)
+            children = node.children
+            untried = [a for a in legal if a not in children]
+            if untried:
+                action = generator.choice(untried)
+                children[action] = Node()
+            else:
+                spy = position.spies >> position.actor & 1
+                action, best = None, -1.0
+                for a in legal:
+                    child = children[a]
+                    mean = child.wins / child.visits
+                    score = (1.0 - mean if spy else mean) + \
+                        self.exploration * math.sqrt(math.log(child.available + 1) / child.visits)
+                    if score > best:
+                        action, best = a, score
+            for a in legal:
+                if a in children:
+                    children[a].available += 1
+
+            node = children[action]
+            path.append(node)
+            position = simulator.step(position, action)
+            if untried:
+                break
+
+        won = simulator.won(playout(position, generator))
+        for node in path:
+            node.visits += 1
+            node.wins += won
@@ -1,4 +1,3 @@
-import random
 import itertools
 
 from game import State
@@ -27,7 +26,7 @@ class StateChecker(Bot):
 
     def select(self, players, count):
         assert not self.game.team
-        return random.sample(players, count)
+        return self.game.random.sample(players, count)
 
     def onTeamSelected(self, leader, team):
         assert self.state.leader == leader
@@ -41,7 +40,7 @@ class StateChecker(Bot):
 
     def vote(self, team):
         assert self.state.team == team
-        return random.choice([True, False])
+        return self.game.random.choice([True, False])
 
     def onVoteComplete(self, votes):
         self.state.votes = votes
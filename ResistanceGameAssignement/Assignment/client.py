@@ -2,9 +2,11 @@ import logging
 from twisted.words.protocols import irc
 from twisted.internet import reactor, protocol
 
+import masks
 from competition import getCompetitors
 from player import Player
 from game import State
+from history import History
 
 
 class ResistanceLogger(logging.Handler):
@@ -78,6 +80,7 @@ class ResistanceClient(object):
         for p in players.split(' ')[1:]:
             participants.append(self.makePlayer(p.rstrip(',')))
         bot.game.players = participants
+        bot.game.history = History(len(participants))
 
         # SPIES 1-Deceiver.
         saboteurs = set()
@@ -87,7 +90,8 @@ class ResistanceClient(object):
             bot.game.spies = saboteurs
 
         bot.onGameRevealed(participants, saboteurs)
-        bot.getSpieN(saboteurs)
+        bot.game.version += 1
+        bot.getSpiesN(saboteurs)
 
     def process_MISSION(self, mission, leader):
         bot = self.getBot()
@@ -102,8 +106,11 @@ class ResistanceClient(object):
 
         state.phase = 1
         state.team = None
+        state.team_mask = 0
         state.votes = None
+        state.vote_mask = 0
         state.sabotages = None
+        state.version += 1
 
         bot.onMissionAttempt(state.turn, state.tries, state.leader)
 
@@ -118,8 +125,11 @@ class ResistanceClient(object):
         # VOTE 1-Random, 2-Hippie, 3-Paranoid.
         bot = self.getBot()
         bot.game.team = self.makeTeam(team)        
+        bot.game.team_mask = masks.mask(bot.game.team)
+        bot.game.version += 1
         bot.onTeamSelected(bot.game.leader, bot.game.team)
         bot.game.phase = 2
+        bot.game.version += 1
         result = bot.vote(bot.game.team)
         reply = {True: "Yes", False: "No"}
         self.reply('VOTED %s.' % (reply[result]))
@@ -128,11 +138,18 @@ class ResistanceClient(object):
         bot = self.getBot()
         v = [bool(b.strip(',.') == 'Yes') for b in votes.split(' ')[1:]]
         bot.game.votes = v
+        bot.game.vote_mask = masks.votes(v)
+        bot.game.version += 1
         bot.onVoteComplete(v)        
+        # A team voted down is only added to the history once the bots saw the votes.
+        if masks.POPCOUNT[bot.game.vote_mask] <= 2:
+            self.record(bot.game, None)
+            bot.game.version += 1
 
     def process_SABOTAGE(self, sabotage):
         bot = self.getBot()
         bot.game.phase = 3
+        bot.game.version += 1
         result = bot.spy and bot.sabotage()
         reply = {True: "Yes", False: "No"}
         self.reply('SABOTAGED %s.' % (reply[result]))
@@ -147,6 +164,8 @@ class ResistanceClient(object):
             bot.game.losses += 1
 
         bot.game.sabotages = sabotaged
+        self.record(bot.game, sabotaged)
+        bot.game.version += 1
         bot.onMissionComplete(sabotaged)
 
         bot.game.turn += 1
@@ -159,6 +178,7 @@ class ResistanceClient(object):
         w = bool(result.split(' ')[1] == 'Yes')
         s = self.makeTeam(spies) if spies else bot.game.spies
 
+        bot.game.version += 1
         bot.onGameComplete(w, s)
         self.protocol.part(self.channel)
         del self.bots[self.channel]
@@ -178,12 +198,18 @@ class ResistanceClient(object):
 
         bot = self.getBot()
         bot.game.phase = 4
+        bot.game.version += 1
         ann = bot.announce()
         if ann:
             self.reply("ANNOUNCED %s." % (', '.join([bake(*a) for a in ann.items()])))
         else:
             self.reply("ANNOUNCED.")
 
+    def record(self, state, sabotaged):
+        """Add the current attempt to the history, like BaseGame.record()."""
+        state.history = state.history.append(state.turn, state.tries, state.leader.index,
+                                             state.team_mask, state.vote_mask, sabotaged)
+
     def makeTeam(self, team):
         return set([self.makePlayer(t.strip('., ')) for t in team.split(' ')[1:]])
 
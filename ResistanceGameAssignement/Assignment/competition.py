@@ -3,17 +3,25 @@
 from __future__ import print_function
 
 import multiprocessing
+import multiprocessing.util
 import collections
 import itertools
 import importlib
+import functools
 import random
+import json
 import math
 import sys
 import os
 
+import botlog
+import batching
+import datasets
+import lockstep
 from player import Bot
-from game import Game
+from game import Game, Validation, FULL_VALIDATION
 from util import Variable
+from store import GameStore, lineup, version
 
 
 class CompetitionStatistics:
@@ -42,6 +50,17 @@ class CompetitionStatistics:
             v += other.__dict__[k]
         return self
 
+    def encode(self):
+        """Compact JSON-compatible form of the variables that were sampled."""
+        return dict([(k, [v.total, v.samples]) for k, v in self.__dict__.items() if v.samples])
+
+    @classmethod
+    def decode(cls, data):
+        s = cls()
+        for k, (total, samples) in data.items():
+            s.__dict__[k] = Variable(total, samples)
+        return s
+
 
 class CompetitionRound(Game):
 
@@ -96,14 +115,134 @@ class CompetitionRound(Game):
                 s.resSelected.sample(int(bot in team))
 
 
-def setup():
+_tallies = {}
+
+
+def tally(spies, leader, team, votes):
+    """Samples of the statistics for one selection and vote, as a list of
+    (seat, variable, value), the same as CompetitionRound would collect."""
+    try:
+        return _tallies[spies, leader, team, votes]
+    except KeyError:
+        pass
+
+    result = []
+    # Selection by the leader, see CompetitionRound.onPlayerSelected().
+    if spies >> leader & 1:
+        result.append((leader, 'spySelection', int(bool(team & spies))))
+    else:
+        result.append((leader, 'resSelection', int(not team & spies)))
+    for i in range(5):
+        result.append((i, 'spySelected' if spies >> i & 1 else 'resSelected', team >> i & 1))
+
+    # Votes of each player, see CompetitionRound.onPlayerVoted().
+    for seat in range(5):
+        vote = votes >> seat & 1
+        if spies >> seat & 1:
+            if team & spies:
+                result.append((seat, 'spyVotesRes', vote))
+            else:
+                result.append((seat, 'spyVotesSpy', 1 - vote))
+            continue
+
+        if not team & spies:
+            result.append((seat, 'resVotesRes', vote))
+        else:
+            result.append((seat, 'resVotesSpy', 1 - vote))
+        for i in range(5):
+            if team >> i & 1:
+                result.append((i, 'spyVoted' if spies >> i & 1 else 'resVoted', vote))
+
+    _tallies[spies, leader, team, votes] = result
+    return result
+
+
+class CompetitionBatch(lockstep.Batch):
+    """Statistics of games played in lockstep, the same as CompetitionRound
+    would collect for each of the games.  Only the selections and votes are
+    recorded while playing, and they're turned into statistics once merged,
+    as the same ones come up in many games."""
+
+    def __init__(self, selections):
+        super(CompetitionBatch, self).__init__(selections)
+        self.events = [[] for _ in range(self.size)]
+
+    def onVoteComplete(self, g, leader, team, votes):
+        self.events[g].append((leader, team, votes))
+
+    def statistics(self, games):
+        """Statistics per bot name merged over the given games."""
+        events, results = collections.Counter(), collections.Counter()
+        for g in games:
+            names, spies = self.names[g], self.spies[g]
+            for e in self.events[g]:
+                events[(names, spies) + e] += 1
+            results[names, spies, self.won(g)] += 1
+
+        totals, samples = collections.Counter(), collections.Counter()
+        for (names, spies, leader, team, votes), n in events.items():
+            for seat, variable, value in tally(spies, leader, team, votes):
+                key = names[seat], variable
+                totals[key] += value * n
+                samples[key] += n
+        for (names, spies, won), n in results.items():
+            for i, name in enumerate(names):
+                if spies >> i & 1:
+                    key, value = (name, 'spyWins'), int(not won)
+                else:
+                    key, value = (name, 'resWins'), int(won)
+                totals[key] += value * n
+                samples[key] += n
+
+        statistics = collections.defaultdict(CompetitionStatistics)
+        for (name, variable), count in samples.items():
+            statistics[name].__dict__[variable] = Variable(float(totals[name, variable]), count)
+        return statistics
+
+
+class Configured(object):
+    """Picklable constructor for bots that sets the given attributes on each
+    instance, so the same bot class can play with different parameters in
+    the same process, e.g. Configured(RandomCheater, res_ratio=0.5)."""
+
+    def __init__(self, cls, **attributes):
+        self.cls = cls
+        self.attributes = attributes
+        self.__name__ = cls.__name__
+
+    def __call__(self, game, index, spy):
+        bot = self.cls(game, index, spy)
+        bot.__dict__.update(self.attributes)
+        return bot
+
+
+# Policy for checking the data returned by bots in games of this process.
+VALIDATION = FULL_VALIDATION
+
+
+def configure(validation):
+    global VALIDATION
+    VALIDATION = validation or FULL_VALIDATION
+
+
+def setup(validation = None, log = 'debug'):
     import signal
     signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure(validation)
 
+    # Each worker writes its own shard of the logs, flushed when it exits.
+    botlog.configure(log, shard = os.getpid())
+    multiprocessing.util.Finalize(None, botlog.stop, exitpriority = 10)
+    datasets.configure(shard = os.getpid())
+    multiprocessing.util.Finalize(None, datasets.stop, exitpriority = 10)
 
-def play(args):
-    (players, roles) = args
-    g = CompetitionRound(players, roles)
+
+def simulate(players, roles, seed = None):
+    # Bots using the global random module are also made deterministic, as
+    # each game is played from start to finish within a single process.
+    if seed is not None:
+        random.seed(seed)
+    g = CompetitionRound(players, roles, None, seed, VALIDATION)
     g.channel = None
     g.run()
 
@@ -113,40 +252,224 @@ def play(args):
             s.spyWins.sample(int(not g.won))
         else:
             s.resWins.sample(int(g.won))
-    return g.statistics
+    return g
+
+
+def play(args):
+    return simulate(*args).statistics
+
+
+def play_batch(selections, record = False, interleave = 1, vectorize = True):
+    """Play a chunk of games inside a single worker and merge the statistics
+    locally, so only one block of results is sent back to the parent.  If
+    requested, the results of each game are also returned for storage.
+
+    With `vectorize`, the games between bots that all support it are played
+    in lockstep, see the lockstep module, and the others one by one.
+
+    With `interleave` above one, that many games are played concurrently in
+    threads so the bots can batch their inference across games, see the
+    batching module.  The bundled bots draw from the generator of each game,
+    but the contest bots using the global random module then can't be
+    reproduced from the seeds of the games."""
+    selections = list(selections)
+    statistics = collections.defaultdict(CompetitionStatistics)
+    results = [None] * len(selections)
+    if vectorize:
+        indices = [i for i, (players, _, _) in enumerate(selections) if all(map(lockstep.vectorized, players))]
+        if indices:
+            batch = CompetitionBatch([selections[i] for i in indices])
+            batch.run()
+            if record:
+                for g, i in enumerate(indices):
+                    results[i] = batch.statistics([g]), batch.won(g)
+            else:
+                for p, s in batch.statistics(range(batch.size)).items():
+                    statistics[p] += s
+                for i in indices:
+                    results[i] = {}, None
+
+    indices = [i for i, r in enumerate(results) if r is None]
+    scalar = [selections[i] for i in indices]
+    if interleave > 1:
+        games = batching.interleave(lambda s: simulate(*s), scalar, interleave)
+    else:
+        games = (simulate(*s) for s in scalar)
+    for i, g in zip(indices, games):
+        results[i] = g.statistics, g.won
+
+    records = []
+    for (players, roles, seed), (stats, won) in zip(selections, results):
+        for p, s in stats.items():
+            statistics[p] += s
+        if record:
+            records.append(([p.__name__ for p in players], roles, seed, won,
+                            dict([(p, s.encode()) for p, s in stats.items()])))
+    return len(selections), statistics, records
+
+
+def chunks(iterable, size):
+    """Split the iterable into lists of at most `size` items, lazily."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class GameScheduler(object):
+    """Streams seat and role assignments for games on demand, in constant
+    memory.  Games are generated in blocks of one game per competitor: each
+    block seats a shuffled order of the competitors around the table with a
+    rotation, so every bot plays in every seat exactly once per block.  The
+    roles per seat are fixed within a block and cycle through all ten role
+    permutations every ten blocks, so every bot also plays every seat in every
+    role evenly.  Any game can be looked up by index from the seed alone."""
+
+    ROLES = sorted(set(itertools.permutations([True, True, False, False, False])))
+
+    def __init__(self, competitors, seed = None):
+        self.competitors = list(competitors)
+        self.seed = seed if seed is not None else random.getrandbits(32)
+
+    def block(self, b):
+        """Return the order of competitors and the roles for the block `b`."""
+        order = self.competitors[:]
+        random.Random('%i:block:%i' % (self.seed, b)).shuffle(order)
+
+        cycle = self.ROLES[:]
+        random.Random('%i:roles:%i' % (self.seed, b // len(cycle))).shuffle(cycle)
+        return order, tuple(cycle[b % len(cycle)])
+
+    def game(self, index):
+        """Return the seed of the game with the given index."""
+        return random.Random('%i:game:%i' % (self.seed, index)).getrandbits(32)
+
+    def selection(self, index):
+        """Return the (players, roles, seed) for the game with the given index."""
+        n = len(self.competitors)
+        order, roles = self.block(index // n)
+        j = index % n
+        return tuple(order[(j+k) % n] for k in range(5)), roles, self.game(index)
+
+    def generate(self, start, stop):
+        """Yield the (players, roles, seed) for games in the range [start, stop)."""
+        n = len(self.competitors)
+        if n == 0:
+            return
+
+        b, order, roles = None, None, None
+        for index in range(start, stop):
+            if index // n != b:
+                b = index // n
+                order, roles = self.block(b)
+            j = index % n
+            yield tuple(order[(j+k) % n] for k in range(5)), roles, self.game(index)
 
 
 class CompetitionRunner(object):
 
-    def __init__(self, competitors, rounds, quiet = False):
+    def __init__(self, competitors, rounds, quiet = False, processes = None, chunksize = None, seed = None,
+                 adaptive = False, top = None, interval = 1000, store = None,
+                 checkpoint = None, every = 5000, resume = False, validation = None, log = 'debug',
+                 interleave = 1, vectorize = True):
         self.rounds = rounds
         self.quiet = quiet
+        self.played = 0
         self.statistics = collections.defaultdict(CompetitionStatistics)
 
+        # In adaptive mode, the ranking is checked every `interval` games and
+        # the competition stops once the order of the bots (or only the `top`
+        # few if specified) is settled.  Until then, games are focused on the
+        # bots that are still too close to call.
+        self.adaptive = adaptive
+        self.top = top
+        self.interval = interval
+        # The focused stages play against fewer opponents than the full
+        # schedule, so their statistics are kept apart per set of bots and
+        # only used to compare the bots that played in them.
+        self.stages = {}
+
+        # Number of worker processes, defaulting to all the cores available.
+        # With a single process the games are played in this process instead.
+        self.processes = processes or multiprocessing.cpu_count()
+        # Games played by each worker per task, so there are a few tasks per
+        # worker to balance the load without too much IPC.
+        batch = min(rounds, interval) if adaptive else rounds
+        self.chunksize = chunksize or max(1, min(250, batch // (self.processes * 4)))
+        self.pool = None
+        # Policy for checking the decisions of the bots, all of them by default.
+        self.validation = validation
+        # Level of the bots' logs for this run, or 'off'.
+        self.log = log
+        # Number of games each worker plays concurrently, to batch inference.
+        self.interleave = interleave
+        # Play the games between stock bots in lockstep, unless the scalar
+        # engine is required, e.g. for the logs of those bots.
+        self.vectorize = vectorize
+
         # Make sure there are sufficient entrants if necessary.
         # WARNING: Results in multiple bot instances per game!
         self.competitors = competitors
         while competitors and len(self.competitors) < 5:
             self.competitors.extend(competitors)
 
+        self.scheduler = GameScheduler(self.competitors, seed)
+
+        # Optionally, every game is persisted with the versions of its bots.
+        # Stored games with the same lineup of bots and roles, between bots
+        # that have not changed since, are then merged in place of playing
+        # them again, so mostly the games involving new or modified bots are
+        # actually played.
+        self.store = GameStore(store) if isinstance(store, str) else store
+        self.versions = dict([(c.__name__, version(c)) for c in self.competitors]) if self.store is not None else {}
+
+        # Optionally, the merged statistics and the position in the schedule
+        # are saved to disk every few games, so an interrupted competition can
+        # be resumed exactly where it stopped.
+        self.checkpoint = checkpoint
+        self.every = every
+        self.saved = 0
+        if checkpoint and (adaptive or self.store is not None):
+            raise ValueError("Checkpoints are only supported for the standard schedule of games.")
+        if resume:
+            self.load()
+
     def listGameSelections(self):
-        """Evaluate all bots in all possible permutations!  If there are more
-        games requested, randomly fill up from a next round of permutations."""
-        if not self.competitors: raise StopIteration 
-
-        p = []
-        r = set(itertools.permutations([True, True, False, False, False]))
-        for players in itertools.permutations(self.competitors, 5):
-            for roles in r:
-                p.append((players, roles))
-
-        permutations = []
-        while len(permutations) < self.rounds:
-            random.shuffle(p)
-            permutations.extend(p)
-        
-        for players, roles in permutations[:self.rounds]:
-            yield (players, roles)
+        """Evaluate all bots evenly in all seats and roles, streaming the games
+        from the scheduler rather than building all permutations up front."""
+        return self.scheduler.generate(self.played, self.rounds)
+
+    def replay(self, index):
+        """Play again the game with the given index in the schedule, e.g. to
+        debug an anomalous game, returning the finished CompetitionRound."""
+        return simulate(*self.scheduler.selection(index))
+
+    def save(self):
+        """Write a checkpoint of the competition to disk, atomically."""
+        data = {'seed': self.scheduler.seed,
+                'rounds': self.rounds,
+                'competitors': [c.__name__ for c in self.competitors],
+                'played': self.played,
+                'statistics': dict([(p, s.encode()) for p, s in self.statistics.items()])}
+        temporary = self.checkpoint + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(data, f)
+        os.replace(temporary, self.checkpoint)
+        self.saved = self.played
+
+    def load(self):
+        """Restore the statistics and the schedule from the checkpoint."""
+        with open(self.checkpoint) as f:
+            data = json.load(f)
+        if data['competitors'] != [c.__name__ for c in self.competitors]:
+            raise ValueError("The checkpoint was saved for different competitors: %s." % ', '.join(data['competitors']))
+
+        self.scheduler = GameScheduler(self.competitors, data['seed'])
+        self.played = self.saved = data['played']
+        for p, s in data['statistics'].items():
+            self.statistics[p] = CompetitionStatistics.decode(s)
 
     def main(self):
         names = [bot.__name__ for bot in self.competitors]
@@ -157,22 +480,202 @@ class CompetitionRunner(object):
         if not self.quiet:
             print("Running competition with %i bots." % (len(self.competitors)), file=sys.stderr)
 
+        if self.processes != 1:
+            self.pool = multiprocessing.Pool(self.processes, setup, (self.validation, self.log))
+        else:
+            configure(self.validation)
+            botlog.configure(self.log)
+        try:
+            if self.adaptive:
+                self.runAdaptive()
+            else:
+                self.run(self.listGameSelections())
+            if self.pool is not None:
+                # Let the workers exit normally so their logs are flushed.
+                self.pool.close()
+                self.pool.join()
+        finally:
+            if self.pool is not None:
+                self.pool.terminate()
+                self.pool.join()
+                self.pool = None
+                botlog.merge(botlog.FOLDER)
+            botlog.stop()
+            datasets.stop()
+
+    def run(self, selections, statistics = None):
+        """Play all the given games, in batches over the worker processes, and
+        merge the statistics as they come back, into those of the competition
+        unless other `statistics` are given."""
+        if statistics is None:
+            statistics = self.statistics
+        reused = collections.defaultdict(CompetitionStatistics), []
+        if self.store is not None:
+            selections = self.reuse(selections, *reused)
+
+        function = functools.partial(play_batch, record = self.store is not None, interleave = self.interleave,
+                                     vectorize = self.vectorize)
+        batches = chunks(selections, self.chunksize)
+        if self.pool is None:
+            results = map(function, batches)
+        elif self.checkpoint:
+            # Results must come back in order for the checkpoint to match a
+            # position in the schedule.
+            results = self.pool.imap(function, batches)
+        else:
+            results = self.pool.imap_unordered(function, batches)
+
+        for count, stats, records in results:
+            for p, s in stats.items():
+                statistics[p] += s
+            if records:
+                self.store.add(records, self.versions)
+
+            for i in range(self.played, self.played + count):
+                self.progress(i)
+            self.played += count
+
+            if self.checkpoint and self.played - self.saved >= self.every:
+                self.save()
+
+        if self.checkpoint:
+            self.save()
+
+        # Stored games are merged once all the others have been played, as
+        # they were collected from the thread feeding the workers.
+        stored, games = reused
+        for p, s in stored.items():
+            statistics[p] += s
+        self.played += len(games)
+        if games and not self.quiet:
+            print("\nReused %i stored games." % (len(games)), file=sys.stderr)
+
+    def reuse(self, selections, statistics, games):
+        """Filter out the games with a valid stored game for the same lineup
+        of bots and roles, each stored game being used at most once, so only
+        the games missing for each lineup are topped up.  The store is queried
+        for each lineup the first time it is scheduled, and the stored
+        statistics are merged into `statistics`."""
+        until = self.store.last()
+        stored = {}
+
+        def filtered():
+            db = self.store.connect()
+            try:
+                for players, roles, seed in selections:
+                    key = lineup([p.__name__ for p in players], roles)
+                    if key not in stored:
+                        stored[key] = collections.deque(self.store.games(db, self.versions, key, until))
+                    matches = stored[key]
+                    if matches:
+                        i, won, encoded = matches.popleft()
+                        for p, s in encoded.items():
+                            statistics[p] += CompetitionStatistics.decode(s)
+                        games.append(i)
+                        continue
+                    yield players, roles, seed
+            finally:
+                db.close()
+        return filtered()
+
+    def runAdaptive(self):
+        """Play games in stages until the ranking is settled or the budget of
+        games runs out.  After the first stage, only the bots involved in pairs
+        that can't be separated yet are scheduled, along with their closest
+        neighbors in the ranking to fill up the table."""
+        offset, scheduler = 0, self.scheduler
+        while self.played < self.rounds:
+            count = min(self.interval, self.rounds - self.played)
+            if scheduler is self.scheduler:
+                self.run(scheduler.generate(offset, offset + count))
+                offset += count
+            else:
+                names = frozenset([c.__name__ for c in scheduler.competitors])
+                stage = self.stages.setdefault(names, collections.defaultdict(CompetitionStatistics))
+                self.run(scheduler.generate(0, count), stage)
+
+            pairs = self.unsettled()
+            if not pairs:
+                if not self.quiet:
+                    print("\nRanking settled after %i games." % (self.played), file=sys.stderr)
+                break
+            scheduler = self.focus(pairs) or self.scheduler
+
+    def compare(self, a, b):
+        """Difference between the win rates of the bots `a` and `b` with its
+        margin of error, combining the full schedule and each focused stage
+        that included both bots, weighted by the inverse of their squared
+        margins.  With the full schedule alone, the margin is the sum of the
+        errors of both bots, so the difference is significant exactly when
+        their confidence intervals don't overlap."""
+        stages = [self.statistics] + [s for names, s in self.stages.items() if a in names and b in names]
+        difference, weights = 0.0, 0.0
+        for statistics in stages:
+            ta, tb = statistics[a].total(), statistics[b].total()
+            weight = 1.0 / (ta.error() + tb.error()) ** 2
+            difference += weight * (ta.value() - tb.value())
+            weights += weight
+        return difference / weights, 1.0 / math.sqrt(weights)
+
+    def ranking(self):
+        """Names of the bots from best to worst, by their win rates in the
+        full schedule, with adjacent bots swapped when the games of the focused
+        stages show that the lower one is better."""
+        ranked = sorted(self.statistics, key = lambda x: self.statistics[x].total().value(), reverse = True)
+        for _ in range(len(ranked)):
+            swapped = False
+            for i in range(len(ranked) - 1):
+                if self.compare(ranked[i], ranked[i+1])[0] < 0.0:
+                    ranked[i], ranked[i+1] = ranked[i+1], ranked[i]
+                    swapped = True
+            if not swapped:
+                break
+        return ranked
+
+    def unsettled(self):
+        """List the pairs of bots adjacent in the ranking whose difference is
+        still within its margin of error, restricted to the `top` ranks if
+        specified."""
+        ranked = self.ranking()
+        limit = len(ranked) if self.top is None else min(self.top + 1, len(ranked))
+
+        pairs = []
+        for a, b in zip(ranked[:limit-1], ranked[1:limit]):
+            difference, error = self.compare(a, b)
+            if difference <= error:
+                pairs.append((a, b))
+        return pairs
+
+    def focus(self, pairs):
+        """Build a scheduler for games between the bots in the unsettled pairs,
+        or return None if that would include all the competitors anyway."""
+        ranked = self.ranking()
+        focused = set(itertools.chain(*pairs))
+        if len(ranked) < 5 or len(focused) == len(ranked):
+            return None
+
+        # Pad the table with the bots ranked closest to the focused ones.
+        positions = [i for i, name in enumerate(ranked) if name in focused]
+        others = [name for name in ranked if name not in focused]
+        others.sort(key = lambda name: min([abs(ranked.index(name) - i) for i in positions]))
+        names = [name for name in ranked if name in focused] + others[:max(0, 5 - len(focused))]
+
+        bots = dict([(c.__name__, c) for c in self.competitors])
+        seed = random.Random('%i:focus:%i' % (self.scheduler.seed, self.played)).getrandbits(32)
+        return GameScheduler([bots[name] for name in names], seed)
+
+    def progress(self, i):
+        if self.quiet:
+            return
+
         def output(text):
             sys.stdout.write(text)
             sys.stdout.flush()
 
-        n_processes = 1  # multiprocessing.cpu_count()
-        pool = multiprocessing.Pool(n_processes, setup)
-        # pool = itertools
-        for i, stats in enumerate(pool.imap(play, self.listGameSelections())):
-            for p, s in stats.items():
-                self.statistics[p] += s
-
-            if not self.quiet:
-                if (i+1) % 500 == 0:  output('(%02i%%)\n' % (100*(i+1)/self.rounds))
-                elif (i+1) % 125 == 0: output('O')
-                elif (i+1) %  25 == 0: output('o')
-                elif (i+1) %  5 == 0: output('.')
+        if (i+1) % 500 == 0:  output('(%02i%%)\n' % (100*(i+1)/self.rounds))
+        elif (i+1) % 125 == 0: output('O')
+        elif (i+1) %  25 == 0: output('o')
+        elif (i+1) %  5 == 0: output('.')
 
     def echo(self, *args):
         print(' '.join([str(a) for a in args]))
@@ -248,12 +751,53 @@ def getCompetitors(argv):
     return competitors
 
 if __name__ == '__main__':
-    if len(sys.argv) <= 2:
-        print('USAGE: competition.py 10000 (filename|module.BotName) [...]')
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--processes', type=int, required=False, default=None,
+                        help="Number of worker processes, by default all the cores.")
+    parser.add_argument('--chunksize', type=int, required=False, default=None,
+                        help="Number of games each worker plays per batch of results.")
+    parser.add_argument('--adaptive', action='store_true', default=False,
+                        help="Stop early once the ranking is settled, focusing on close bots.")
+    parser.add_argument('--top', type=int, required=False, default=None,
+                        help="In adaptive mode, only settle the ranking of the top bots.")
+    parser.add_argument('--interval', type=int, required=False, default=1000,
+                        help="In adaptive mode, number of games between checks of the ranking.")
+    parser.add_argument('--store', type=str, required=False, default=None,
+                        help="File storing all games, to only replay those of new or modified bots.")
+    parser.add_argument('--seed', type=int, required=False, default=None,
+                        help="Seed for the schedule of games, random by default.")
+    parser.add_argument('--checkpoint', type=str, required=False, default=None,
+                        help="File to periodically save the progress of the competition to.")
+    parser.add_argument('--every', type=int, required=False, default=5000,
+                        help="Number of games between checkpoints.")
+    parser.add_argument('--resume', action='store_true', default=False,
+                        help="Continue the competition from the checkpoint.")
+    parser.add_argument('--validate', type=int, required=False, default=None,
+                        help="Only check the decisions of each bot class in its first games in each worker process.")
+    parser.add_argument('--sample', type=int, required=False, default=0,
+                        help="After those first games, check one game out of this many.")
+    parser.add_argument('--log', choices=sorted(botlog.LEVELS.keys()), required=False, default='debug',
+                        help="Level of the bots' logs in the logs/ folder, or off.")
+    parser.add_argument('--interleave', type=int, required=False, default=1,
+                        help="Number of games each worker plays concurrently, for bots to batch inference.")
+    parser.add_argument('--scalar', action='store_true', default=False,
+                        help="Play all games one by one, including those between stock bots.")
+    args, remaining = parser.parse_known_args()
+
+    if len(remaining) < 2:
+        print('USAGE: competition.py [--processes=N] 10000 (filename|module.BotName) [...]')
         sys.exit(-1)
 
-    competitors = getCompetitors(sys.argv[2:])
-    runner = CompetitionRunner(competitors, int(sys.argv[1]))
+    competitors = getCompetitors(remaining[1:])
+    runner = CompetitionRunner(competitors, int(remaining[0]),
+                               processes = args.processes, chunksize = args.chunksize,
+                               adaptive = args.adaptive, top = args.top, interval = args.interval,
+                               store = args.store, seed = args.seed, checkpoint = args.checkpoint,
+                               every = args.every, resume = args.resume,
+                               validation = Validation(args.validate, args.sample), log = args.log,
+                               interleave = args.interleave, vectorize = not args.scalar)
     print(competitors)
     try:
         runner.main()
@@ -1,4 +1,9 @@
-import collections
+def override(function):
+    """Decorator for observer functions that replace those of the base classes
+    instead of being called after them, for instance to disable a hook, or to
+    call those of the base classes explicitly with super()."""
+    function.__override__ = True
+    return function
 
 
 class Observable(type):
@@ -6,27 +11,59 @@ class Observable(type):
     in derived classes without having to explicitly call the base class.  The
     observers of the base classes are always called before those of the
     specialized classes.
+
+    The root class (i.e. Bot) defines the events as its `on*` functions, which
+    are only placeholders.  When each derived class is created, the observers
+    of all the classes in its MRO, including plain mixins, are compiled into a
+    flat tuple per event, so dispatching is a single loop.
     """
+
     def __new__(cls, name, parents, dct):
-        __hooks__ = collections.defaultdict(list)
-        if name != 'Bot':
-            for (k, v) in dct.items():
-                if not k.startswith('on'):
-                    continue
-                __hooks__[k].append(v)
-                del dct[k]
-            dct['__hooks__'] = __hooks__
+        roots = [p for p in parents if isinstance(p, Observable)]
+        if not roots:
+            dct['__events__'] = tuple(k for k in dct if k.startswith('on') and callable(dct[k]))
+            dct['__hooks__'] = {}
         else:
-            for (k, v) in dct.items():
-                if not k.startswith('on'):
-                    continue
-                def bind(name=k, function=v):
-                    def wrap(self, *args, **kwargs):
-                        for c in reversed(self.__class__.__mro__):                            
-                            if hasattr(c, '__hooks__'):
-                                for m in c.__hooks__.get(name, []):
-                                    m(self, *args, **kwargs)
-                        return function(self, *args, **kwargs)
-                    return wrap
-                dct[k] = bind()
-        return super(Observable, cls).__new__(cls, name, parents, dct)
+            events = roots[0].__events__
+            dct['__hooks__'] = dict((k, dct[k]) for k in events if k in dct)
+        result = super(Observable, cls).__new__(cls, name, parents, dct)
+
+        result.__chains__ = {}
+        for event in result.__events__:
+            chain = result.__chains__[event] = cls.compile(result, event)
+            if roots and chain:
+                setattr(result, event, cls.dispatcher(result, event, chain))
+        return result
+
+    @staticmethod
+    def compile(result, event):
+        """Tuple of the observers for the event, from the base classes first."""
+        chain = []
+        for c in reversed(result.__mro__):
+            if isinstance(c, Observable):
+                hook = c.__dict__['__hooks__'].get(event)
+            elif c is not object:
+                hook = c.__dict__.get(event)
+            else:
+                hook = None
+            if hook is None:
+                continue
+            if getattr(hook, '__override__', False):
+                chain = [hook]
+            else:
+                chain.append(hook)
+        return tuple(chain)
+
+    @staticmethod
+    def dispatcher(result, event, chain):
+        """Function calling all the observers in the chain, or the observer
+        itself if there's only one."""
+        if len(chain) == 1:
+            return chain[0]
+
+        def dispatch(self, *args, **kwargs):
+            for hook in chain:
+                hook(self, *args, **kwargs)
+        dispatch.__name__ = event
+        dispatch.__doc__ = getattr(result, event).__doc__
+        return dispatch
@@ -0,0 +1,248 @@
+"""Columnar datasets of training rows recorded by the bots, for instance the
+feature vectors of LoggerBot, so that millions of rows can be generated and
+loaded back without printing and parsing CSV in the logs.
+
+Rows are fixed-width lists of integers, with strings such as player names
+stored as codes into a table of names.  A sink buffers the rows in a flat
+array and appends them in binary chunks to its file in the data/ folder, if
+it exists.  For competitions, each worker writes its own shard of the files
+(e.g. data/LoggerBot.1234.rows), and the loader reads all the shards back as
+a single array:
+
+    > mkdir data
+    > python competition.py 100000 bots/loggerbot.py bots/intermediates.py
+
+    dataset = datasets.load('LoggerBot')
+    spies = dataset.column('Spy')
+    x = dataset.numpy()[:, 4:22]            # If NumPy is installed.
+"""
+
+import os
+import json
+import glob
+import array
+import atexit
+import threading
+
+
+# Type of the values in the arrays, 32-bit signed integers in native order.
+TYPECODE = 'i'
+
+
+class NullSink(object):
+    """Stand-in for the sink of a bot when the data folder doesn't exist."""
+
+    def append(self, row):
+        pass
+
+    def flush(self):
+        pass
+
+
+NULL = NullSink()
+
+
+class Sink(object):
+    """Buffer of the rows for one file, written out every `capacity` rows.
+    The values of the `text` columns are stored as codes into a table of
+    names, which is appended to a file next to the rows.  When the files
+    already exist, e.g. from an earlier run with the same shard, the rows are
+    appended to them, so the columns must match and the codes continue the
+    table of names already written."""
+
+    def __init__(self, name, columns, text = (), folder = 'data', shard = None, capacity = 4096):
+        self.name = name
+        self.columns = tuple(columns)
+        self.text = tuple(self.columns.index(c) for c in text)
+        self.width = len(self.columns)
+        self.capacity = capacity * self.width
+
+        base = os.path.join(folder, name if shard is None else '%s.%s' % (name, shard))
+        self.filename = base + '.rows'
+        self.namefile = base + '.names'
+        self.header = os.path.join(folder, name + '.columns')
+
+        if os.path.exists(self.header):
+            with open(self.header) as f:
+                header = json.load(f)
+            if header != self.describe():
+                raise ValueError("The columns of %s differ from those in %s." % (name, self.header))
+
+        self.values = array.array(TYPECODE)
+        self.codes, self.count = {}, 0
+        if os.path.exists(self.namefile):
+            with open(self.namefile) as f:
+                for n in f.read().splitlines():
+                    self.codes.setdefault(n, self.count)
+                    self.count += 1
+        self.pending = []
+        # Games may be played concurrently in threads, see the batching module.
+        self.lock = threading.Lock()
+
+    def append(self, row):
+        if len(row) != self.width:
+            raise ValueError("Expecting %i values for %s, got %i." % (self.width, self.name, len(row)))
+        with self.lock:
+            if self.text:
+                row = list(row)
+                for i in self.text:
+                    row[i] = self.encode(row[i])
+            self.values.extend(row)
+            if len(self.values) >= self.capacity:
+                self.write()
+
+    def flush(self):
+        with self.lock:
+            self.write()
+
+    def describe(self):
+        return {'columns': list(self.columns),
+                'text': [self.columns[i] for i in self.text]}
+
+    def encode(self, value):
+        try:
+            return self.codes[value]
+        except KeyError:
+            code = self.codes[value] = self.count
+            self.count += 1
+            self.pending.append(value)
+            return code
+
+    def write(self):
+        if not os.path.exists(self.header):
+            with open(self.header, 'w') as f:
+                json.dump(self.describe(), f)
+        if self.pending:
+            with open(self.namefile, 'a') as f:
+                f.write(''.join(n + '\n' for n in self.pending))
+            del self.pending[:]
+        if self.values:
+            with open(self.filename, 'ab') as f:
+                self.values.tofile(f)
+            del self.values[:]
+
+
+# Settings of this process, changed via configure().
+FOLDER = 'data'
+SHARD = None
+CAPACITY = 4096
+
+_sinks = {}
+
+
+def configure(folder = 'data', shard = None, capacity = 4096):
+    """Set the folder of the datasets for this process, the shard its files
+    are written to if it's one of many workers, and the number of rows
+    buffered per file."""
+    global FOLDER, SHARD, CAPACITY
+    stop()
+    FOLDER, SHARD, CAPACITY = folder, shard, capacity
+
+
+def stop():
+    """Write all the pending rows to disk, and forget the sinks so far."""
+    sinks = list(_sinks.values())
+    _sinks.clear()
+    for sink in sinks:
+        sink.flush()
+
+atexit.register(stop)
+# Workers forked from this process must not inherit its buffered rows.
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before = stop)
+
+
+def sink(name, columns, text = ()):
+    """Sink for the rows of the dataset with the given name and columns,
+    which only records them if the data folder exists."""
+    try:
+        return _sinks[name]
+    except KeyError:
+        if os.path.isdir(FOLDER):
+            result = Sink(name, columns, text, FOLDER, SHARD, CAPACITY)
+        else:
+            result = NULL
+        _sinks[name] = result
+        return result
+
+
+class Dataset(object):
+    """All the rows of a dataset, as one flat array of `len(self)` rows of
+    `self.width` values, with the table of names for the text columns."""
+
+    def __init__(self, columns, text, values, names):
+        self.columns = tuple(columns)
+        self.text = tuple(text)
+        self.width = len(self.columns)
+        self.values = values
+        self.names = names
+
+    def __len__(self):
+        return len(self.values) // self.width
+
+    def __getitem__(self, index):
+        """Row at the given index, with its strings decoded."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Row %i out of range." % index)
+        row = self.values[index * self.width:(index + 1) * self.width].tolist()
+        for c in self.text:
+            i = self.columns.index(c)
+            row[i] = self.names[row[i]]
+        return row
+
+    def column(self, name):
+        """List of the values of a column, with its strings decoded."""
+        values = self.values[self.columns.index(name)::self.width].tolist()
+        if name in self.text:
+            values = [self.names[v] for v in values]
+        return values
+
+    def numpy(self):
+        """The rows as a 2D NumPy array sharing the memory of this dataset."""
+        import numpy
+        return numpy.frombuffer(self.values, dtype = numpy.int32).reshape(-1, self.width)
+
+
+def load(name, folder = 'data'):
+    """Read all the shards of the dataset back as a single Dataset, with
+    the codes of their strings translated into a common table of names.  The
+    rows without a shard come first, then the shards in numeric order."""
+    with open(os.path.join(folder, name + '.columns')) as f:
+        header = json.load(f)
+    columns, text = header['columns'], header['text']
+    width = len(columns)
+    positions = [columns.index(c) for c in text]
+
+    values, names, codes = array.array(TYPECODE), [], {}
+    files = [os.path.join(folder, name + '.rows')] + \
+            sorted(glob.glob(os.path.join(folder, glob.escape(name) + '.*.rows')),
+                   key = lambda f: _number(os.path.basename(f)[len(name) + 1:-len('.rows')]))
+    for filename in files:
+        if not os.path.exists(filename):
+            continue
+        start = len(values)
+        with open(filename, 'rb') as f:
+            values.frombytes(f.read())
+
+        translation = []
+        namefile = filename[:-len('.rows')] + '.names'
+        if os.path.exists(namefile):
+            with open(namefile) as f:
+                for n in f.read().splitlines():
+                    if n not in codes:
+                        codes[n] = len(names)
+                        names.append(n)
+                    translation.append(codes[n])
+        if translation != list(range(len(translation))):
+            for i in positions:
+                for j in range(start + i, len(values), width):
+                    values[j] = translation[values[j]]
+
+    return Dataset(columns, text, values, names)
+
+
+def _number(shard):
+    """Key sorting the numbered shards numerically, before any others."""
+    return (0, int(shard), '') if shard.isdigit() else (1, 0, shard)
@@ -1,6 +1,10 @@
 import itertools
+import collections
+import random
 
-from player import Player
+from player import Player, Bot
+from history import History
+import masks
 
 
 class State(object):
@@ -31,6 +35,11 @@ class State(object):
         self.players = None             # list[Player]: All players in a list.
         self.votes = None               # list[bool]: Votes for the mission.
         self.sabotages = None           # int (0..3): Number of sabotages.
+        self.team_mask = 0              # int: Bitmask of player indices in team.
+        self.vote_mask = 0              # int: Bitmask of player indices voting yes.
+        self.random = random.Random()   # Random: Private generator for this game.
+        self.history = History()        # History: All the attempts so far.
+        self.version = 0                # int: Incremented whenever the state changes.
 
     def clone(self):
         s = State()
@@ -58,9 +67,72 @@ class State(object):
         return output + ">"
 
 
+class Validation(object):
+    """Policy deciding which bots have the data they return checked by the
+    game.  By default, all bots are checked in all games.  For tournaments
+    between bots that were already vetted, each bot class can instead be
+    checked only in its first `warmup` games, and after that in one game out
+    of `every`, or never if `every` is zero.
+
+    The games are counted by each instance, so in a competition over several
+    worker processes every worker checks each class in its own first `warmup`
+    games, and which games these are depends on how the games are spread."""
+
+    def __init__(self, warmup=None, every=0):
+        self.warmup = warmup
+        self.every = every
+        self.games = collections.Counter()
+
+    def enabled(self, cls):
+        if self.warmup is None:
+            return True
+
+        count = self.games[cls]
+        self.games[cls] += 1
+        if count < self.warmup:
+            return True
+        return bool(self.every) and (count - self.warmup) % self.every == 0
+
+
+# Functions of the bots called by the game to notify them of its events.
+HOOKS = Bot.__events__ + ('announce', 'getSpiesN')
+
+_overrides = {}
+_listeners = {}
+
+
+def overrides(cls):
+    """Set of the hooks that the bot class actually implements, computed once
+    per class, so the game can skip the empty defaults inherited from Bot."""
+    try:
+        return _overrides[cls]
+    except KeyError:
+        result = _overrides[cls] = frozenset(h for h in HOOKS if getattr(cls, h) is not getattr(Bot, h))
+        return result
+
+
+def listeners(classes):
+    """Seats of the bots to notify for each hook, given the classes of the
+    bots around the table.  Hooks that no bot implements are left out."""
+    try:
+        return _listeners[classes]
+    except KeyError:
+        result = {}
+        for h in HOOKS:
+            seats = tuple(i for i, c in enumerate(classes) if h in overrides(c))
+            if seats:
+                result[h] = seats
+        _listeners[classes] = result
+        return result
+
+
 class BaseGame(object):
     """Implementation of the core gameplay of THE RESISTANCE.  This class
-    currently only supports games of 5 players."""
+    currently only supports games of 5 players.  The version of the State is
+    incremented at the start of every phase, before each callback notifying
+    the bots, and before asking them for a decision after a callback, so the
+    State and the data the bots update in callbacks never change within a
+    version, see player.cached()."""
 
     MAX_TURNS = 5
     MAX_TRIES = 5
@@ -73,6 +145,9 @@ class BaseGame(object):
 
     def getSpies(self, spies):
         pass
+
+    def getSpiesN(self, spies):
+        pass
     
     def onMissionAttempt(self, mission, tries, leader):
         pass
@@ -111,8 +186,9 @@ class BaseGame(object):
             self.step()
         
         # Pass back the results to the bots so they can do some learning!
-        spies = set([Player(p.name, p.index) for p in self.bots if p.spy])
-        for p in self.bots:
+        spies = set([self.state.players[p.index] for p in self.bots if p.spy])
+        self.state.version += 1
+        for p in self.listening('onGameComplete'):
             p.onGameComplete(self.state.wins >= self.NUM_WINS, spies)
         self.onGameComplete(self.state.wins >= self.NUM_WINS, spies)
 
@@ -138,6 +214,14 @@ class BaseGame(object):
     def callback(self, name, *args):
         getattr(self, name)(*args)
 
+    def listening(self, name):
+        """Bots to notify of the given event."""
+        return self.bots
+
+    def validating(self, player):
+        """Should the data returned by this player be checked?"""
+        return True
+
     def next_leader(self):
         li = ((self.state.leader.index+1) % len(self.state.players)) if self.state.leader else 0
         return self.state.players[li]
@@ -148,16 +232,23 @@ class BaseGame(object):
     def do_selection(self):
         """Phase 1) Pick the leader and ask for a selection of players on the team.
         """
+        self.state.version += 1
         self.state.team = None
         self.state.votes = None
         self.state.sabotages = None
+        self.state.team_mask = 0
+        self.state.vote_mask = 0
 
         self.callback('onMissionAttempt', self.state.turn, self.state.tries, self.state.leader)
+        self.state.version += 1
         count = self.participants[self.state.turn-1]
         selected = self.get_selection(count)
 
-        # Copy the list to make sure no internal data is leaked to the other bots!
-        self.state.team = [Player(s.name, s.index) for s in selected]
+        # Use the game's own players to make sure no internal data is leaked to
+        # the other bots!
+        self.state.team = [self.state.players[s.index] for s in selected]
+        self.state.team_mask = masks.mask(self.state.team)
+        self.state.version += 1
         self.callback('onTeamSelected', self.state.leader, self.state.team)
 
         self.state.phase = State.PHASE_VOTING
@@ -167,18 +258,22 @@ class BaseGame(object):
 
     def do_voting(self):
         """Phase 2) Notify other bots of the selection and ask for a vote."""
+        self.state.version += 1
 
         votes = self.get_votes()
         
         self.state.votes = votes[:]
+        self.state.vote_mask = masks.votes(votes)
+        score = masks.POPCOUNT[self.state.vote_mask]
+        self.state.version += 1
         self.callback('onVoteComplete', votes[:])
 
-        score = sum([int(v) for v in self.state.votes])
-
         # Continue if there was a clear majority...
         if score > 2:
             self.state.phase = State.PHASE_MISSION
         else:
+            self.record(None)
+            self.state.version += 1
             self.callback('onMissionFailed', self.state.leader, self.state.team)
             self.state.tries += 1
             self.state.phase = State.PHASE_ANNOUNCING
@@ -189,6 +284,7 @@ class BaseGame(object):
     def do_mission(self):
         """Phase 3) Run the mission and ask the bots if they want to help with
         the mission or sabotage!"""
+        self.state.version += 1
 
         sabotaged = self.get_sabotages()
         if sabotaged == 0:
@@ -196,6 +292,8 @@ class BaseGame(object):
         else:
             self.state.losses += 1
         self.state.sabotages = sabotaged
+        self.record(sabotaged)
+        self.state.version += 1
 
         self.onMissionComplete(sabotaged)
 
@@ -203,19 +301,33 @@ class BaseGame(object):
         self.state.turn += 1
         self.state.tries = 1
 
+    def record(self, sabotaged):
+        """Add the current attempt to the shared history of the game, once it
+        is resolved: after onVoteComplete() if the team was voted down, or
+        after the sabotages otherwise."""
+        s = self.state
+        s.history = s.history.append(s.turn, s.tries, s.leader.index, s.team_mask, s.vote_mask, sabotaged)
+
     def get_announcements(self):
         raise NotImplementedError
 
     def do_announcements(self):
         """Phase 4) Allow bots to publicly announce what they want about the game.
         """
+        self.state.version += 1
         for source, ann in self.get_announcements():
+            self.state.version += 1
+            if not self.validating(source):
+                self.onAnnouncement(source, dict(ann))
+                continue
+
             copy = {}
-            assert type(ann) is dict, "Please return a dictionary from %s.announce(), not %s." % (p.name, type(ann))
+            assert type(ann) is dict, "Please return a dictionary from %s.announce(), not %s." % (source.name, type(ann))
             for k, v in ann.items():
-                assert isinstance(k, Player), "Please use Player objects as dictionary key in %s.announce()." % (p.name)
-                assert isinstance(v, float), "Please use floats as dictionary values in %s.announce()." % (p.name)
-                copy[Player(k.name, k.index)] = v
+                assert isinstance(k, Player), "Please use Player objects as dictionary key in %s.announce()." % (source.name)
+                assert k in self.state.players, "The Player announced by %s does not exist in this game: %r." % (source.name, k)
+                assert isinstance(v, float), "Please use floats as dictionary values in %s.announce()." % (source.name)
+                copy[self.state.players[k.index]] = v
 
             self.onAnnouncement(source, copy)
 
@@ -223,7 +335,9 @@ class BaseGame(object):
         self.state.phase = State.PHASE_SELECTION
 
     def do_preparation(self):
+        self.state.version += 1
         self.onGameRevealed(self.state.players, self.spies)   
+        self.state.version += 1
         self.getSpiesN(self.spies)     
         self.state.phase = State.PHASE_SELECTION
 
@@ -247,15 +361,32 @@ class BaseGame(object):
 
 class Game(BaseGame):
 
-    def __init__(self, bots, roles, state=None):
+    def __init__(self, bots, roles, state=None, seed=None, validation=None):
         super(Game, self).__init__(state=state)
 
+        # Seed the private random generator of this game, which bots can use
+        # via self.game.random so the game can be reproduced from its seed.
+        if seed is not None:
+            self.state.random.seed(seed)
+
         # Create Bot instances based on the constructor passed in.
         self.bots = [p(self.state, i, r) for p, r, i in zip(bots, roles, range(0, len(bots)))]
-        self.spies = set([Player(p.name, p.index) for p in self.bots if p.spy])
-        
-        # Maintain a copy of players that includes minimal data, for passing to other bots.
+
+        # Decide once per game which bots have their decisions checked.
+        validation = validation or FULL_VALIDATION
+        enabled = dict([(c, validation.enabled(c)) for c in set([b.__class__ for b in self.bots])])
+        self.checked = [enabled[b.__class__] for b in self.bots]
+
+        # Only call the hooks that each bot class overrides.
+        seats = listeners(tuple([b.__class__ for b in self.bots]))
+        self.listeners = dict([(h, [self.bots[i] for i in s]) for h, s in seats.items()])
+
+        # Maintain a copy of players that includes minimal data, for passing to
+        # other bots.  These are the only Player instances handed out by the
+        # game, one per seat, so comparisons between them are by identity.
         self.state.players = [Player(p.name, p.index) for p in self.bots]
+        self.state.history = History(len(self.bots))
+        self.spies = set([self.state.players[p.index] for p in self.bots if p.spy])
         self.state.leader = self.next_leader()
 
     def onPlayerSelected(self, player, team):
@@ -265,22 +396,31 @@ class Game(BaseGame):
         pass
 
     def callback(self, name, *args):
-        for p in self.bots:
+        for p in self.listeners.get(name, ()):
             getattr(p, name)(*args)
         getattr(self, name)(*args)
 
+    def listening(self, name):
+        return self.listeners.get(name, ())
+
     def onGameRevealed(self, players, spies):
         # Tell the bots who the spies are if they are allowed to know.        
-        for p in self.bots:
+        for p in self.listeners.get('onGameRevealed', ()):
             p.onGameRevealed(self.state.players, spies if p.spy else set())
 
     def getSpiesN(self,spies):
-        for p in self.bots:
+        for p in self.listeners.get('getSpiesN', ()):
             p.getSpiesN(spies)
 
+    def validating(self, player):
+        return self.checked[player.index]
+
     def get_selection(self, count):
         leader = self.bots[self.state.leader.index]
         selected = leader.select(self.state.players, count)
+        if not self.checked[leader.index]:
+            self.onPlayerSelected(leader, [self.bots[s.index] for s in selected])
+            return selected
 
         # Check the data returned by the bots is in the expected format!
         assert type(selected) in [list, set, tuple], "Expecting a list|set|tuple as a return value of select(), not %s." % type(selected)
@@ -296,10 +436,12 @@ class Game(BaseGame):
 
     def get_votes(self):
         votes = []
+        team = [b for b in self.bots if self.state.team_mask >> b.index & 1]
         for p in self.bots:
             v = p.vote(self.state.team)
-            assert type(v) is bool, "Please return a boolean from %s.vote() instead of %s." % (p.name, type(v))
-            self.onPlayerVoted(p, v, self.state.leader, [b for b in self.bots if b in self.state.team])
+            if self.checked[p.index]:
+                assert type(v) is bool, "Please return a boolean from %s.vote() instead of %s." % (p.name, type(v))
+            self.onPlayerVoted(p, v, self.state.leader, team)
             votes.append(v)
         return votes
 
@@ -307,13 +449,15 @@ class Game(BaseGame):
         # Pass back the results of the mission to the bots.
         # Process the team first to make sure any timing of the result
         # is the same for all player roles, specifically over IRC.
+        listeners = self.listeners.get('onMissionComplete', ())
         for s in self.state.team:
             p = self.bots[s.index]
-            p.onMissionComplete(sabotaged)
+            if p in listeners:
+                p.onMissionComplete(sabotaged)
 
         # Now, with delays taken into account, all other results can be
         # passed back safely without divulging Spy/Resistance identities.
-        for p in [b for b in self.bots if b not in self.state.team]:
+        for p in [b for b in listeners if not self.state.team_mask >> b.index & 1]:
             p.onMissionComplete(sabotaged)
         
     def get_sabotages(self):
@@ -321,13 +465,18 @@ class Game(BaseGame):
         for s in self.state.team:
             p = self.bots[s.index]
             result = p.sabotage() and p.spy
-            assert type(result) is bool, "Please return a boolean from %s.sabotage(), not %s." % (p.name, type(result))
+            if self.checked[p.index]:
+                assert type(result) is bool, "Please return a boolean from %s.sabotage(), not %s." % (p.name, type(result))
             sabotaged += int(result)
         return sabotaged
 
     def onAnnouncement(self, player, announcement):
-        for other in [o for o in self.bots if o != player]:
+        for other in [o for o in self.listeners.get('onAnnouncement', ()) if o != player]:
             other.onAnnouncement(player, announcement)
 
     def get_announcements(self):
-        return [(p, ann) for p, ann in [(Player(p.name, p.index), p.announce()) for p in self.bots] if ann]
+        return [(p, ann) for p, ann in [(self.state.players[p.index], p.announce()) for p in self.listeners.get('announce', ())] if ann]
+
+
+# Default policy that checks all the data returned by all the bots.
+FULL_VALIDATION = Validation()
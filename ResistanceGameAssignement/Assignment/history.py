@@ -0,0 +1,101 @@
+"""History of all the attempts of a game, kept once by the engine and shared
+by all the bots via `self.game.history`, instead of each bot recording the
+teams and votes in its own lists.
+
+The history is stored by column, one tuple per field indexed by attempt,
+with the teams and votes as bitmasks (see the masks module).  Counters per
+player are maintained as the attempts are added, so common queries don't
+need to scan the history:
+
+    history = self.game.history
+    for leader, team, sabotaged in zip(history.leaders, history.teams, history.sabotages):
+        ...
+    suspicious = history.failures[p.index] / max(1, history.missions[p.index])
+
+Histories are immutable: the engine replaces the one in the State after each
+attempt, so a bot can keep a reference to the history at some point of the
+game and compare it with the current one later.
+
+An attempt is only added once it is resolved, whatever the outcome of the
+vote: a team voted down is added after onVoteComplete() and before
+onMissionFailed(), and a mission after the sabotages and before
+onMissionComplete().  So in onVoteComplete() the history never includes the
+current attempt, whose team and votes are in `self.game.team_mask` and
+`self.game.vote_mask`.
+"""
+
+import operator
+import collections
+
+
+# Row of the history, for one attempt to run a mission.  The number of
+# sabotages is None if the team was voted down.
+Attempt = collections.namedtuple('Attempt', ['turn', 'tries', 'leader', 'team', 'votes', 'sabotages'])
+
+
+class History(object):
+
+    COLUMNS = ('turns', 'tries', 'leaders', 'teams', 'votes', 'sabotages')
+    COUNTERS = ('led', 'selected', 'approvals', 'missions', 'failures')
+
+    __slots__ = COLUMNS + COUNTERS + ('players',)
+
+    def __init__(self, players = 5):
+        self.players = players
+        for c in self.COLUMNS:
+            setattr(self, c, ())
+        zeros = (0,) * players
+        self.led = zeros            # Teams picked by each player as leader.
+        self.selected = zeros       # Teams each player was picked in.
+        self.approvals = zeros      # Teams each player voted for.
+        self.missions = zeros       # Missions each player went on.
+        self.failures = zeros       # Sabotaged missions each player was on.
+
+    def __len__(self):
+        return len(self.turns)
+
+    def __getitem__(self, index):
+        return Attempt(self.turns[index], self.tries[index], self.leaders[index],
+                       self.teams[index], self.votes[index], self.sabotages[index])
+
+    def __iter__(self):
+        return (Attempt(*row) for row in zip(self.turns, self.tries, self.leaders, self.teams, self.votes, self.sabotages))
+
+    def __repr__(self):
+        return "<History %r>" % (list(self),)
+
+    def append(self, turn, tries, leader, team, votes, sabotages):
+        """New history with the given attempt added, the leader as an index
+        and the team and votes as bitmasks."""
+        h = History.__new__(History)
+        h.players = self.players
+        h.turns = self.turns + (turn,)
+        h.tries = self.tries + (tries,)
+        h.leaders = self.leaders + (leader,)
+        h.teams = self.teams + (team,)
+        h.votes = self.votes + (votes,)
+        h.sabotages = self.sabotages + (sabotages,)
+
+        led = list(self.led)
+        led[leader] += 1
+        h.led = tuple(led)
+        h.selected = _count(self.selected, team)
+        h.approvals = _count(self.approvals, votes)
+        if sabotages is None:
+            h.missions, h.failures = self.missions, self.failures
+        else:
+            h.missions = _count(self.missions, team)
+            h.failures = _count(self.failures, team) if sabotages else self.failures
+        return h
+
+
+_bits = {}
+
+
+def _count(counters, players):
+    """Counters with one added for each of the players in the bitmask."""
+    try:
+        bits = _bits[len(counters), players]
+    except KeyError:
+        bits = _bits[len(counters), players] = tuple([players >> i & 1 for i in range(len(counters))])
+    return tuple(map(operator.add, counters, bits))
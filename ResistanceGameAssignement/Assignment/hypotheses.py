@@ -0,0 +1,113 @@
+"""Shared space of hypotheses about the spies, for logical bots that reason
+about which configurations of spies are still possible.
+
+Each configuration is the bitmask of the spies around the table (see the
+masks module), and all configurations for a table size and number of spies
+are computed only once per process.  Filters such as "configurations with at
+least N spies on this team" are precomputed per team as frozensets, so bots
+can keep their remaining configurations consistent with a single set
+intersection instead of looping over players in Python:
+
+    self.space = hypotheses.space(len(players))
+    remaining = self.space.excluding(1 << self.index)
+    ...
+    remaining &= self.space.at_least(self.game.team_mask, sabotaged)
+"""
+
+from masks import POPCOUNT, combinations
+
+
+# Number of spies depending on the number of players at the table.
+SPIES = {5: 2, 6: 2, 7: 3, 8: 3, 9: 3, 10: 4}
+
+
+class HypothesisSpace(object):
+    """All the configurations of `spies` spies among `players` players, with
+    tables of the number of spies each configuration puts on a team."""
+
+    def __init__(self, players, spies):
+        self.players = players
+        self.spies = spies
+        self.configurations = frozenset(combinations(players, spies))
+        # Fixed order of the configurations, for engines storing a value per
+        # configuration in a flat list, with the seats of the spies of each.
+        self.ordered = sorted(self.configurations)
+        self.members = [tuple(i for i in range(players) if c >> i & 1) for c in self.ordered]
+        self._counts = {}
+        self._positions = {}
+        self._at_least = {}
+        self._at_most = {}
+
+    def counts(self, team):
+        """List of frozensets, indexed by the number of spies on the team
+        given as a bitmask, of the configurations with that many spies."""
+        try:
+            return self._counts[team]
+        except KeyError:
+            groups = [set() for _ in range(self.spies + 1)]
+            for c in self.configurations:
+                groups[POPCOUNT[c & team]].add(c)
+            result = self._counts[team] = [frozenset(g) for g in groups]
+            return result
+
+    def positions(self, team):
+        """Like counts(), but with the positions in the `ordered` list of the
+        configurations that have each number of spies on the team."""
+        try:
+            return self._positions[team]
+        except KeyError:
+            groups = [[] for _ in range(self.spies + 1)]
+            for i, c in enumerate(self.ordered):
+                groups[POPCOUNT[c & team]].append(i)
+            result = self._positions[team] = groups
+            return result
+
+    def exactly(self, team, count):
+        """Configurations with exactly `count` spies on the team."""
+        counts = self.counts(team)
+        return counts[count] if count < len(counts) else frozenset()
+
+    def at_least(self, team, count):
+        """Configurations with `count` or more spies on the team, i.e. those
+        consistent with `count` sabotages on that mission."""
+        try:
+            return self._at_least[team, count]
+        except KeyError:
+            result = self._at_least[team, count] = frozenset().union(*self.counts(team)[count:])
+            return result
+
+    def at_most(self, team, count):
+        """Configurations with `count` or fewer spies on the team."""
+        try:
+            return self._at_most[team, count]
+        except KeyError:
+            result = self._at_most[team, count] = frozenset().union(*self.counts(team)[:count+1])
+            return result
+
+    def excluding(self, players):
+        """Configurations where none of the given players are spies."""
+        return self.exactly(players, 0)
+
+    def including(self, players):
+        """Configurations where all of the given players are spies."""
+        return self.exactly(players, POPCOUNT[players])
+
+    def probabilities(self, configurations):
+        """Fraction of the given configurations in which each player is a
+        spy, as a list indexed by player."""
+        total = float(len(configurations)) or 1.0
+        return [len(self.including(1 << i) & configurations) / total for i in range(self.players)]
+
+
+_spaces = {}
+
+
+def space(players, spies = None):
+    """Return the shared hypothesis space for the table size, creating it
+    the first time it's needed in this process."""
+    spies = spies if spies is not None else SPIES[players]
+    try:
+        return _spaces[(players, spies)]
+    except KeyError:
+        result = _spaces[(players, spies)] = HypothesisSpace(players, spies)
+        return result
@@ -0,0 +1,212 @@
+"""Engine playing many games in lockstep, for tournaments between stock bots
+whose decisions only depend on the current state of the game and their role,
+like most of those in bots/beginners.py.
+
+The state of all the games is stored by column, one list per field indexed by
+game, with the teams, votes and spies as bitmasks (see the masks module).  No
+bot instances are created; instead the bot classes make each decision for all
+the games at once with optional class methods, which are given the batch, the
+list of games and the seat of the deciding player in each game:
+
+    class Hippie(Bot):
+        ...
+        @classmethod
+        def vote_batch(cls, batch, games, seats):
+            return [True] * len(games)
+
+The batch methods must make the same calls to `batch.random[g]` as the scalar
+methods do to `self.game.random`, so both engines play exactly the same games
+from the same seeds.  Only the bots that implement a batch method for each of
+their decisions, and don't observe any events, can be played in lockstep, see
+vectorized(); games with other bots must be played with the Game class.
+"""
+
+import random
+
+from masks import POPCOUNT
+from player import Bot
+from game import BaseGame, overrides
+
+
+# Decisions of the bots, with the name of their batch version.
+DECISIONS = [('select', 'select_batch'), ('vote', 'vote_batch'), ('sabotage', 'sabotage_batch')]
+
+_vectorized = {}
+
+
+def seats(indices):
+    """Bitmask of the players at the given seats."""
+    m = 0
+    for i in indices:
+        m |= 1 << i
+    return m
+
+
+def _owner(cls, name):
+    for c in cls.__mro__:
+        if name in c.__dict__:
+            return c
+    return None
+
+
+def vectorized(cls):
+    """Can the bot class be played in lockstep?  Its batch methods must be
+    defined along with each scalar method they replace, so derived classes
+    that change a decision aren't played with the batch method of the base."""
+    try:
+        return _vectorized[cls]
+    except (KeyError, TypeError):
+        pass
+    if not isinstance(cls, type) or not issubclass(cls, Bot):
+        return False
+
+    result = True
+    for scalar, batch in DECISIONS:
+        owner = _owner(cls, batch)
+        result = result and owner is not None and owner is _owner(cls, scalar)
+    for hook in overrides(cls):
+        if hook != 'announce' or _owner(cls, 'announce_batch') is not _owner(cls, 'announce'):
+            result = False
+    _vectorized[cls] = result
+    return result
+
+
+class Batch(object):
+    """Columns of the state of many games, each played by the bot classes and
+    with the roles of a (players, roles, seed) selection, like the arguments
+    of Game.  The fields have the same meaning as in State."""
+
+    PARTICIPANTS = [2, 3, 2, 3, 3]
+    SEATS = tuple(range(5))
+    # Players in the game other than the one at each seat, in order.
+    OTHERS = tuple(tuple(s for s in range(5) if s != i) for i in range(5))
+
+    def __init__(self, selections):
+        selections = list(selections)
+        size = len(selections)
+        self.size = size
+        self.bots = [tuple(players) for players, _, _ in selections]
+        self.names = [tuple(c.__name__ for c in players) for players in self.bots]
+        self.spies = [seats([i for i, spy in enumerate(roles) if spy]) for _, roles, _ in selections]
+
+        # Private generator of each game, seeded like those of Game.
+        self.random = []
+        for _, _, seed in selections:
+            generator = random.Random()
+            if seed is not None:
+                generator.seed(seed)
+            self.random.append(generator)
+
+        self.turn = [1] * size
+        self.tries = [1] * size
+        self.wins = [0] * size
+        self.losses = [0] * size
+        self.leader = [0] * size
+        self.team = [None] * size
+        self.team_mask = [0] * size
+        self.vote_mask = [0] * size
+        self.sabotages = [None] * size
+
+        # Only the bots that make announcements need to be asked for them.
+        self.announcing = [tuple(i for i, c in enumerate(players) if 'announce' in overrides(c))
+                           for players in self.bots]
+
+    def count(self, g):
+        """Number of players to select for the current mission of the game."""
+        return self.PARTICIPANTS[self.turn[g] - 1]
+
+    def spy(self, g, seat):
+        return bool(self.spies[g] >> seat & 1)
+
+    def won(self, g):
+        return self.wins[g] >= BaseGame.NUM_WINS
+
+    def done(self, g):
+        return self.tries[g] > BaseGame.MAX_TRIES or self.turn[g] > BaseGame.MAX_TURNS \
+            or self.wins[g] >= BaseGame.NUM_WINS or self.losses[g] >= BaseGame.NUM_LOSSES
+
+    def onVoteComplete(self, g, leader, team, votes):
+        """Callback once the team selected by the leader, a bitmask, was voted
+        on by the players in the `votes` bitmask."""
+        pass
+
+    def decide(self, name, games, seats):
+        """Ask the bots at the given seats of each game for a decision, with
+        one call per bot class, and return the decisions in order."""
+        groups = {}
+        for g, seat in zip(games, seats):
+            cls = self.bots[g][seat]
+            try:
+                group = groups[cls]
+            except KeyError:
+                group = groups[cls] = ([], [])
+            group[0].append(g)
+            group[1].append(seat)
+
+        if len(groups) == 1:
+            return getattr(cls, name)(self, games, seats)
+        results = {}
+        for cls, (g, s) in groups.items():
+            results.update(zip(g, getattr(cls, name)(self, g, s)))
+        return [results[g] for g in games]
+
+    def run(self):
+        """Play all the games until they're complete."""
+        active = list(range(self.size))
+        while active:
+            self.do_selection(active)
+            self.do_voting(active)
+            approved = [g for g in active if POPCOUNT[self.vote_mask[g]] > 2]
+            self.do_mission(approved)
+
+            active = [g for g in active if not self.done(g)]
+            self.do_announcements(active)
+
+    def do_selection(self, games):
+        leaders = [self.leader[g] for g in games]
+        for g, team in zip(games, self.decide('select_batch', games, leaders)):
+            self.team[g] = team
+            self.team_mask[g] = team_mask = seats(team)
+            self.sabotages[g] = None
+
+    def do_voting(self, games):
+        votes = dict.fromkeys(games, 0)
+        for seat in self.SEATS:
+            seats = [seat] * len(games)
+            for g, vote in zip(games, self.decide('vote_batch', games, seats)):
+                if vote:
+                    votes[g] |= 1 << seat
+
+        for g in games:
+            self.vote_mask[g] = votes[g]
+            self.onVoteComplete(g, self.leader[g], self.team_mask[g], votes[g])
+            if POPCOUNT[votes[g]] <= 2:
+                self.tries[g] += 1
+
+    def do_mission(self, games):
+        sabotaged = dict.fromkeys(games, 0)
+        # Team members are asked in the order they were selected.
+        for k in range(max([len(self.team[g]) for g in games] or [0])):
+            members = [g for g in games if len(self.team[g]) > k]
+            seats = [self.team[g][k] for g in members]
+            for g, seat, result in zip(members, seats, self.decide('sabotage_batch', members, seats)):
+                if result and self.spies[g] >> seat & 1:
+                    sabotaged[g] += 1
+
+        for g in games:
+            if sabotaged[g] == 0:
+                self.wins[g] += 1
+            else:
+                self.losses[g] += 1
+            self.sabotages[g] = sabotaged[g]
+            self.turn[g] += 1
+            self.tries[g] = 1
+
+    def do_announcements(self, games):
+        for k in range(max([len(self.announcing[g]) for g in games] or [0])):
+            members = [g for g in games if len(self.announcing[g]) > k]
+            # Nobody listens in lockstep, but the announcements may draw from
+            # the random generators of the games.
+            self.decide('announce_batch', members, [self.announcing[g][k] for g in members])
+        for g in games:
+            self.leader[g] = (self.leader[g] + 1) % 5
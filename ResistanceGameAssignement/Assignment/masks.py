@@ -0,0 +1,43 @@
+"""Compact integer bitmasks for sets of players, where bit `i` stands for the
+player at index `i` around the table.  The game keeps masks of the current
+team and votes in its State, so bots can check hypotheses with a few integer
+operations rather than scanning lists of players:
+
+    spies_on_team = POPCOUNT[self.game.team_mask & spy_mask]
+
+The spies are not part of the shared State, so spies and cheaters that know
+them compute `spy_mask = mask(spies)` themselves in onGameRevealed().
+"""
+
+# Tables support games with up to 10 players.
+MAX_PLAYERS = 10
+
+# Number of bits set in each mask.
+POPCOUNT = [bin(m).count('1') for m in range(1 << MAX_PLAYERS)]
+
+
+def mask(players):
+    """Bitmask of the given players, from their index."""
+    m = 0
+    for p in players:
+        m |= 1 << p.index
+    return m
+
+
+def votes(ballot):
+    """Bitmask of the players that voted for the mission, in seat order."""
+    m = 0
+    for i, v in enumerate(ballot):
+        if v:
+            m |= 1 << i
+    return m
+
+
+def players(m, everyone):
+    """List of the players from `everyone` that are in the bitmask."""
+    return [p for p in everyone if m >> p.index & 1]
+
+
+def combinations(n, k):
+    """All the masks of `n` players with exactly `k` of them set."""
+    return [m for m in range(1 << n) if POPCOUNT[m] == k]
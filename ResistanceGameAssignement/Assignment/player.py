@@ -1,6 +1,7 @@
-import logging
-import logging.handlers
+import zlib
+import functools
 
+import botlog
 import core
 
 
@@ -24,23 +25,35 @@ class Player(object):
         # Setup the two member variables first, then continue...
         self.name = name
         self.index = index
+        # Players are used as keys in dictionaries and sets by most bots, so
+        # the hash is computed once.  It uses a hash of the name that's the
+        # same in all processes, so sets of players are iterated in the same
+        # order by all workers.
+        self._hash = hash(index) ^ zlib.crc32(name.encode('utf-8'))
         # This line is necessary for bots using mods as mix-in classes.
         super(Player, self).__init__()
 
+    def __setattr__(self, key, value):
+        # The game hands out the same Player instances to all the bots, so
+        # they can't be modified once they have been created.
+        if key in ('name', 'index', '_hash') and key in self.__dict__:
+            raise AttributeError("Player %r is immutable, %s can't be changed." % (self, key))
+        object.__setattr__(self, key, value)
+
     def __repr__(self):
         return "%i-%s" % (self.index, self.name)
 
     def __eq__(self, other):
-        return self.index == other.index and self.name == other.name
+        return self is other or (self.index == other.index and self.name == other.name)
 
     def __ne__(self, other):
-        return self.index != other.index or self.name != other.name
+        return self is not other and (self.index != other.index or self.name != other.name)
 
     def __hash__(self):
-        return hash(self.index) ^ hash(self.name)
+        return self._hash
 
 
-class Bot(Player):
+class Bot(Player, metaclass=core.Observable):
     """This is the base class for your AI in THE RESISTANCE.  To get started:
          1) Derive this class from a new file that will contain your AI.  See
             bots.py for simple stock AI examples.
@@ -49,19 +62,25 @@ class Bot(Player):
             those that raise exceptions (i.e. vote, select, sabotage).
 
          3) If you need any of the optional callback API functions, implement
-            them (i.e. all functions named on*() are callbacks).
+            them (i.e. all functions named on*() are callbacks).  Those of the
+            base classes are called first, unless your callback is decorated
+            with @core.override to replace them, e.g. if it calls super().
 
        Aside from parameters passed as arguments to the functions below, you 
        can also access the game state via the self.game variable, which contains
-       a State class defined in game.py.
+       a State class defined in game.py.  For random decisions, prefer the
+       generator in self.game.random so games can be reproduced from a seed.
 
        For debugging, it's recommended you use the self.log variable, which
        contains a python logging object on which you can call .info() .debug()
        or warn() for instance.  The output is stored in a file in the #/logs/
-       folder, named according to your bot. 
+       folder, named according to your bot.  Pass the arguments of messages
+       to the logger, e.g. self.log.debug("Voted %s.", vote), so they're not
+       formatted in competitions that run with logging off.
     """
 
-    __metaclass__ = core.Observable
+    # Bots are free to store their own data, unlike the Players of the game.
+    __setattr__ = object.__setattr__
 
 
     def onGameRevealed(self, players, spies):
@@ -195,17 +214,41 @@ class Bot(Player):
         self.game = game
         self.spy = spy
 
-        self.log = logging.getLogger(self.name)
-        if not self.log.handlers:
-            try:
-                output = logging.FileHandler(filename='logs/'+self.name+'.log')
-                self.log.addHandler(output)
-                self.log.setLevel(logging.DEBUG)
-            except IOError:
-                pass
+        self.log = botlog.logger(self.name)
 
     def __repr__(self):
         """Built-in function to support pretty-printing."""
         type = {True: "SPY", False: "RST"}
         return "<%s #%i %s>" % (self.name, self.index, type[self.spy])
 
+
+def cached(method):
+    """Decorator for the methods of bots that compute something expensive from
+    the game State and the bot's own data, e.g. the spy probabilities of the
+    neural bots, so it's computed once per version of the State and arguments.
+    The version changes in every phase of the game, before each callback and
+    before each decision that follows a callback, so the data updated in
+    callbacks is also taken into account, as long as a callback doesn't call
+    the method before updating that data.  The arguments must be hashable,
+    e.g. bitmasks rather than lists of players, and the result is shared by
+    the calls until the next version, so it must not be modified:
+
+        class NeuralBot(LoggerBot):
+            @cached
+            def calc_player_probabilities_of_being_spy(self):
+                ...
+    """
+    name = method.__name__
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        version, results = self.__dict__.get('_cached', (None, None))
+        if version != self.game.version:
+            results = {}
+            self._cached = (self.game.version, results)
+        key = (name,) + args
+        try:
+            return results[key]
+        except KeyError:
+            result = results[key] = method(self, *args)
+            return result
+    return wrapper
@@ -0,0 +1,180 @@
+"""Side-effect free model of the rules of BaseGame, for bots that search ahead
+by simulating what happens if a team is chosen and the votes go one way or
+the other, possibly many thousands of times per decision.
+
+A Position is an immutable tuple of small integers, with the team, votes and
+spies as bitmasks (see the masks module).  Each position is a decision of a
+single player, the `actor`: the leader selects the team, then each player
+votes in turn, then each spy on the team decides to sabotage or not, as the
+resistance can't sabotage anyway.  step() returns the position after the
+actor's decision, leaving the original untouched:
+
+    position = simulator.observe(self.game, spies)
+    for action in simulator.actions(position):
+        after = simulator.step(position, action)
+        ...
+    final = simulator.rollout(after, self.game.random)
+    if simulator.won(final):
+        ...
+
+The announcements have no effect on the rules, so they're not modelled.
+"""
+
+import collections
+
+from masks import POPCOUNT, combinations
+from game import State, BaseGame
+
+
+SELECTION = State.PHASE_SELECTION
+VOTING = State.PHASE_VOTING
+MISSION = State.PHASE_MISSION
+# The game is over, either side won.
+OVER = 5
+
+PLAYERS = 5
+PARTICIPANTS = [2, 3, 2, 3, 3]
+
+# Teams of each size, as bitmasks.
+TEAMS = dict((k, combinations(PLAYERS, k)) for k in set(PARTICIPANTS))
+CHOICES = (True, False)
+
+
+Position = collections.namedtuple('Position',
+    ['phase', 'turn', 'tries', 'wins', 'losses', 'leader', 'team', 'votes', 'sabotages', 'spies', 'actor'])
+Position.__doc__ = """State of a game from the point of view of the rules.  `votes`
+is the bitmask of the players that voted for the team so far, and `sabotages`
+the number of sabotages on the current mission so far.  The `actor` is the
+seat of the player to decide next, or None if the game is over."""
+
+
+def initial(spies, leader = 0):
+    """Position at the start of a game with the spies in the given bitmask."""
+    return Position(SELECTION, 1, 1, 0, 0, leader, 0, 0, 0, spies, leader)
+
+
+def observe(state, spies):
+    """Position of a game in progress, from its State and a bitmask of the
+    spies, e.g. a sample of those that are still possible.  In the voting
+    phase, the position is that of the first vote on the team, as the votes
+    are revealed all at once."""
+    leader = state.leader.index
+    if state.phase == State.PHASE_VOTING:
+        return Position(VOTING, state.turn, state.tries, state.wins, state.losses, leader,
+                        state.team_mask, 0, 0, spies, 0)
+    if state.phase == State.PHASE_MISSION:
+        position = Position(MISSION, state.turn, state.tries, state.wins, state.losses, leader,
+                            state.team_mask, state.vote_mask, 0, spies, None)
+        return _mission(position, 0, 0)
+    return Position(SELECTION, state.turn, state.tries, state.wins, state.losses, leader, 0, 0, 0, spies, leader)
+
+
+def actions(position):
+    """The legal decisions of the actor: team bitmasks when selecting, or
+    booleans for the votes and sabotages."""
+    phase = position.phase
+    if phase == SELECTION:
+        return TEAMS[PARTICIPANTS[position.turn - 1]]
+    if phase == OVER:
+        return []
+    return CHOICES
+
+
+def over(position):
+    return position.phase == OVER
+
+
+def won(position):
+    """Did the resistance win the game?  Only meaningful once it's over."""
+    return position.wins >= BaseGame.NUM_WINS
+
+
+def _mission(position, start, sabotages):
+    """Position of the next spy on the team from seat `start` to decide on
+    sabotage, or of the next mission if there are no more."""
+    phase, turn, tries, wins, losses, leader, team, votes, _, spies, _ = position
+    remaining = team & spies & ~((1 << start) - 1)
+    if remaining:
+        actor = (remaining & -remaining).bit_length() - 1
+        return Position(MISSION, turn, tries, wins, losses, leader, team, votes, sabotages, spies, actor)
+
+    if sabotages == 0:
+        wins += 1
+    else:
+        losses += 1
+    return _next(turn + 1, 1, wins, losses, leader, spies)
+
+
+def _next(turn, tries, wins, losses, leader, spies):
+    """Position of the next selection with the following leader, or the end
+    of the game."""
+    leader = (leader + 1) % PLAYERS
+    if tries > BaseGame.MAX_TRIES or turn > BaseGame.MAX_TURNS \
+            or wins >= BaseGame.NUM_WINS or losses >= BaseGame.NUM_LOSSES:
+        return Position(OVER, turn, tries, wins, losses, leader, 0, 0, 0, spies, None)
+    return Position(SELECTION, turn, tries, wins, losses, leader, 0, 0, 0, spies, leader)
+
+
+def step(position, action):
+    """Position after the actor's decision, which must be legal."""
+    phase, turn, tries, wins, losses, leader, team, votes, sabotages, spies, actor = position
+
+    if phase == SELECTION:
+        return Position(VOTING, turn, tries, wins, losses, leader, action, 0, 0, spies, 0)
+
+    if phase == VOTING:
+        if action:
+            votes |= 1 << actor
+        if actor + 1 < PLAYERS:
+            return Position(VOTING, turn, tries, wins, losses, leader, team, votes, 0, spies, actor + 1)
+        if POPCOUNT[votes] > 2:
+            return _mission(Position(MISSION, turn, tries, wins, losses, leader, team, votes, 0, spies, None), 0, 0)
+        return _next(turn, tries + 1, wins, losses, leader, spies)
+
+    if phase == MISSION:
+        return _mission(position, actor + 1, sabotages + bool(action))
+
+    raise ValueError("The game is over.")
+
+
+def rollout(position, random):
+    """Final position after playing uniformly random decisions from the given
+    position, using the `random` generator.  Equivalent to calling step() with
+    random actions until the game is over, but much faster."""
+    phase, turn, tries, wins, losses, leader, team, votes, sabotages, spies, actor = position
+    if phase == OVER:
+        return position
+    choice, getrandbits = random.choice, random.getrandbits
+
+    # Finish the current round with the decisions left in it.
+    if phase == MISSION:
+        approved = True
+        sabotages += POPCOUNT[team & spies & ~((1 << actor) - 1) & getrandbits(PLAYERS)]
+    else:
+        if phase == SELECTION:
+            team = choice(TEAMS[PARTICIPANTS[turn - 1]])
+            votes, actor = 0, 0
+        # The remaining voters, from the actor onwards.
+        votes = votes & ((1 << actor) - 1) | getrandbits(PLAYERS) & ~((1 << actor) - 1)
+        approved = POPCOUNT[votes] > 2
+        if approved:
+            sabotages = POPCOUNT[team & spies & getrandbits(PLAYERS)]
+
+    while True:
+        if approved:
+            if sabotages == 0:
+                wins += 1
+            else:
+                losses += 1
+            turn, tries = turn + 1, 1
+        else:
+            tries += 1
+        leader = (leader + 1) % PLAYERS
+        if tries > BaseGame.MAX_TRIES or turn > BaseGame.MAX_TURNS \
+                or wins >= BaseGame.NUM_WINS or losses >= BaseGame.NUM_LOSSES:
+            return Position(OVER, turn, tries, wins, losses, leader, 0, 0, 0, spies, None)
+
+        team = choice(TEAMS[PARTICIPANTS[turn - 1]])
+        approved = POPCOUNT[getrandbits(PLAYERS)] > 2
+        if approved:
+            sabotages = POPCOUNT[team & spies & getrandbits(PLAYERS)]
@@ -0,0 +1,102 @@
+import sqlite3
+import hashlib
+import inspect
+import json
+
+
+def version(cls):
+    """Identify the version of a bot by hashing the source files of its class
+    and all of its base classes, so editing any of them invalidates results."""
+    digest = hashlib.sha1()
+    for c in cls.__mro__:
+        try:
+            filename = inspect.getsourcefile(c)
+        except TypeError:
+            continue
+        if not filename:
+            continue
+        with open(filename, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def lineup(names, roles):
+    """Key of a table regardless of the seats: the names of the players sorted
+    along with their roles, e.g. 'Bounder:0,Bounder:1,Jammer:0,...'."""
+    return ','.join(['%s:%i' % (n, r) for n, r in sorted(zip(names, [int(r) for r in roles]))])
+
+
+class GameStore(object):
+    """Persistent on-disk store of the results of every game played in a
+    competition, so later runs can merge them instead of replaying games whose
+    bots have not changed.
+
+    Each game is stored with the names of the players in seat order, their
+    roles, the seed of the game, the versions of the bots, the outcome and the
+    statistics gathered during the game in an encoded form.  Stored games are
+    indexed by the lineup of their table, i.e. which bots played and in which
+    role, so they can be reused for any game with the same lineup whatever the
+    schedule of the rest of the competition."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.db = self.connect()
+        self.db.execute("""CREATE TABLE IF NOT EXISTS games (
+                               id INTEGER PRIMARY KEY,
+                               players TEXT, roles TEXT, versions TEXT,
+                               won INTEGER, statistics TEXT, seed INTEGER,
+                               lineup TEXT)""")
+        # Upgrade stores created before the seeds and lineups were kept.
+        columns = [c[1] for c in self.db.execute("PRAGMA table_info(games)")]
+        if 'seed' not in columns:
+            self.db.execute("ALTER TABLE games ADD COLUMN seed INTEGER")
+        if 'lineup' not in columns:
+            self.db.execute("ALTER TABLE games ADD COLUMN lineup TEXT")
+            rows = self.db.execute("SELECT id, players, roles FROM games").fetchall()
+            self.db.executemany("UPDATE games SET lineup = ? WHERE id = ?",
+                [(lineup(players.split(','), [r == '1' for r in roles]), i) for i, players, roles in rows])
+        self.db.execute("CREATE INDEX IF NOT EXISTS lineups ON games (lineup, id)")
+        self.db.commit()
+
+    def connect(self):
+        db = sqlite3.connect(self.filename, timeout = 60.0)
+        # Allow reading stored games while new results are being written.
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def add(self, records, versions):
+        """Store games given as (names, roles, seed, won, statistics) tuples,
+        where the statistics are JSON-compatible, and `versions` maps bot
+        names to their current version."""
+        self.db.executemany("INSERT INTO games (players, roles, seed, versions, won, statistics, lineup) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(','.join(names),
+              ''.join([str(int(r)) for r in roles]),
+              seed,
+              ','.join([versions[n] for n in names]),
+              int(won),
+              json.dumps(statistics),
+              lineup(names, roles)) for names, roles, seed, won, statistics in records])
+        self.db.commit()
+
+    def last(self):
+        """Return the identifier of the most recently stored game."""
+        return self.db.execute("SELECT MAX(id) FROM games").fetchone()[0] or 0
+
+    def games(self, db, versions, key, until):
+        """Return the stored games with the given lineup that are still valid,
+        i.e. with all the bots at their current version, as (id, won,
+        statistics) tuples in the order they were played, ignoring the games
+        stored after `until`.  The connection `db` is given by the caller, so
+        the store can be queried from another thread while results are
+        added."""
+        query = "SELECT id, players, versions, won, statistics FROM games " \
+                "WHERE lineup = ? AND id <= ? ORDER BY id"
+        result = []
+        for i, players, stored, won, statistics in db.execute(query, (key, until)):
+            if [versions.get(n) for n in players.split(',')] != stored.split(','):
+                continue
+            result.append((i, bool(won), json.loads(statistics)))
+        return result
+
+    def close(self):
+        self.db.close()
@@ -4,7 +4,7 @@ from inspect import isclass
 
 from game import Game
 from player import Bot
-from bots import beginners, intermediates, validators
+from bots import beginners, intermediates, experts, searchers, validators
 
 
 def run_game(cls):
@@ -30,5 +30,17 @@ def test_intermediates():
             yield run_game, cls
 
 
+def test_experts():
+    for name, cls in experts.__dict__.items():
+        if isclass(cls) and issubclass(cls, Bot) and cls is not Bot:
+            yield run_game, cls
+
+
+def test_searchers():
+    for name, cls in searchers.__dict__.items():
+        if isclass(cls) and issubclass(cls, Bot) and cls is not Bot:
+            yield run_game, cls
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,90 @@
+import time
+import unittest
+
+import batching
+from player import Bot
+from game import Game
+
+
+class Recorder(object):
+    """Model doubling each value, recording the size of every batch."""
+
+    def __init__(self):
+        self.sizes = []
+
+    def __call__(self, rows):
+        self.sizes.append(len(rows))
+        return [2 * r for r in rows]
+
+
+class TestBatcher(unittest.TestCase):
+
+    def test_DirectWithoutClients(self):
+        model = Recorder()
+        infer = batching.Batcher(model)
+        self.assertEqual(infer([1, 2]), [2, 4])
+        self.assertEqual(infer([3]), [6])
+        self.assertEqual(model.sizes, [2, 1])
+
+    def test_MergesConcurrentCalls(self):
+        model = Recorder()
+        infer = batching.Batcher(model, latency = 10.0)
+        results = batching.interleave(lambda i: infer([i, i + 100]), range(8), 8)
+        self.assertEqual(results, [[2 * i, 2 * i + 200] for i in range(8)])
+        self.assertEqual(sum(model.sizes), 16)
+        self.assertLess(len(model.sizes), 8)
+
+    def test_LatencyBudget(self):
+        model = Recorder()
+        infer = batching.Batcher(model, latency = 0.01)
+
+        def work(i):
+            if i == 0:
+                time.sleep(0.5)
+                return None
+            start = time.time()
+            infer([i])
+            return time.time() - start
+
+        results = batching.interleave(work, range(2), 2)
+        self.assertLess(results[1], 0.25)
+
+    def test_ErrorsReachEveryCaller(self):
+        def broken(rows):
+            raise ValueError("Broken model.")
+        infer = batching.Batcher(broken, latency = 10.0)
+        self.assertRaises(ValueError, batching.interleave, lambda i: infer([i]), range(4), 4)
+
+
+SHARED = batching.Batcher(lambda rows: [r % 2 == 0 for r in rows])
+
+
+class Inferring(Bot):
+
+    def select(self, players, count):
+        return players[:count]
+
+    def vote(self, team):
+        return SHARED([self.index + self.game.turn])[0]
+
+    def sabotage(self):
+        return True
+
+
+class TestInterleave(unittest.TestCase):
+
+    def play(self, seed):
+        game = Game([Inferring] * 5, [True, True, False, False, False], seed = seed)
+        game.run()
+        return game.state.wins, game.state.losses
+
+    def test_SameResultsAsSequential(self):
+        start = SHARED.batches
+        sequential = [self.play(seed) for seed in range(20)]
+        middle = SHARED.batches
+        self.assertEqual(batching.interleave(self.play, range(20), 6), sequential)
+        self.assertLess(SHARED.batches - middle, middle - start)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import botlog
+
+
+class TestBotLog(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        botlog.configure('debug', capacity = 1)
+        shutil.rmtree(self.folder)
+
+    def test_OffSkipsFormatting(self):
+        botlog.configure('off', folder = self.folder)
+        log = botlog.logger('Quiet')
+        self.assertIs(log, botlog.NULL)
+        self.assertFalse(log.isEnabledFor(botlog.LEVELS['debug']))
+        log.debug("Never formatted %i.", "not a number")
+        self.assertEqual(os.listdir(self.folder), [])
+
+    def test_LevelPerRun(self):
+        botlog.configure('info', folder = self.folder)
+        log = botlog.logger('Leveled')
+        log.debug("Hidden.")
+        log.info("Shown %i.", 1)
+        botlog.stop()
+        with open(os.path.join(self.folder, 'Leveled.log')) as f:
+            self.assertEqual(f.read(), "Shown 1.\n")
+
+    def test_MergeShards(self):
+        for shard in [10000, 9999]:
+            botlog.configure('debug', folder = self.folder, shard = shard)
+            botlog.logger('Sharded').debug("From worker %i.", shard)
+            botlog.stop()
+        self.assertEqual(sorted(os.listdir(self.folder)), ['Sharded.10000.log', 'Sharded.9999.log'])
+
+        botlog.merge(self.folder)
+        self.assertEqual(os.listdir(self.folder), ['Sharded.log'])
+        with open(os.path.join(self.folder, 'Sharded.log')) as f:
+            self.assertEqual(f.read(), "From worker 9999.\nFrom worker 10000.\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import math
+import shutil
+import struct
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'tools'))
+
+import export_classifier
+
+try:
+    from bots.classifier import Classifier, FILENAME
+except ImportError:
+    Classifier = None
+
+
+MODEL = os.path.join(ROOT, 'bots', 'loggerbot_classifier')
+
+ROWS = [[0] * 18,
+        [1, 2, 0, 1, 0, 1, 1, 0, 2, 1, 0, 0, 1, 0, 1, 0, 1, 2],
+        [5, 1, 3, 0, 2, 0, 0, 1, 0, 0, 2, 1, 0, 1, 0, 3, 0, 0]]
+
+
+def reference(layers, row):
+    """Forward pass of the exported layers in plain Python, in doubles."""
+    functions = {'linear': lambda x: x, 'tanh': math.tanh,
+                 'relu': lambda x: max(x, 0.0), 'sigmoid': lambda x: 1.0 / (1.0 + math.exp(-x))}
+    x = [float(v) for v in row]
+    for (_, (inputs, outputs), kernel), (_, _, bias), activation in layers:
+        kernel = struct.unpack('<%if' % (inputs * outputs), kernel)
+        bias = struct.unpack('<%if' % outputs, bias)
+        x = [functions[activation](sum([x[i] * kernel[i * outputs + j] for i in range(inputs)]) + bias[j])
+             for j in range(outputs)]
+    return x
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_SameAsCommittedWeights(self):
+        filename = os.path.join(self.folder, 'classifier.npz')
+        export_classifier.write_npz(filename, export_classifier.read_model(MODEL))
+        with open(filename, 'rb') as exported, open(MODEL + '.npz', 'rb') as committed:
+            self.assertEqual(exported.read(), committed.read())
+
+
+@unittest.skipIf(Classifier is None, "The classifier requires NumPy.")
+class TestClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Classifier.load(FILENAME)
+        self.layers = export_classifier.read_model(MODEL)
+
+    def test_Logits(self):
+        logits = self.model.logits(ROWS)
+        self.assertEqual(logits.shape, (len(ROWS), 2))
+        for row, result in zip(ROWS, logits.tolist()):
+            for actual, expected in zip(result, reference(self.layers, row)):
+                self.assertAlmostEqual(actual, expected, delta = 1e-3)
+
+    def test_Probabilities(self):
+        for row, result in zip(ROWS, self.model.probabilities(ROWS).tolist()):
+            expected = [math.exp(v) for v in reference(self.layers, row)]
+            for actual, e in zip(result, expected):
+                self.assertAlmostEqual(actual, e / sum(expected), places = 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
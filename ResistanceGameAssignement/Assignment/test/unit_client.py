@@ -0,0 +1,81 @@
+import unittest
+
+from player import Bot
+
+try:
+    import client
+except ImportError:
+    client = None
+
+
+class Protocol(object):
+    """IRC connection recording the messages sent by the client."""
+
+    def __init__(self):
+        self.messages = []
+
+    def msg(self, channel, message):
+        self.messages.append((channel, message))
+
+    def join(self, channel):
+        pass
+
+    def part(self, channel):
+        pass
+
+
+class Observer(Bot):
+    """Bot recording the bitmasks of the State as it sees them."""
+
+    def onGameRevealed(self, players, spies):
+        self.seen = []
+
+    def select(self, players, count):
+        return players[:count]
+
+    def vote(self, team):
+        self.seen.append(('vote', self.game.team_mask))
+        return True
+
+    def onVoteComplete(self, votes):
+        self.seen.append(('votes', self.game.vote_mask))
+
+    def onMissionComplete(self, sabotaged):
+        self.seen.append(('mission', self.game.team_mask))
+
+
+@unittest.skipIf(client is None, "The IRC client requires twisted.")
+class TestClientState(unittest.TestCase):
+
+    CHANNEL = '#game-0001-player-1'
+
+    def setUp(self):
+        self.client = client.ResistanceClient(Protocol(), Observer)
+        self.send('REVEAL #game-0001; ROLE Resistance; PLAYERS 0-Alice, 1-Observer, 2-Bob, 3-Carol, 4-Dave.')
+        self.send('MISSION 1.1; LEADER 0-Alice.')
+        self.send('VOTE 0-Alice, 3-Carol.')
+        self.send('VOTES Yes, No, Yes, Yes, No.')
+        self.send('SABOTAGES 1.')
+        self.bot = self.client.bots[self.CHANNEL]
+
+    def send(self, message):
+        self.client.message('aigamedev', self.CHANNEL, message)
+
+    def test_Masks(self):
+        self.assertEqual(self.bot.seen, [('vote', 0b01001), ('votes', 0b01101), ('mission', 0b01001)])
+
+    def test_History(self):
+        self.send('MISSION 2.1; LEADER 1-Observer.')
+        self.send('VOTE 1-Observer, 2-Bob, 4-Dave.')
+        self.send('VOTES No, Yes, No, No, Yes.')
+        history = self.bot.game.history
+        self.assertEqual(list(history), [(1, 1, 0, 0b01001, 0b01101, 1), (2, 1, 1, 0b10110, 0b10010, None)])
+        self.assertEqual(history.failures, (1, 0, 0, 1, 0))
+
+    def test_ResetForNextMission(self):
+        self.send('MISSION 2.1; LEADER 1-Observer.')
+        self.assertEqual((self.bot.game.team_mask, self.bot.game.vote_mask), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+import unittest
+
+import os
+import shutil
+import tempfile
+import collections
+
+from player import Bot
+from competition import CompetitionRunner, GameScheduler, play_batch
+from store import GameStore, lineup
+from bots.beginners import Jammer, Hippie
+from bots.intermediates import Simpleton, Bounder, Logicalton
+from bots.experts import Suspicious
+
+
+class Agreeable(Bot):
+
+    def select(self, players, count):
+        return [self] + self.game.random.sample(self.others(), count - 1)
+
+    def vote(self, team):
+        return True
+
+    def sabotage(self):
+        return True
+
+
+class Contrarian(Bot):
+
+    def select(self, players, count):
+        return self.game.random.sample(self.game.players, count)
+
+    def vote(self, team):
+        return self.game.tries == 5 or self.game.random.choice([True, False])
+
+    def sabotage(self):
+        return self.game.random.choice([True, False])
+
+
+COMPETITORS = [Agreeable, Contrarian]
+
+
+def total_games(runner, statistics = None):
+    statistics = runner.statistics if statistics is None else statistics
+    return sum([s.total().samples for s in statistics.values()]) // 5
+
+
+class TestCompetitionRunner(unittest.TestCase):
+
+    def test_SingleProcess(self):
+        runner = CompetitionRunner(list(COMPETITORS), 50, quiet = True, processes = 1)
+        runner.main()
+        self.assertEqual(total_games(runner), 50)
+
+    def test_MultipleProcessesWithBatches(self):
+        runner = CompetitionRunner(list(COMPETITORS), 60, quiet = True, processes = 2, chunksize = 7)
+        runner.main()
+        self.assertEqual(total_games(runner), 60)
+        self.assertEqual(set(runner.statistics.keys()), set(['Agreeable', 'Contrarian']))
+
+    def test_SameResultsForAnyNumberOfProcesses(self):
+        results = []
+        for processes, chunksize in [(1, 50), (2, 7), (3, 1)]:
+            runner = CompetitionRunner(list(POOL), 60, quiet = True, processes = processes,
+                                       chunksize = chunksize, seed = 7)
+            runner.main()
+            results.append(dict([(p, s.encode()) for p, s in runner.statistics.items()]))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
+    def test_ReplayGame(self):
+        runner = CompetitionRunner(list(POOL), 10, quiet = True, processes = 1, seed = 7)
+        first, second = runner.replay(3), runner.replay(3)
+        self.assertEqual(first.won, second.won)
+        self.assertEqual(dict([(p, s.encode()) for p, s in first.statistics.items()]),
+                         dict([(p, s.encode()) for p, s in second.statistics.items()]))
+
+    def test_BundledBotsReproducibleWhenInterleaved(self):
+        scheduler = GameScheduler([Jammer, Hippie, Simpleton, Bounder, Logicalton, Suspicious], seed = 5)
+        selections = list(scheduler.generate(0, 60))
+        results = []
+        for interleave in [1, 8]:
+            count, statistics, _ = play_batch(selections, interleave = interleave)
+            results.append(dict([(p, s.encode()) for p, s in statistics.items()]))
+        self.assertEqual(results[0], results[1])
+
+    def test_AdaptiveStopsOnceSettled(self):
+        runner = CompetitionRunner(list(COMPETITORS), 20000, quiet = True, processes = 1,
+                                   adaptive = True, interval = 250)
+        runner.main()
+        self.assertEqual(runner.unsettled(), [])
+        self.assertLess(runner.played, 20000)
+        self.assertEqual(total_games(runner), runner.played)
+
+    def test_AdaptiveKeepsFocusedStagesApart(self):
+        runner = CompetitionRunner([Agreeable, Contrarian, Cautious, Supportive, Newcomer, Hippie], 2000,
+                                   quiet = True, processes = 1, adaptive = True, top = 1, interval = 250, seed = 2)
+        runner.main()
+        self.assertGreater(len(runner.stages), 0)
+        focused = 0
+        for names, statistics in runner.stages.items():
+            self.assertLess(len(names), 6)
+            self.assertEqual(set(statistics), set(names))
+            focused += total_games(runner, statistics)
+        # Only the full schedule is in the statistics of the competition.
+        self.assertEqual(total_games(runner) % 250, 0)
+        self.assertEqual(total_games(runner) + focused, runner.played)
+        self.assertEqual(sorted(runner.ranking()), sorted(runner.statistics))
+
+
+class Cautious(Contrarian):
+    pass
+
+
+class Supportive(Agreeable):
+    pass
+
+
+class Newcomer(Agreeable):
+    pass
+
+
+POOL = [Agreeable, Contrarian, Cautious, Supportive, Agreeable, Contrarian]
+
+
+class TestIncrementalCompetition(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, 'games.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def run_competition(self, competitors, rounds, seed = 3):
+        runner = CompetitionRunner(list(competitors), rounds, quiet = True, processes = 1,
+                                   store = self.filename, seed = seed)
+        runner.main()
+        runner.store.close()
+        return runner
+
+    def test_RerunReusesAllGames(self):
+        first = self.run_competition(COMPETITORS, 40)
+        second = self.run_competition(COMPETITORS, 40)
+        self.assertEqual(total_games(second), 40)
+        self.assertEqual(GameStore(self.filename).last(), 40)
+        for name in first.statistics:
+            self.assertEqual(first.statistics[name].total().total, second.statistics[name].total().total)
+
+    def lineups(self, runner, rounds):
+        return collections.Counter([lineup([p.__name__ for p in players], roles)
+                                    for players, roles, seed in runner.scheduler.generate(0, rounds)])
+
+    def missing(self, first, second):
+        return sum([max(0, n - first[key]) for key, n in second.items()])
+
+    def test_OtherSeedTopsUpEachLineup(self):
+        first = self.run_competition(POOL, 100)
+        second = self.run_competition(POOL, 100, seed = 4)
+        self.assertEqual(total_games(second), 100)
+        played = self.missing(self.lineups(first, 100), self.lineups(second, 100))
+        self.assertLess(played, 100)
+        self.assertEqual(GameStore(self.filename).last(), 100 + played)
+
+    def test_NewBotOnlyTopsUpMissingLineups(self):
+        first = self.run_competition(POOL, 100)
+        second = self.run_competition(POOL + [Newcomer], 100)
+        self.assertEqual(total_games(second), 100)
+        store = GameStore(self.filename)
+        played = store.db.execute("SELECT lineup FROM games WHERE id > 100").fetchall()
+        self.assertEqual(len(played), self.missing(self.lineups(first, 100), self.lineups(second, 100)))
+        # Every game of the newcomer is played, but not all the others.
+        newcomer = [key for key in self.lineups(second, 100).elements() if 'Newcomer' in key]
+        self.assertEqual(len([key for key, in played if 'Newcomer' in key]), len(newcomer))
+        self.assertLess(len(played), 100)
+
+    def test_EliminationRoundSkipsStoredGames(self):
+        # As in tools/conference.py, the next round drops a bot from the pool.
+        first = self.run_competition(POOL + [Newcomer], 100)
+        second = self.run_competition(POOL, 100)
+        self.assertEqual(total_games(second), 100)
+        played = GameStore(self.filename).last() - 100
+        self.assertEqual(played, self.missing(self.lineups(first, 100), self.lineups(second, 100)))
+        self.assertLess(played, 90)
+
+    def test_EditedBotOnlyPlaysItsGames(self):
+        self.run_competition(POOL, 100)
+        store = GameStore(self.filename)
+        # Invalidate the games with Cautious in the first seat, as if it had been edited.
+        store.db.execute("UPDATE games SET versions = 'stale' || versions WHERE players LIKE 'Cautious%'")
+        store.db.commit()
+
+        runner = self.run_competition(POOL, 100)
+        self.assertEqual(total_games(runner), 100)
+        edited = [s for s in runner.scheduler.generate(0, 100) if s[0][0] is Cautious]
+        self.assertGreater(len(edited), 0)
+        self.assertEqual(store.last(), 100 + len(edited))
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, 'checkpoint.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_ResumeContinuesSchedule(self):
+        first = CompetitionRunner(list(POOL), 40, quiet = True, processes = 2, chunksize = 5,
+                                  checkpoint = self.filename, every = 10, seed = 42)
+        first.main()
+
+        second = CompetitionRunner(list(POOL), 100, quiet = True, processes = 2, chunksize = 5,
+                                   checkpoint = self.filename, resume = True)
+        self.assertEqual(second.played, 40)
+        self.assertEqual(second.scheduler.seed, 42)
+        self.assertEqual(list(second.listGameSelections()), list(first.scheduler.generate(40, 100)))
+
+        second.main()
+        self.assertEqual(total_games(second), 100)
+
+        # The same statistics as if the competition had not been interrupted.
+        uninterrupted = CompetitionRunner(list(POOL), 100, quiet = True, processes = 2, chunksize = 5, seed = 42)
+        uninterrupted.main()
+        self.assertEqual(dict([(p, s.encode()) for p, s in second.statistics.items()]),
+                         dict([(p, s.encode()) for p, s in uninterrupted.statistics.items()]))
+
+    def test_ResumeRequiresSameCompetitors(self):
+        CompetitionRunner(list(POOL), 10, quiet = True, processes = 1, checkpoint = self.filename).main()
+        self.assertRaises(ValueError, CompetitionRunner, list(COMPETITORS), 10, quiet = True,
+                          checkpoint = self.filename, resume = True)
+
+
+class TestGameScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.competitors = ['Bot%i' % i for i in range(7)]
+        self.scheduler = GameScheduler(self.competitors, seed = 1234)
+
+    def test_EvenSeatsAndRoles(self):
+        # Ten blocks cover every bot in every seat with every role.
+        n = len(self.competitors)
+        counts = collections.Counter()
+        for players, roles, seed in self.scheduler.generate(0, n * 10):
+            self.assertEqual(len(set(players)), 5)
+            for seat, (p, r) in enumerate(zip(players, roles)):
+                counts[(p, seat, r)] += 1
+        for p in self.competitors:
+            for seat in range(5):
+                self.assertEqual(counts[(p, seat, True)] + counts[(p, seat, False)], 10)
+                self.assertEqual(counts[(p, seat, True)], 4)
+
+    def test_RandomAccessMatchesStream(self):
+        games = list(self.scheduler.generate(10, 30))
+        self.assertEqual(games, [self.scheduler.selection(i) for i in range(10, 30)])
+        self.assertEqual(games, list(GameScheduler(self.competitors, seed = 1234).generate(10, 30)))
+
+
+if __name__ == "__main__":
+    unittest.main()
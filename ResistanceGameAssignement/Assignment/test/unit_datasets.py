@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import datasets
+
+
+COLUMNS = ['Turn', 'Name', 'Spy']
+
+
+class TestDatasets(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        datasets.configure()
+        shutil.rmtree(self.folder)
+
+    def test_MissingFolderIgnoresRows(self):
+        datasets.configure(folder = os.path.join(self.folder, 'missing'))
+        sink = datasets.sink('Absent', COLUMNS, text = ['Name'])
+        self.assertIs(sink, datasets.NULL)
+        sink.append([1, 'Bounder', 0])
+
+    def test_FixedWidthRows(self):
+        datasets.configure(folder = self.folder)
+        sink = datasets.sink('Narrow', COLUMNS, text = ['Name'])
+        self.assertRaises(ValueError, sink.append, [1, 'Bounder'])
+
+    def test_LoadShards(self):
+        for shard, rows in [(2, [[1, 'Bounder', 0], [2, 'Simpleton', 1]]), (1, [[3, 'Simpleton', 0]])]:
+            datasets.configure(folder = self.folder, shard = shard, capacity = 1)
+            sink = datasets.sink('Sharded', COLUMNS, text = ['Name'])
+            for row in rows:
+                sink.append(row)
+            datasets.stop()
+
+        dataset = datasets.load('Sharded', self.folder)
+        self.assertEqual(len(dataset), 3)
+        self.assertEqual(dataset.columns, tuple(COLUMNS))
+        self.assertEqual(dataset[0], [3, 'Simpleton', 0])
+        self.assertEqual(dataset[-1], [2, 'Simpleton', 1])
+        self.assertEqual(dataset.column('Name'), ['Simpleton', 'Bounder', 'Simpleton'])
+        self.assertEqual(dataset.column('Spy'), [0, 0, 1])
+
+    def test_AppendToExistingShard(self):
+        # A later run with the same shard, e.g. a reused pid, continues the names.
+        for rows in [[[1, 'Bounder', 0]], [[2, 'Simpleton', 1], [3, 'Bounder', 0]]]:
+            datasets.configure(folder = self.folder, shard = 7)
+            sink = datasets.sink('Appended', COLUMNS, text = ['Name'])
+            for row in rows:
+                sink.append(row)
+            datasets.stop()
+
+        dataset = datasets.load('Appended', self.folder)
+        self.assertEqual(dataset.column('Name'), ['Bounder', 'Simpleton', 'Bounder'])
+
+    def test_MismatchedColumns(self):
+        datasets.configure(folder = self.folder)
+        datasets.sink('Changed', COLUMNS, text = ['Name']).append([1, 'Bounder', 0])
+        datasets.configure(folder = self.folder)
+        self.assertRaises(ValueError, datasets.sink, 'Changed', COLUMNS + ['Leader'], text = ['Name'])
+
+    def test_ShardsInNumericOrder(self):
+        for shard in [10, 9]:
+            datasets.configure(folder = self.folder, shard = shard)
+            datasets.sink('Numbered', COLUMNS, text = ['Name']).append([shard, 'Bounder', 0])
+        datasets.stop()
+        self.assertEqual(datasets.load('Numbered', self.folder).column('Turn'), [9, 10])
+
+
+if __name__ == "__main__":
+    unittest.main()
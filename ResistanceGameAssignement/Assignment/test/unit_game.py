@@ -2,8 +2,14 @@ import unittest
 
 import random
 
-from player import Player
-from game import State, BaseGame
+from player import Player, Bot, cached
+from game import State, BaseGame, Game, Validation
+from game import overrides as game_overrides
+import core
+import masks
+import hypotheses
+import beliefs
+from bots import loggerbot
 
 
 class FakeGame(BaseGame):
@@ -103,6 +109,8 @@ class TestGameVoting(unittest.TestCase):
         # When a majority votes the mission up, the game goes to mission phase.
         self.game.replay = [('votes', (True, True, True, False, False))]
         self.game.step()
+        self.assertEqual(self.game.state.team_mask, 0b00011)
+        self.assertEqual(self.game.state.vote_mask, 0b00111)
         self.assertEquals(self.game.state.phase, State.PHASE_MISSION)
         self.assertEquals(self.game.state.turn, 1)
         self.assertEquals(self.game.state.tries, 1)
@@ -149,6 +157,139 @@ class TestGameMission(unittest.TestCase):
         self.assertIn('onMissionComplete', self.game.calls)
 
 
+class Resolving(FakeGame):
+    """Game recording the length of the history in each callback."""
+
+    def __init__(self, *args):
+        super(Resolving, self).__init__(*args)
+        self.lengths = []
+
+    def onVoteComplete(self, votes):
+        self.lengths.append(('onVoteComplete', len(self.state.history)))
+
+    def onMissionFailed(self, leader, team):
+        self.lengths.append(('onMissionFailed', len(self.state.history)))
+
+    def onMissionComplete(self, sabotaged):
+        self.lengths.append(('onMissionComplete', len(self.state.history)))
+
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.game = Resolving()
+        players = self.game.state.players
+        self.game.replay = [
+            ('selection', players[0:2]),
+            ('votes', (True, True, False, False, False)),
+            ('announcements', []),
+            ('selection', [players[1], players[3]]),
+            ('votes', (True, True, True, False, True)),
+            ('sabotages', 1),
+        ]
+        self.game.step(7)
+
+    def test_Attempts(self):
+        history = self.game.state.history
+        self.assertEqual(len(history), 2)
+        self.assertEqual(history.teams, (0b00011, 0b01010))
+        self.assertEqual(history.votes, (0b00011, 0b10111))
+        self.assertEqual(history.sabotages, (None, 1))
+        self.assertEqual(history[1], (1, 2, 1, 0b01010, 0b10111, 1))
+        self.assertEqual(list(history)[0].leader, 0)
+
+    def test_Counters(self):
+        history = self.game.state.history
+        self.assertEqual(history.led, (1, 1, 0, 0, 0))
+        self.assertEqual(history.selected, (1, 2, 0, 1, 0))
+        self.assertEqual(history.approvals, (2, 2, 1, 0, 1))
+        self.assertEqual(history.missions, (0, 1, 0, 1, 0))
+        self.assertEqual(history.failures, (0, 1, 0, 1, 0))
+
+    def test_Immutable(self):
+        before = self.game.state.history
+        self.game.replay = [
+            ('announcements', []),
+            ('selection', self.game.state.players[2:5]),
+            ('votes', (True, True, True, True, True)),
+            ('sabotages', 0),
+        ]
+        self.game.step(4)
+        self.assertEqual(len(before), 2)
+        self.assertEqual(len(self.game.state.history), 3)
+        self.assertEqual(self.game.state.history.failures, before.failures)
+
+    def test_RecordedOnceResolved(self):
+        # The current attempt is never in the history yet in onVoteComplete.
+        self.assertEqual(self.game.lengths, [('onVoteComplete', 0), ('onMissionFailed', 1),
+                                             ('onVoteComplete', 1), ('onMissionComplete', 2)])
+
+
+class Counter(object):
+    """Object with a cached method counting how often it's computed."""
+
+    def __init__(self, game):
+        self.game = game
+        self.computed = 0
+
+    @cached
+    def square(self, value):
+        self.computed += 1
+        return value * value
+
+
+class Versioned(FakeGame):
+    """Game recording the version of the State in each callback."""
+
+    def __init__(self, *args):
+        super(Versioned, self).__init__(*args)
+        self.versions = []
+
+    def onVoteComplete(self, votes):
+        self.versions.append(self.state.version)
+
+    def onMissionFailed(self, leader, team):
+        self.versions.append(self.state.version)
+
+
+class TestVersion(unittest.TestCase):
+
+    def setUp(self):
+        self.game = FakeGame()
+        players = self.game.state.players
+        self.game.replay = [
+            ('selection', players[0:2]),
+            ('votes', (True, True, True, False, False)),
+            ('sabotages', 0),
+            ('announcements', []),
+        ]
+
+    def test_EveryPhase(self):
+        versions = [self.game.state.version]
+        for _ in range(5):
+            self.game.step()
+            versions.append(self.game.state.version)
+        self.assertEqual(versions, sorted(set(versions)))
+
+    def test_EveryCallback(self):
+        game = Versioned()
+        game.replay = [('selection', game.state.players[0:2]), ('votes', (True, False, False, False, True))]
+        game.step(3)
+        self.assertEqual(len(game.versions), 2)
+        self.assertLess(game.versions[0], game.versions[1])
+
+    def test_CachedUntilChanged(self):
+        counter = Counter(self.game.state)
+        self.assertEqual(counter.square(3), 9)
+        self.assertEqual(counter.square(3), 9)
+        self.assertEqual(counter.square(4), 16)
+        self.assertEqual(counter.computed, 2)
+
+        self.game.step()
+        self.assertEqual(counter.square(3), 9)
+        self.assertEqual(counter.computed, 3)
+
+
 class TestAnnouncements(unittest.TestCase):
 
     def setUp(self):
@@ -175,5 +316,250 @@ class TestAnnouncements(unittest.TestCase):
         self.assertEquals(self.game.state.leader, self.game.state.players[1])
 
 
+class TestMasks(unittest.TestCase):
+
+    def test_Conversions(self):
+        players = [Player("Mock", i) for i in range(5)]
+        m = masks.mask([players[0], players[3]])
+        self.assertEqual(m, 0b01001)
+        self.assertEqual(masks.players(m, players), [players[0], players[3]])
+        self.assertEqual(masks.votes([False, True, True, False, True]), 0b10110)
+        self.assertEqual(masks.POPCOUNT[0b10110], 3)
+
+    def test_Combinations(self):
+        self.assertEqual(len(masks.combinations(5, 2)), 10)
+        self.assertEqual(len(masks.combinations(10, 4)), 210)
+
+
+class TestHypotheses(unittest.TestCase):
+
+    def test_SharedSpace(self):
+        self.assertIs(hypotheses.space(5), hypotheses.space(5))
+        self.assertEqual(len(hypotheses.space(5).configurations), 10)
+        self.assertEqual(hypotheses.space(10).spies, 4)
+
+    def test_Filters(self):
+        space = hypotheses.space(5)
+        self.assertEqual(len(space.excluding(0b00001)), 6)
+        self.assertEqual(space.including(0b00011), frozenset([0b00011]))
+        self.assertEqual(len(space.at_least(0b00110, 1)), 7)
+        self.assertEqual(space.at_least(0b00110, 1), space.exactly(0b00110, 1) | space.exactly(0b00110, 2))
+        self.assertEqual(space.at_most(0b00110, 0), space.excluding(0b00110))
+        self.assertEqual(space.exactly(0b00110, 3), frozenset())
+        self.assertIs(space.at_least(0b00110, 1), space.at_least(0b00110, 1))
+        self.assertIs(space.at_most(0b00110, 1), space.at_most(0b00110, 1))
+
+    def test_Probabilities(self):
+        space = hypotheses.space(5)
+        remaining = space.excluding(0b00001) & space.at_least(0b00110, 2)
+        self.assertEqual(space.probabilities(remaining), [0.0, 1.0, 1.0, 0.0, 0.0])
+
+
+class TestBeliefs(unittest.TestCase):
+
+    def setUp(self):
+        self.space = hypotheses.space(5)
+        self.state = State()
+        self.state.players = [Player("Mock", i) for i in range(5)]
+        self.state.leader = self.state.players[1]
+        self.state.team_mask = 0b00110
+
+    def test_MatchesLogicalFiltering(self):
+        belief = beliefs.Belief(self.space, self.space.excluding(0b00001))
+        belief.sabotaged(self.state, 1)
+        remaining = self.space.excluding(0b00001) & self.space.at_least(0b00110, 1)
+        expected = self.space.probabilities(remaining)
+        for p, e in zip(belief.marginals(), expected):
+            self.assertAlmostEqual(p, e)
+        self.assertAlmostEqual(sum(belief.marginals()), 2.0)
+
+    def test_ImpossibleEventsIgnored(self):
+        belief = beliefs.Belief(self.space, self.space.excluding(0b00110))
+        belief.sabotaged(self.state, 2)
+        self.assertAlmostEqual(belief.clean(0b00110), 1.0)
+
+    def test_BehaviourUpdates(self):
+        belief = beliefs.Belief(self.space, self.space.excluding(0b00001), beliefs.Behaviour())
+        before = belief.marginals()
+        belief.voted(self.state, [True, True, True, False, False])
+        belief.sabotaged(self.state, 1)
+        after = belief.marginals()
+        self.assertGreater(after[1], before[1])
+        self.assertLess(after[3], before[3])
+        self.assertEqual(after[0], 0.0)
+        self.assertIn(belief.likeliest(), self.space.at_least(0b00110, 1))
+
+
+class TestPlayers(unittest.TestCase):
+
+    def test_Immutable(self):
+        p = Player("Mock", 1)
+        self.assertRaises(AttributeError, setattr, p, 'index', 2)
+        self.assertEqual(p.index, 1)
+
+    def test_CompatibleWithCopies(self):
+        p = Player("Mock", 1)
+        self.assertEqual(p, Player("Mock", 1))
+        self.assertEqual(hash(p), hash(Player("Mock", 1)))
+        self.assertNotEqual(p, Player("Mock", 2))
+        self.assertIn(Player("Mock", 1), set([p]))
+
+    def test_CanonicalTeam(self):
+        game = FakeGame()
+        game.replay = [('selection', [Player("Mock", 3), Player("Mock", 1)])]
+        game.step(2)
+        self.assertIs(game.state.team[0], game.state.players[3])
+        self.assertIs(game.state.team[1], game.state.players[1])
+
+
+class Observer(Bot):
+
+    def onGameRevealed(self, players, spies):
+        self.calls = ['Observer']
+
+    def onVoteComplete(self, votes):
+        self.calls.append('Observer')
+
+
+class Mixin(object):
+
+    def onVoteComplete(self, votes):
+        self.calls.append('Mixin')
+
+
+class Derived(Observer, Mixin):
+
+    def onVoteComplete(self, votes):
+        self.calls.append('Derived')
+
+
+class Cooperative(Observer):
+
+    @core.override
+    def onVoteComplete(self, votes):
+        self.calls.append('Cooperative')
+        super(Cooperative, self).onVoteComplete(votes)
+
+
+class Helped(Observer):
+
+    def onVoteComplete(self, votes):
+        self.calls.append('Helped')
+        self.calls.append(super(Helped, self).others.__name__)
+
+
+class Replaced(Observer):
+
+    @core.override
+    def onVoteComplete(self, votes):
+        self.calls.append('Replaced')
+
+
+class TestObservable(unittest.TestCase):
+
+    def observe(self, cls):
+        bot = cls(State(), 0, False)
+        bot.onGameRevealed([], [])
+        bot.onVoteComplete([])
+        return bot.calls
+
+    def test_BaseClassesFirst(self):
+        self.assertEqual(self.observe(Derived), ['Observer', 'Mixin', 'Observer', 'Derived'])
+
+    def test_OverrideCallingSuper(self):
+        self.assertEqual(self.observe(Cooperative), ['Observer', 'Cooperative', 'Observer'])
+
+    def test_SuperForOtherMethodsChains(self):
+        self.assertEqual(self.observe(Helped), ['Observer', 'Observer', 'Helped', 'others'])
+
+    def test_OverrideReplacesChain(self):
+        self.assertEqual(self.observe(Replaced), ['Observer', 'Replaced'])
+
+    def test_FlatChains(self):
+        self.assertEqual(len(Derived.__chains__['onVoteComplete']), 3)
+        self.assertEqual(Derived.__chains__['onMissionComplete'], ())
+        self.assertIs(Observer.onGameRevealed, Observer.__hooks__['onGameRevealed'])
+
+
+class TestListeners(unittest.TestCase):
+
+    def test_OnlyOverriddenHooks(self):
+        self.assertEqual(game_overrides(Observer), frozenset(['onGameRevealed', 'onVoteComplete']))
+        self.assertEqual(game_overrides(Sloppy), frozenset())
+
+    def test_SkipsDefaultHooks(self):
+        Watcher = type('Watcher', (Sloppy, Observer), {})
+        game = Game([Watcher, Sloppy, Sloppy, Sloppy, Watcher], [True, True, False, False, False],
+                    validation = Validation(warmup = 0))
+        self.assertEqual(game.listeners['onVoteComplete'], [game.bots[0], game.bots[4]])
+        self.assertNotIn('announce', game.listeners)
+        game.run()
+        self.assertEqual(game.bots[0].calls, ['Observer'] * len(game.bots[4].calls))
+        self.assertGreater(len(game.bots[0].calls), 1)
+
+
+class Sloppy(Bot):
+
+    def select(self, players, count):
+        return players[:count]
+
+    def vote(self, team):
+        return 1
+
+    def sabotage(self):
+        return True
+
+
+class TestValidation(unittest.TestCase):
+
+    def test_WarmupThenSampled(self):
+        v = Validation(warmup=2, every=3)
+        self.assertEqual([v.enabled(Sloppy) for _ in range(8)],
+                         [True, True, True, False, False, True, False, False])
+
+    def test_ViolationReportsBotName(self):
+        game = Game([Sloppy] * 5, [True, True, False, False, False])
+        with self.assertRaises(AssertionError) as e:
+            game.run()
+        self.assertIn('Sloppy.vote()', str(e.exception))
+
+    def test_UncheckedGameRuns(self):
+        game = Game([Sloppy] * 5, [True, True, False, False, False], validation=Validation(warmup=0))
+        game.run()
+        self.assertTrue(game.done)
+
+
+class Caching(loggerbot.LoggerBot):
+
+    def uncached(self):
+        return dict((p, self.failed_missions_been_on[p] + sum(self.num_missions_voted_down_with_total_suspect_count[p]))
+                    for p in self.game.players)
+
+    @cached
+    def suspicion(self):
+        self.computed += 1
+        return self.uncached()
+
+    def onGameRevealed(self, players, spies):
+        self.computed, self.queries = 0, 0
+
+    def vote(self, team):
+        for _ in range(3):
+            self.queries += 1
+            assert self.suspicion() == self.uncached()
+        return True
+
+
+class TestCachedFeatures(unittest.TestCase):
+
+    def test_MatchesUncached(self):
+        # LoggerBot's counters are updated in callbacks, after the version changed.
+        game = Game([Caching] * 5, [True, True, False, False, False], seed = 1)
+        game.run()
+        for bot in game.bots:
+            self.assertGreater(bot.computed, 0)
+            self.assertLess(bot.computed, bot.queries)
+
+
 if __name__ == "__main__":
     unittest.main()
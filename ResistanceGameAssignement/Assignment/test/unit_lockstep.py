@@ -0,0 +1,72 @@
+import unittest
+
+import lockstep
+from player import Bot
+from game import Game
+from competition import GameScheduler, Configured, play_batch
+from bots.beginners import RandomBot, Hippie, Paranoid, Neighbor, Deceiver
+
+
+STOCK = [RandomBot, Hippie, Paranoid, Neighbor]
+
+
+class Derived(Hippie):
+    """Changes a decision without its batch version."""
+
+    def vote(self, team):
+        return False
+
+
+class Listening(Hippie):
+
+    def onVoteComplete(self, votes):
+        pass
+
+
+class TestVectorized(unittest.TestCase):
+
+    def test_StockBots(self):
+        for cls in STOCK:
+            self.assertTrue(lockstep.vectorized(cls), cls.__name__)
+
+    def test_Fallback(self):
+        self.assertFalse(lockstep.vectorized(Bot))
+        self.assertFalse(lockstep.vectorized(Deceiver))
+        self.assertFalse(lockstep.vectorized(Derived))
+        self.assertFalse(lockstep.vectorized(Listening))
+        self.assertFalse(lockstep.vectorized(Configured(Hippie)))
+
+
+class TestBatch(unittest.TestCase):
+
+    def selections(self, count):
+        return list(GameScheduler(STOCK, seed = 3).generate(0, count))
+
+    def test_SameGamesAsScalar(self):
+        selections = self.selections(200)
+        batch = lockstep.Batch(selections)
+        batch.run()
+        for g, (players, roles, seed) in enumerate(selections):
+            game = Game(players, roles, seed = seed)
+            game.run()
+            self.assertEqual((batch.turn[g], batch.tries[g], batch.wins[g], batch.losses[g]),
+                             (game.state.turn, game.state.tries, game.state.wins, game.state.losses))
+            self.assertEqual(batch.random[g].random(), game.state.random.random())
+
+    def test_SameStatisticsAsScalar(self):
+        selections = self.selections(500)
+        fast = play_batch(selections, record = True)
+        slow = play_batch(selections, record = True, vectorize = False)
+        self.assertEqual(fast[2], slow[2])
+        self.assertEqual(dict([(p, s.encode()) for p, s in fast[1].items()]),
+                         dict([(p, s.encode()) for p, s in slow[1].items()]))
+
+    def test_MixedTables(self):
+        selections = list(GameScheduler(STOCK + [Deceiver], seed = 5).generate(0, 100))
+        fast = play_batch(selections, record = True)
+        slow = play_batch(selections, record = True, vectorize = False)
+        self.assertEqual(fast[2], slow[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import time
+import random
+import unittest
+
+import simulator
+from game import Game
+from masks import POPCOUNT
+from competition import Configured
+from bots.beginners import RandomBot, RuleFollower
+from bots.searchers import ISMCTS, playout
+
+
+class Recording(Game):
+    """Game keeping the teams, votes and sabotages of every round."""
+
+    def __init__(self, *args, **kwargs):
+        super(Recording, self).__init__(*args, **kwargs)
+        self.rounds = []
+
+    def onVoteComplete(self, votes):
+        self.rounds.append([self.state.team_mask, votes, None])
+
+    def onMissionComplete(self, sabotaged):
+        self.rounds[-1][2] = sabotaged
+
+
+class TestStep(unittest.TestCase):
+
+    def test_Actions(self):
+        position = simulator.initial(0b00011)
+        self.assertEqual(len(simulator.actions(position)), 10)
+        self.assertTrue(all(POPCOUNT[t] == 2 for t in simulator.actions(position)))
+
+        position = simulator.step(position, 0b00110)
+        self.assertEqual(position.phase, simulator.VOTING)
+        self.assertEqual(simulator.actions(position), (True, False))
+
+    def test_Immutable(self):
+        position = simulator.initial(0b00011)
+        after = simulator.step(position, 0b00011)
+        self.assertEqual(position, simulator.initial(0b00011))
+        self.assertNotEqual(position, after)
+
+    def test_MissionOnlyAsksSpies(self):
+        position = simulator.step(simulator.initial(0b10100), 0b00110)
+        for i in range(5):
+            position = simulator.step(position, True)
+        self.assertEqual((position.phase, position.actor), (simulator.MISSION, 2))
+        position = simulator.step(position, True)
+        self.assertEqual((position.phase, position.turn, position.losses, position.leader),
+                         (simulator.SELECTION, 2, 1, 1))
+
+    def test_TooManyTries(self):
+        position = simulator.initial(0b00011)
+        for t in range(5):
+            position = simulator.step(position, simulator.actions(position)[0])
+            for i in range(5):
+                position = simulator.step(position, False)
+        self.assertTrue(simulator.over(position))
+        self.assertFalse(simulator.won(position))
+        self.assertEqual(simulator.actions(position), [])
+
+    def test_SameRulesAsGame(self):
+        for seed in range(50):
+            roles = [True, True, False, False, False]
+            game = Recording([RandomBot] * 5, roles[seed % 5:] + roles[:seed % 5], seed = seed)
+            game.run()
+
+            spies = sum(1 << i for i, b in enumerate(game.bots) if b.spy)
+            position = simulator.initial(spies)
+            for team, votes, sabotaged in game.rounds:
+                position = simulator.step(position, team)
+                for v in votes:
+                    position = simulator.step(position, v)
+                while position.phase == simulator.MISSION:
+                    position = simulator.step(position, position.sabotages < sabotaged)
+
+            self.assertTrue(simulator.over(position))
+            self.assertEqual((position.turn, position.tries, position.wins, position.losses),
+                             (game.state.turn, game.state.tries, game.state.wins, game.state.losses))
+
+
+class TestRollout(unittest.TestCase):
+
+    def play(self, position, generator):
+        while not simulator.over(position):
+            position = simulator.step(position, generator.choice(simulator.actions(position)))
+        return position
+
+    def test_SameOutcomesAsStep(self):
+        generator = random.Random(0)
+        position = simulator.initial(0b01001)
+        for action in [0b00110, True, True, False, True]:
+            position = simulator.step(position, action)
+
+        fast = sum(simulator.won(simulator.rollout(position, generator)) for _ in range(4000)) / 4000.0
+        slow = sum(simulator.won(self.play(position, generator)) for _ in range(4000)) / 4000.0
+        self.assertAlmostEqual(fast, slow, delta = 0.05)
+
+    def test_Over(self):
+        generator = random.Random(1)
+        for _ in range(100):
+            position = simulator.rollout(simulator.initial(0b11000), generator)
+            self.assertTrue(simulator.over(position))
+            self.assertEqual(simulator.rollout(position, generator), position)
+
+
+class TestISMCTS(unittest.TestCase):
+
+    ROLES = [True, False, False, True, False]
+
+    def play(self, cls, seed):
+        game = Game([cls] + [RuleFollower] * 4, self.ROLES, seed = seed)
+        game.run()
+        return game
+
+    def test_Playout(self):
+        generator = random.Random(2)
+        for _ in range(100):
+            self.assertTrue(simulator.over(playout(simulator.initial(0b00101), generator)))
+
+    def test_ReproducibleWithoutBudget(self):
+        cls = Configured(ISMCTS, budget = None, iterations = 50)
+        first, second = self.play(cls, 4), self.play(cls, 4)
+        self.assertEqual((first.state.wins, first.state.losses), (second.state.wins, second.state.losses))
+
+    def test_Budget(self):
+        game = Game([Configured(ISMCTS, budget = 0.01)] + [RuleFollower] * 4, self.ROLES, seed = 5)
+        start = time.time()
+        # The bot is the first leader, so it searches for the team.
+        game.step()
+        game.step()
+        self.assertEqual(game.state.leader.index, 0)
+        self.assertLess(time.time() - start, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,28 +1,127 @@
-#!/usr/bin/python2.7 -u
+#!/usr/bin/env python
+from __future__ import print_function
+
+import os
+import sys
+import json
 import itertools
+import collections
 import multiprocessing
 
-from competition import CompetitionRunner
+import botlog
+from competition import CompetitionStatistics, Configured, GameScheduler, chunks, setup, simulate
 
 from bots.cheaters import RandomCheater
 from sceptic import ScepticBot
 
 
-def main(arg):
-    print '.',
-    res, spy = arg
-    RandomCheater.cheat_SetRate(float(res) / 10.0, float(spy) / 10.0)
-
-    # Score of this bot is calculated relative to the scores of all these other bots.
-    competitors = [ScepticBot, RandomCheater, RandomCheater, RandomCheater, RandomCheater]
-    runner = CompetitionRunner(competitors, 250, quiet = True)
-    runner.main()
-
-    # TODO: Split the evaluation depending on whether the bot is Spy or Resistance.
-    return (res, spy), runner.score('ScepticBot')[1] - runner.score('RandomCheater')[1]
+SKILLS = range(11)
+
+
+def competitors(res, spy):
+    """Score of this bot is calculated relative to the scores of all these
+    other bots, which cheat at exactly the skill level of the cell."""
+    cheater = Configured(RandomCheater, res_ratio = float(res) / 10.0, spy_ratio = float(spy) / 10.0)
+    return [ScepticBot, cheater, cheater, cheater, cheater]
+
+
+def main(job):
+    """Play the games [start, stop) of a single cell of the sweep.  Each cell
+    has its own scheduler seeded from its coordinates, so the games played
+    don't depend on how the jobs are split over the workers."""
+    (res, spy), start, stop = job
+    scheduler = GameScheduler(competitors(res, spy), seed = res * len(SKILLS) + spy)
+
+    statistics = collections.defaultdict(CompetitionStatistics)
+    for players, roles, seed in scheduler.generate(start, stop):
+        for p, s in simulate(players, roles, seed).statistics.items():
+            statistics[p] += s
+    return (res, spy), stop - start, dict([(p, s.encode()) for p, s in statistics.items()])
+
+
+class ResultCube(object):
+    """Results of the sweep for every (res, spy) cell, streamed to a file on
+    disk as they come in so the sweep can be refined or re-plotted later."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.cells = {}
+        if os.path.exists(filename):
+            with open(filename) as f:
+                for key, cell in json.load(f).items():
+                    self.cells[tuple(int(k) for k in key.split(','))] = cell
+
+    def games(self, cell):
+        return self.cells.get(cell, {}).get('games', 0)
+
+    def add(self, cell, games, statistics):
+        current = self.cells.setdefault(cell, {'games': 0, 'statistics': {}})
+        for name, s in statistics.items():
+            merged = CompetitionStatistics.decode(current['statistics'].get(name, {}))
+            merged += CompetitionStatistics.decode(s)
+            current['statistics'][name] = merged.encode()
+        current['games'] += games
+
+    def save(self):
+        temporary = self.filename + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(dict([('%i,%i' % cell, v) for cell, v in self.cells.items()]), f)
+        os.replace(temporary, self.filename)
+
+    def improvement(self, cell):
+        # TODO: Split the evaluation depending on whether the bot is Spy or Resistance.
+        statistics = dict([(name, CompetitionStatistics.decode(s)) for name, s in self.cells[cell]['statistics'].items()])
+        return statistics['ScepticBot'].resWins.estimate() - statistics['RandomCheater'].resWins.estimate()
+
+
+def sweep(cube, games, processes, chunksize = 50):
+    """Top up every cell of the cube to the requested number of games, with
+    all the cells' games spread over one shared pool of workers."""
+    jobs = []
+    for cell in itertools.product(SKILLS, SKILLS):
+        for batch in chunks(range(cube.games(cell), games), chunksize):
+            jobs.append((cell, batch[0], batch[-1] + 1))
+    if not jobs:
+        return
+
+    pool = multiprocessing.Pool(processes, setup)
+    try:
+        for i, (cell, count, statistics) in enumerate(pool.imap_unordered(main, jobs)):
+            cube.add(cell, count, statistics)
+            cube.save()
+            sys.stdout.write('.' if (i+1) % 50 else '.\n')
+            sys.stdout.flush()
+        # Let the workers exit normally so their logs are flushed.
+        pool.close()
+        pool.join()
+    finally:
+        pool.terminate()
+        pool.join()
+        botlog.merge(botlog.FOLDER)
 
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--games', type=int, required=False, default=250,
+                        help="Number of games per cell, only missing games are played.")
+    parser.add_argument('--processes', type=int, required=False, default=multiprocessing.cpu_count(),
+                        help="Number of worker processes shared by all the cells.")
+    parser.add_argument('--cube', type=str, required=False, default='analysis.json',
+                        help="File storing the results of all the cells.")
+    parser.add_argument('--plot', action='store_true', default=False,
+                        help="Only plot the results already stored in the cube.")
+    args = parser.parse_args()
+
+    cube = ResultCube(args.cube)
+    if not args.plot:
+        print("Measuring performance of Resistance AI (SkepticBot) against bots of exact skill.")
+        print(" - 10 total skill levels for spy and resistance.")
+        print(" - 121 cells in total, for %i games each." % (args.games))
+        print(" - Using %i processes to run the evaluations...\n" % (args.processes))
+        sweep(cube, args.games, args.processes)
+
     from mpl_toolkits.mplot3d import Axes3D
     import matplotlib.pyplot as plt
     from matplotlib import cm
@@ -31,20 +130,8 @@ if __name__ == '__main__':
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
 
-    n_processes = 1  # multiprocessing.cpu_count()
-
-    print "Measuring performance of Resistance AI (SkepticBot) against bots of exact skill."
-    print " - 10 total skill levels for spy and resistance."
-    print " - 121 jobs run in total, for 250 games each."
-    print " - Using %i threads to run the evaluations...\n" % n_processes
-
-    pool = multiprocessing.Pool(processes=n_processes)
-    results = {}
-    for i, t in pool.map(main, itertools.product(range(11), range(11))):
-        results[i] = float(t)
-
-    X, Y = np.meshgrid(range(11), range(11))
-    zs = np.array([results[(x,y)] for x,y in zip(np.ravel(X), np.ravel(Y))])
+    X, Y = np.meshgrid(SKILLS, SKILLS)
+    zs = np.array([cube.improvement((x,y)) for x,y in zip(np.ravel(X), np.ravel(Y))])
     Z = zs.reshape(X.shape)
 
     ax.plot_surface(X, Y, Z, rstride=1, cstride=1, cmap=cm.jet, linewidth=1, antialiased=True)
@@ -55,6 +142,5 @@ if __name__ == '__main__':
     ax.set_yticklabels(['s=%1.1f' % (float(i*2)/10.0) for i in range(6)])
     ax.set_zlabel('Improvement')
 
-    print "\n\nShowing performance graph of the evaluated bot relative to its opponents."
+    print("\n\nShowing performance graph of the evaluated bot relative to its opponents.")
     plt.show()
-
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+"""Benchmarks for the performance of the game engine and shared libraries,
+to be run from the root of the repository, for example:
+
+    > python tools/benchmark.py engine --games=10000
+"""
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import itertools
+import collections
+
+import batching
+import beliefs
+import hypotheses
+from masks import mask
+from player import Bot, Player
+from game import Game, State, Validation
+
+
+class Stock(Bot):
+    """Minimal bot with constant-time decisions, so the benchmarks measure
+    the overhead of the engine rather than the bots."""
+
+    def select(self, players, count):
+        return players[:count]
+
+    def vote(self, team):
+        return self.game.tries == 5 or self.index != self.game.leader.index
+
+    def sabotage(self):
+        return self.game.turn > 1
+
+
+def measure(function, repeat):
+    """Return the number of calls per second of the given function."""
+    start = time.time()
+    for i in range(repeat):
+        function(i)
+    return float(repeat) / max(time.time() - start, 1e-9)
+
+
+def engine(args):
+    """Engine-only games per second under each validation policy."""
+    roles = [True, True, False, False, False]
+    modes = [('full', lambda: Validation()),
+             ('sampled', lambda: Validation(warmup = 100, every = 10)),
+             ('none', lambda: Validation(warmup = 0))]
+
+    for name, policy in modes:
+        validation = policy()
+        def play(i):
+            Game([Stock] * 5, roles[i % 5:] + roles[:i % 5], seed = i, validation = validation).run()
+        print("  %-10s %10.0f games/sec" % (name, measure(play, args.games)))
+
+
+def filtering(args):
+    """Filtering of the spy configurations after each mission, comparing the
+    lists of boolean tuples the logical bots used to build for every game with
+    the bitmasks from the shared hypothesis space."""
+    players = [Player('P%i' % i, i) for i in range(5)]
+    others = players[1:]
+    teams = [list(t) for t in itertools.combinations(players, 2)] + [list(t) for t in itertools.combinations(players, 3)]
+    missions = [(teams[i % len(teams)], i % 3) for i in range(7)]
+
+    def tuples(i):
+        configurations = list(set(itertools.permutations([True, True, False, False])))
+        for team, sabotaged in missions:
+            configurations = [c for c in configurations
+                              if len([s for s in team if s in [p for p, spy in zip(others, c) if spy]]) >= sabotaged]
+
+    def bitmasks(i):
+        space = hypotheses.space(len(players))
+        configurations = space.excluding(1 << 0)
+        for team, sabotaged in missions:
+            configurations = configurations & space.at_least(mask(team), sabotaged)
+
+    for name, function in [('tuples', tuples), ('bitmasks', bitmasks)]:
+        print("  %-10s %10.0f games/sec" % (name, measure(function, args.games)))
+
+
+def updates(args):
+    """Bayesian belief updates per second for each event at a table of 10,
+    the largest hypothesis space, as bots would do on every vote()."""
+    state = State()
+    state.players = [Player('P%i' % i, i) for i in range(10)]
+    state.leader = state.players[1]
+    state.team_mask = 0b0000011110
+    votes = [i % 3 != 0 for i in range(10)]
+    space = hypotheses.space(10)
+
+    belief = beliefs.Belief(space, space.excluding(1 << 0), beliefs.Behaviour())
+    events = [('selection', lambda i: belief.selected(state)),
+              ('voting', lambda i: belief.voted(state, votes)),
+              ('sabotage', lambda i: belief.sabotaged(state, i % 2)),
+              ('marginals', lambda i: belief.marginals())]
+    for name, function in events:
+        print("  %-10s %10.0f calls/sec" % (name, measure(function, args.games)))
+
+
+class Legacy(type):
+    """Observable meta-class as it was before the hooks were compiled, which
+    walks the MRO of the bot on every call of a hook.  Only the iteration over
+    a copy of the items is changed, so it runs on Python 3."""
+
+    def __new__(cls, name, parents, dct):
+        __hooks__ = collections.defaultdict(list)
+        if name != 'Bot':
+            for (k, v) in list(dct.items()):
+                if not k.startswith('on'):
+                    continue
+                __hooks__[k].append(v)
+                del dct[k]
+            dct['__hooks__'] = __hooks__
+        else:
+            for (k, v) in list(dct.items()):
+                if not k.startswith('on'):
+                    continue
+                def bind(name=k, function=v):
+                    def wrap(self, *args, **kwargs):
+                        for c in reversed(self.__class__.__mro__):
+                            if hasattr(c, '__hooks__'):
+                                for m in c.__hooks__.get(name, []):
+                                    m(self, *args, **kwargs)
+                        return function(self, *args, **kwargs)
+                    return wrap
+                dct[k] = bind()
+        return super(Legacy, cls).__new__(cls, name, parents, dct)
+
+
+def dispatch(args):
+    """Calls per second of the game's onVoteComplete callback for a table of
+    bots shaped like Clymily(InferenceBot, LogicalClone), comparing the
+    compiled chains with the callback loop of the game before, over bots of
+    the same hierarchy built with the Legacy meta-class."""
+    def observer(self, votes):
+        self.votes = votes
+
+    def hierarchy(metaclass, root):
+        SubsumptionBot = metaclass('SubsumptionBot', (root,), {'onVoteComplete': observer})
+        StatBot = metaclass('StatBot', (SubsumptionBot,), {'onVoteComplete': observer})
+        LogicalClone = metaclass('LogicalClone', (SubsumptionBot,), {})
+        InferenceBot = metaclass('InferenceBot', (StatBot,), {'onVoteComplete': observer})
+        return metaclass('Clymily', (InferenceBot, LogicalClone), {'onVoteComplete': observer})
+
+    roles = [True, True, False, False, False]
+    game = Game([hierarchy(type(Stock), Stock)] * 5, roles, validation = Validation(warmup = 0))
+    LegacyBot = Legacy('Bot', (object,), {'onVoteComplete': lambda self, votes: None})
+    legacy = [hierarchy(Legacy, LegacyBot)() for _ in range(5)]
+    votes = [True, False, True, True, False]
+
+    def loop(i):
+        # BaseGame.callback() and Game.callback() before the hooks were compiled.
+        for p in legacy:
+            getattr(p, 'onVoteComplete')(votes)
+        getattr(game, 'onVoteComplete')(votes)
+
+    def compiled(i):
+        game.callback('onVoteComplete', votes)
+
+    for name, function in [('loop', loop), ('compiled', compiled)]:
+        print("  %-10s %10.0f calls/sec" % (name, measure(function, args.games)))
+
+
+def inference(args):
+    """Spy probabilities per second for a table of 10 from the classifier of
+    the neural bots, with the NumPy engine, and with the keras model too if
+    TensorFlow is installed, checking that both give the same outputs."""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bots'))
+    import random
+    from classifier import Classifier
+
+    start = time.time()
+    model = Classifier.load()
+    print("  %-10s %10.1f ms" % ('startup', (time.time() - start) * 1000.0))
+
+    random.seed(0)
+    batches = [[[random.randint(0, 5) for _ in range(model.inputs)] for _ in range(10)] for _ in range(16)]
+    engines = [('numpy', lambda i: model.probabilities(batches[i % 16]))]
+    try:
+        import tensorflow as tf
+        from tensorflow import keras
+    except ImportError:
+        print("  (TensorFlow isn't installed, skipping the keras model.)")
+    else:
+        keras_model = keras.models.load_model(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bots', 'loggerbot_classifier'))
+        engines.append(('keras', lambda i: tf.nn.softmax(keras_model(batches[i % 16]), axis=1).numpy()))
+        error = max(abs(engines[0][1](i) - engines[1][1](i)).max() for i in range(16))
+        print("  %-10s %10.2e" % ('max error', error))
+
+    for name, function in engines:
+        print("  %-10s %10.0f calls/sec" % (name, measure(function, args.games)))
+
+
+def interleaving(args):
+    """Games per second with bots calling a model whose cost is mostly per
+    call, like a small network in NumPy, for each vote: played one after the
+    other, then interleaved so the calls of the concurrent games are batched."""
+    def model(rows):
+        # About 50us per call and 1us per row.
+        deadline = time.time() + 0.00005 + 0.000001 * len(rows)
+        while time.time() < deadline:
+            pass
+        return [r % 2 == 0 for r in rows]
+    infer = batching.Batcher(model)
+
+    class Inferring(Stock):
+        def vote(self, team):
+            return infer([self.index + self.game.turn])[0]
+
+    roles = [True, True, False, False, False]
+    def play(i):
+        Game([Inferring] * 5, roles[i % 5:] + roles[:i % 5], seed = i, validation = Validation(warmup = 0)).run()
+
+    for width in [1, 4, 16, 64]:
+        batches, computed = infer.batches, infer.computed
+        rate = measure(lambda i: batching.interleave(play, range(i * 64, (i + 1) * 64), width), max(1, args.games // 64)) * 64
+        print("  %-10s %10.0f games/sec, %5.1f rows/batch" % ('x%i' % width, rate,
+              float(infer.computed - computed) / max(1, infer.batches - batches)))
+
+
+def vectorizing(args):
+    """Games per second of a tournament between the stock beginner bots,
+    played one by one and in lockstep, in chunks of games like the workers of
+    the competitions."""
+    import competition
+    from bots.beginners import RandomBot, Hippie, Paranoid, Neighbor
+    selections = list(competition.GameScheduler([RandomBot, Hippie, Paranoid, Neighbor], 0).generate(0, args.games))
+
+    for name, vectorize, size in [('scalar', False, 250), ('x250', True, 250), ('x2500', True, 2500)]:
+        chunks = list(competition.chunks(selections, size))
+        rate = measure(lambda i: competition.play_batch(chunks[i], vectorize = vectorize), len(chunks)) * size
+        print("  %-10s %10.0f games/sec" % (name, rate))
+
+
+def rollouts(args):
+    """Random playouts per second of the functional simulator, from the start
+    of a game, by calling step() for each decision and with rollout()."""
+    import random
+    import simulator
+    generator = random.Random(0)
+    start = simulator.initial(0b00011)
+
+    def stepping(i):
+        position = start
+        while not simulator.over(position):
+            position = simulator.step(position, generator.choice(simulator.actions(position)))
+
+    print("  %-10s %10.0f rollouts/sec" % ('step', measure(stepping, args.games)))
+    print("  %-10s %10.0f rollouts/sec" % ('rollout', measure(lambda i: simulator.rollout(start, generator), args.games)))
+
+
+BENCHMARKS = {
+    'engine': engine,
+    'hypotheses': filtering,
+    'beliefs': updates,
+    'dispatch': dispatch,
+    'classifier': inference,
+    'interleave': interleaving,
+    'lockstep': vectorizing,
+    'rollouts': rollouts,
+}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('benchmark', choices = sorted(BENCHMARKS.keys()),
+                        help = "Name of the benchmark to run.")
+    parser.add_argument('--games', type=int, required=False, default=10000,
+                        help = "Number of games to play in each measurement.")
+    args = parser.parse_args()
+
+    print("Benchmark %s:" % (args.benchmark))
+    BENCHMARKS[args.benchmark](args)
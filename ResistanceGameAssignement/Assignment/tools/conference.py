@@ -1,40 +1,72 @@
+from __future__ import print_function
+
+import os
 import sys
+import shutil
+import argparse
+import tempfile
 from time import time
 import itertools
 from competition import CompetitionRunner, getCompetitors
+from store import GameStore
 
 
 if __name__ == '__main__':
-    if len(sys.argv) <= 2:
-        print('USAGE: competition.py 10000 file.BotName [...]')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--processes', type=int, required=False, default=None,
+                        help="Number of worker processes, by default all the cores.")
+    parser.add_argument('--store', type=str, required=False, default=None,
+                        help="File storing all games, by default a temporary file for this run.")
+    parser.add_argument('--seed', type=int, required=False, default=0,
+                        help="Seed of the schedule of every round, so runs can be reproduced.")
+    args, remaining = parser.parse_known_args()
+
+    if len(remaining) < 2:
+        print('USAGE: conference.py [--processes=N] [--store=games.db] [--seed=S] 10000 file.BotName [...]')
         sys.exit(-1)
 
-    competitors = getCompetitors(sys.argv[2:])
+    competitors = getCompetitors(remaining[1:])
     opponents = getCompetitors([# 'bots.RandomBot', 'bots.RuleFollower', 'bots.Deceiver', 'bots.Jammer', 'bots.Hippie', 'bots.Neighbor',
                                 'aigd.Statistician', 'aigd.LogicalBot'])
-    
-    pool = competitors + opponents
-    rnd = 1
-    while len(pool) >= 5:
-        r = int(sys.argv[1])
-        if len(pool) == 5:
-            runner = CompetitionRunner(pool, rounds = int(r * 2.5), quiet = False)
-        else:
-            runner = CompetitionRunner(pool, rounds = r, quiet = True)
-        runner.main()
-    
-        if len(pool) == 5:
-            runner.show(summary=True)
-            break
-        else:
-            last, other = runner.last()
-            print "ROUND #%i: Eliminated %s." % (rnd, last[0].__name__),
-            if last[1].estimate() + last[1].error() < other[1].estimate()     \
-            and other[1].estimate() + other[1].error() > last[1].estimate():
-                print "(approved)"
+
+    # All the games played are kept across the elimination rounds, so each
+    # round only tops up the games needed once a bot has been removed.  The
+    # stored games of each lineup without the eliminated bot are merged back
+    # in, whatever the schedule of the previous rounds.
+    folder = None
+    if args.store is None:
+        folder = tempfile.mkdtemp()
+        args.store = os.path.join(folder, 'conference.db')
+    store = GameStore(args.store)
+
+    try:
+        pool = competitors + opponents
+        rnd = 1
+        while len(pool) >= 5:
+            r = int(remaining[0])
+            if len(pool) == 5:
+                runner = CompetitionRunner(pool, rounds = int(r * 2.5), quiet = False, processes = args.processes,
+                                           store = store, seed = args.seed)
             else:
-                print "(suspect %s)" % (other[0].__name__)
-            print " %s vs %s" % (last[1].detail(), other[1].detail())
-            pool.remove(last[0])
-        rnd += 1
+                runner = CompetitionRunner(pool, rounds = r, quiet = True, processes = args.processes,
+                                           store = store, seed = args.seed)
+            runner.main()
 
+            if len(pool) == 5:
+                runner.show(summary=True)
+                break
+            else:
+                last, other = runner.last()
+                print("ROUND #%i: Eliminated %s." % (rnd, last[0].__name__), end=' ')
+                if last[1].estimate() + last[1].error() < other[1].estimate()     \
+                and other[1].estimate() + other[1].error() > last[1].estimate():
+                    print("(approved)")
+                else:
+                    print("(suspect %s)" % (other[0].__name__))
+                print(" %s vs %s" % (last[1].detail(), other[1].detail()))
+                pool.remove(last[0])
+            rnd += 1
+    finally:
+        store.close()
+        if folder is not None:
+            shutil.rmtree(folder)
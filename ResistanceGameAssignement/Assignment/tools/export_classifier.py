@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""Export the weights of a keras classifier saved with `model.save()`, like
+bots/loggerbot_classifier, to a .npz file for the NumPy inference engine of
+the bots (see bots/classifier.py), for example:
+
+    > python tools/export_classifier.py bots/loggerbot_classifier
+
+The SavedModel is read directly, so neither TensorFlow nor NumPy is needed:
+the architecture comes from the JSON config in keras_metadata.pb, and the
+weights from the checkpoint in the variables/ folder.  Only sequential models
+of Dense layers are supported.
+"""
+from __future__ import print_function
+
+import os
+import sys
+import json
+import struct
+import zipfile
+import argparse
+
+
+# Data types of the tensors in TensorFlow checkpoints, and as NumPy descr.
+DTYPES = {1: ('<f4', 4), 2: ('<f8', 8), 3: ('<i4', 4), 9: ('<i8', 8)}
+
+
+def _varint(data, i):
+    result = shift = 0
+    while True:
+        byte = data[i]
+        i += 1
+        result |= (byte & 0x7f) << shift
+        shift += 7
+        if byte < 0x80:
+            return result, i
+
+
+def _fields(data):
+    """Iterate over the (field, value) pairs of a protobuf message, where
+    the value is an integer, or bytes for length-delimited fields."""
+    i = 0
+    while i < len(data):
+        key, i = _varint(data, i)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            value, i = _varint(data, i)
+        elif wire == 1:
+            value, i = struct.unpack_from('<Q', data, i)[0], i + 8
+        elif wire == 2:
+            size, i = _varint(data, i)
+            value, i = data[i:i+size], i + size
+        elif wire == 5:
+            value, i = struct.unpack_from('<I', data, i)[0], i + 4
+        else:
+            raise ValueError("Unsupported protobuf wire type %i." % wire)
+        yield field, value
+
+
+def _block(data, offset, size):
+    """Entries of an uncompressed block of a LevelDB-style table."""
+    block = data[offset:offset+size]
+    restarts = struct.unpack_from('<I', block, len(block) - 4)[0]
+    end = len(block) - 4 - 4 * restarts
+    i, key = 0, b''
+    while i < end:
+        shared, i = _varint(block, i)
+        unshared, i = _varint(block, i)
+        length, i = _varint(block, i)
+        key = key[:shared] + block[i:i+unshared]
+        i += unshared
+        yield key, block[i:i+length]
+        i += length
+
+
+def read_checkpoint(prefix):
+    """Dictionary of the tensors in a checkpoint, e.g. .../variables/variables,
+    by name, as (descr, shape, raw little-endian bytes)."""
+    with open(prefix + '.index', 'rb') as f:
+        index = f.read()
+    footer = index[-48:]
+    _, i = _varint(footer, 0)
+    _, i = _varint(footer, i)
+    offset, i = _varint(footer, i)
+    size, i = _varint(footer, i)
+
+    entries = {}
+    for _, handle in _block(index, offset, size):
+        offset, i = _varint(handle, 0)
+        size, i = _varint(handle, i)
+        for name, value in _block(index, offset, size):
+            entries[name.decode('utf-8')] = dict(_fields(value))
+
+    # The header, under the empty name, has the number of data shards.
+    count = entries.pop('').get(1, 1)
+    shards, result = {}, {}
+    for name, entry in entries.items():
+        if entry.get(1) not in DTYPES:
+            continue
+        shard = entry.get(3, 0)
+        if shard not in shards:
+            filename = '%s.data-%05d-of-%05d' % (prefix, shard, count)
+            with open(filename, 'rb') as f:
+                shards[shard] = f.read()
+        shape = tuple(dict(_fields(dim)).get(1, 0) for field, dim in _fields(entry.get(2, b'')) if field == 2)
+        start = entry.get(4, 0)
+        result[name] = (DTYPES[entry[1]][0], shape, shards[shard][start:start + entry.get(5, 0)])
+    return result
+
+
+def read_model(path):
+    """List of the Dense layers of a saved keras model, as tuples of the
+    kernel, the bias and the name of the activation."""
+    with open(os.path.join(path, 'keras_metadata.pb'), 'rb') as f:
+        metadata = f.read().decode('utf-8', 'replace')
+    start = metadata.index('{"class_name": "Sequential"')
+    config, _ = json.JSONDecoder().raw_decode(metadata[start:])
+
+    tensors = read_checkpoint(os.path.join(path, 'variables', 'variables'))
+    layers = []
+    for layer in config['config']['layers']:
+        if layer['class_name'] == 'InputLayer':
+            continue
+        if layer['class_name'] != 'Dense':
+            raise ValueError("Unsupported layer %s." % layer['class_name'])
+        prefix = 'layer_with_weights-%i/' % len(layers)
+        kernel = tensors[prefix + 'kernel/.ATTRIBUTES/VARIABLE_VALUE']
+        bias = tensors[prefix + 'bias/.ATTRIBUTES/VARIABLE_VALUE']
+        layers.append((kernel, bias, layer['config']['activation']))
+    return layers
+
+
+def _npy(descr, shape, data):
+    """Contents of a .npy file, version 1.0."""
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%s), }" % \
+             (descr, ''.join('%i, ' % s for s in shape))
+    header += ' ' * (63 - (len(header) + 10) % 64) + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1') + data
+
+
+def write_npz(filename, layers):
+    """Save the layers as `kernel0`, `bias0`, ... and the `activations`.  The
+    entries have a fixed timestamp, so exporting the same model again gives
+    exactly the same file."""
+    width = max(len(a) for _, _, a in layers)
+    activations = b''.join(a.ljust(width, '\0').encode('utf-32-le') for _, _, a in layers)
+    entries = []
+    for i, (kernel, bias, _) in enumerate(layers):
+        entries.append(('kernel%i.npy' % i, _npy(*kernel)))
+        entries.append(('bias%i.npy' % i, _npy(*bias)))
+    entries.append(('activations.npy', _npy('<U%i' % width, (len(layers),), activations)))
+    with zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as z:
+        for name, data in entries:
+            info = zipfile.ZipInfo(name, date_time = (1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            z.writestr(info, data)
+
+
+def main(args):
+    path = args.model.rstrip('/\\')
+    output = args.output or path + '.npz'
+    layers = read_model(path)
+    write_npz(output, layers)
+    for kernel, bias, activation in layers:
+        print("Dense %s -> %s, %s" % (kernel[1][0], kernel[1][1], activation))
+    print("Saved %i layers to %s." % (len(layers), output))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export a saved keras classifier to a .npz file.')
+    parser.add_argument('model', help='Folder of the saved keras model.')
+    parser.add_argument('--output', required=False, default=None,
+                        help='Name of the .npz file, next to the model by default.')
+    main(parser.parse_args(sys.argv[1:]))